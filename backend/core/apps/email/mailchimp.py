@@ -3,12 +3,14 @@ from enum import Enum
 import hashlib
 import json
 import logging
+from typing import Dict, List
 
 from mailchimp_marketing.api_client import ApiClientError
 from core.apps.finances.models.financial_profile import FinancialProfile
 from rest_framework import status
 
 from core.apps.users.models import User
+from core.apps.utilities.outbox import OUTBOX
 from core.config.settings import mailchimp, TWO_CENTS_AUDIENCE_ID
 
 
@@ -55,14 +57,56 @@ def make_member_info_data(user: User, financial_profile: FinancialProfile):
     }
 
 
+class MailchimpOperations(Enum):
+    CREATE_MEMBER = "create_member"
+    SET_PREMIUM = "set_premium"
+    DELETE_MEMBER = "delete_member"
+
+
+MAILCHIMP_OUTBOX_KIND = "mailchimp"
+MAILCHIMP_MIN_INTERVAL_SECONDS = 0.1
+
+
+def _enqueue_mailchimp_operation(operation: MailchimpOperations, email: str, **data):
+    # the operations on an email are sent in order so that a retried create can not re-add a deleted member
+    OUTBOX.enqueue(
+        MAILCHIMP_OUTBOX_KIND,
+        {"operation": operation.value, "email": email, **data},
+        ordering_key=email.lower(),
+    )
+
+
+def _raise_if_retryable(error: ApiClientError):
+    """rate limits and outages are retried by the outbox"""
+    if (
+        error.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        or error.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+    ):
+        raise error
+
+
 def create_mailchimp_user(user: User, financial_profile: FinancialProfile):
+    _enqueue_mailchimp_operation(
+        MailchimpOperations.CREATE_MEMBER,
+        user.email,
+        member_info=make_member_info_data(user, financial_profile),
+    )
 
-    member_info = make_member_info_data(user, financial_profile)
+
+def set_mailchimp_user_as_premium(user: User):
+    _enqueue_mailchimp_operation(MailchimpOperations.SET_PREMIUM, user.email)
+
+
+def delete_mailchimp_user(user: User):
+    _enqueue_mailchimp_operation(MailchimpOperations.DELETE_MEMBER, user.email)
+
+
+def _create_mailchimp_member(email: str, member_info: Dict):
     tags_data = make_new_user_tags()
 
     try:
         mailchimp.lists.add_list_member(TWO_CENTS_AUDIENCE_ID, member_info)
-        mailchimp_id = get_mailchimp_id(user.email)
+        mailchimp_id = get_mailchimp_id(email)
         mailchimp.lists.update_list_member_tags(
             TWO_CENTS_AUDIENCE_ID, mailchimp_id, tags_data
         )
@@ -71,31 +115,54 @@ def create_mailchimp_user(user: User, financial_profile: FinancialProfile):
             d = json.loads(error.text)
             if d.get("title") == MailchimpErrors.MEMBER_EXISTS.value:
                 return  # nbd if member already exists
+        _raise_if_retryable(error)
         logging.error(
-            f"Unable to add {user.email} to mailchimp Two Cents audience becase of {error.text}"
+            f"Unable to add {email} to mailchimp Two Cents audience becase of {error.text}"
         )
 
 
-def set_mailchimp_user_as_premium(user: User):
+def _set_mailchimp_member_as_premium(email: str):
     tags_data = make_premium_user_tags()
     try:
-        mailchimp_id = get_mailchimp_id(user.email)
+        mailchimp_id = get_mailchimp_id(email)
         mailchimp.lists.update_list_member_tags(
             TWO_CENTS_AUDIENCE_ID, mailchimp_id, tags_data
         )
     except ApiClientError as error:
+        _raise_if_retryable(error)
         logging.error(
-            f"Unable to updated {user.email} as Premium User in mailchimp because of {error.text}"
+            f"Unable to updated {email} as Premium User in mailchimp because of {error.text}"
         )
 
 
-def delete_mailchimp_user(user: User):
+def _delete_mailchimp_member(email: str):
     try:
-        mailchimp_id = get_mailchimp_id(user.email)
+        mailchimp_id = get_mailchimp_id(email)
         mailchimp.lists.delete_list_member(TWO_CENTS_AUDIENCE_ID, mailchimp_id)
     except ApiClientError as error:
         if error.status_code == status.HTTP_404_NOT_FOUND:
             return  # member not found - nbd
+        _raise_if_retryable(error)
         logging.error(
-            f"Unable to delete {user.email} from mailchimp because of {error.text}"
+            f"Unable to delete {email} from mailchimp because of {error.text}"
         )
+
+
+def send_mailchimp_operations(operations: List[Dict]):
+    for operation in operations:
+        name = MailchimpOperations(operation["operation"])
+        if name == MailchimpOperations.CREATE_MEMBER:
+            _create_mailchimp_member(operation["email"], operation["member_info"])
+        elif name == MailchimpOperations.SET_PREMIUM:
+            _set_mailchimp_member_as_premium(operation["email"])
+        elif name == MailchimpOperations.DELETE_MEMBER:
+            _delete_mailchimp_member(operation["email"])
+
+
+OUTBOX.register(
+    MAILCHIMP_OUTBOX_KIND,
+    send_mailchimp_operations,
+    max_batch_size=1,
+    # a failed batch is retried as a whole so the operations are sent one at a time
+    min_interval_seconds=MAILCHIMP_MIN_INTERVAL_SECONDS,
+)
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class FinancesConfig(AppConfig):
-    name = "finances"
+    name = "core.apps.finances"
+    label = "finances"
+
+    def ready(self):
+        from core.apps.finances import signals  # noqa: F401
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.2 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0046_auto_20211218_0616"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="financialdata",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -12,3 +12,5 @@ class FinancialData(models.Model):
         blank=True,
         default=None,
     )
+    version = models.PositiveIntegerField(default=0)
+    # bumped whenever the loans, investments, goals or profile change - see `core.apps.finances.signals`
@@ -1,9 +1,13 @@
+from typing import Dict
+
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 from core.apps.finances.models.financial_data import FinancialData
 from core.apps.finances.models.financial_profile import FinancialProfile
 from core.apps.finances.models.goals import FinancialGoal
 from core.apps.finances.models.investments import Investment, InvestmentType
+from core.apps.finances.models.loans import Loan
 from core.apps.finances.serializers.pennies.loan import (
     LoanSerializer as PenniesLoanSerializer,
 )
@@ -105,3 +109,23 @@ class PenniesRequestSerializer(base.ReadOnlyModelSerializer):
             "financial_profile",
         )
         depth = 1
+
+
+def load_pennies_request(financial_data_id: int) -> Dict:
+    """
+    serializes the finances with the `PenniesRequestSerializer` after loading the whole financial graph in four
+    queries - the financial data with its profile, the loans with their interests, the investments and the goals
+    """
+    financial_data = (
+        FinancialData.objects.select_related("financial_profile")
+        .prefetch_related(
+            Prefetch(
+                "loans",
+                queryset=Loan.objects.select_related("loan_interest").order_by("pk"),
+            ),
+            Prefetch("investments", queryset=Investment.objects.order_by("pk")),
+            Prefetch("goals", queryset=FinancialGoal.objects.order_by("pk")),
+        )
+        .get(pk=financial_data_id)
+    )
+    return PenniesRequestSerializer(financial_data).data
@@ -0,0 +1,46 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from core.apps.finances.models.financial_data import FinancialData
+from core.apps.finances.models.financial_profile import FinancialProfile
+from core.apps.finances.models.goals import FinancialGoal
+from core.apps.finances.models.investments import Investment
+from core.apps.finances.models.loans import Loan, LoanInterest
+
+financial_data_changed = Signal()
+# sent with the `financial_data_id` after its version is bumped
+
+
+def bump_financial_data_version(financial_data_id: int):
+    if financial_data_id is None:
+        return
+    FinancialData.objects.filter(pk=financial_data_id).update(
+        version=F("version") + 1
+    )
+    financial_data_changed.send(
+        sender=FinancialData, financial_data_id=financial_data_id
+    )
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+@receiver(post_save, sender=Investment)
+@receiver(post_delete, sender=Investment)
+@receiver(post_save, sender=FinancialGoal)
+@receiver(post_delete, sender=FinancialGoal)
+@receiver(post_save, sender=FinancialProfile)
+@receiver(post_delete, sender=FinancialProfile)
+def on_financial_object_changed(sender, instance, **kwargs):
+    bump_financial_data_version(instance.financial_data_id)
+
+
+@receiver(post_save, sender=LoanInterest)
+def on_loan_interest_changed(sender, instance, created, **kwargs):
+    # a new interest is saved before its loan, which bumps the version itself
+    if created:
+        return
+    for financial_data_id in Loan.objects.filter(loan_interest=instance).values_list(
+        "financial_data_id", flat=True
+    ):
+        bump_financial_data_version(financial_data_id)
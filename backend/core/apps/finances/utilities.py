@@ -1,8 +1,14 @@
-from copy import deepcopy
 from datetime import date, datetime
 from typing import Optional
 
+from django.db import transaction
+from django.db.models import Model
+
 from core.apps.finances.models.financial_data import FinancialData
+from core.apps.finances.models.financial_profile import FinancialProfile
+from core.apps.finances.models.goals import FinancialGoal
+from core.apps.finances.models.investments import Investment
+from core.apps.finances.models.loans import Loan, LoanInterest
 from core.apps.payments.models import CurrentPaymentPlan, PlanType
 
 MIN_PAYMENT_THRESHOLD = 10
@@ -75,28 +81,39 @@ def _can_user_create(
 
 
 def copy_financial_data(old: FinancialData) -> FinancialData:
-    # TODO: make a generalized function to copy django models
-    new = FinancialData.objects.create()
-    for loan in old.loans.all():
-        new_loan_interest = deepcopy(loan.loan_interest)
-        new_loan_interest.pk = None
-        new_loan_interest.save()
-        loan.pk = None
-        loan._state.adding = True
-        loan.financial_data = new
-        loan.loan_interest = new_loan_interest
-        loan.save()
-    for investment in old.investments.all():
-        investment.pk = None
-        investment.financial_data = new
-        investment.save()
-    for goal in old.goals.all():
-        goal.pk = None
-        goal.financial_data = new
-        goal.save()
-    fp = old.financial_profile
-    fp.pk = None
-    fp.financial_data = new
-    fp.save()
-    new.save()
+    """
+    copies the finances with one bulk insert per model - the foreign keys are pointed at the copies in memory and
+    the copy is all or nothing
+    """
+    with transaction.atomic():
+        new = FinancialData.objects.create()
+        loans = list(
+            Loan.objects.filter(financial_data=old)
+            .select_related("loan_interest")
+            .order_by("pk")
+        )
+        loan_interests = [loan.loan_interest for loan in loans]
+        for loan_interest in loan_interests:
+            _reset_pk(loan_interest)
+        LoanInterest.objects.bulk_create(loan_interests)
+        for loan, loan_interest in zip(loans, loan_interests):
+            _reset_pk(loan)
+            loan.financial_data = new
+            loan.loan_interest = loan_interest
+        Loan.objects.bulk_create(loans)
+        for model in (Investment, FinancialGoal):
+            instances = list(model.objects.filter(financial_data=old).order_by("pk"))
+            for instance in instances:
+                _reset_pk(instance)
+                instance.financial_data = new
+            model.objects.bulk_create(instances)
+        financial_profile = FinancialProfile.objects.get(financial_data=old)
+        _reset_pk(financial_profile)
+        financial_profile.financial_data = new
+        financial_profile.save()
     return new
+
+
+def _reset_pk(instance: Model):
+    instance.pk = None
+    instance._state.adding = True
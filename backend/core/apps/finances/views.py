@@ -18,7 +18,10 @@ from core.apps.finances.models.loans import (
     LOAN_REQUIRED_FIELDS_MAP,
     LOAN_INTEREST_REQUIRED_FIELDS_MAP,
 )
-from core.apps.finances.serializers.pennies.request import PenniesRequestSerializer
+from core.apps.finances.serializers.pennies.request import (
+    PenniesRequestSerializer,
+    load_pennies_request,
+)
 from core.apps.finances.serializers.serializers import (
     FinancialProfileSerializer,
     InvestmentSerializer,
@@ -137,7 +140,7 @@ class PenniesRequestViewset(viewsets.GenericViewSet):
     serializer_class = PenniesRequestSerializer
 
     def list(self, request):
-        return Response(self.get_serializer(request.user.financial_data).data)
+        return Response(load_pennies_request(request.user.financial_data.pk))
 
 
 class FinancesEnumsViewset(viewsets.GenericViewSet):
@@ -1,14 +1,17 @@
 import logging
 import os
+from typing import Optional
 
 import firebase_admin
-from firebase_admin import auth, credentials
-from firebase_admin.auth import InvalidIdTokenError
+from firebase_admin import credentials
+from firebase_admin.auth import InvalidIdTokenError, UserNotFoundError
 from rest_framework import authentication
 from rest_framework.authentication import get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
 
+from core.apps.firebase.token_cache import FirebaseTokenCache, VerifiedToken
 from core.apps.users.models import User, TwoCentsAnonymousUser
+from core.config.settings import FIREBASE_REVOCATION_CHECK_SECONDS
 
 cred = credentials.Certificate(
     {
@@ -25,6 +28,9 @@ cred = credentials.Certificate(
     }
 )
 default_app = firebase_admin.initialize_app(cred)
+FIREBASE_TOKEN_CACHE = FirebaseTokenCache(
+    revocation_check_seconds=FIREBASE_REVOCATION_CHECK_SECONDS
+)
 
 
 class FirebaseAuthentication(authentication.TokenAuthentication):
@@ -42,21 +48,34 @@ class FirebaseAuthentication(authentication.TokenAuthentication):
             return TwoCentsAnonymousUser, None
 
         try:
-            decoded_token = auth.verify_id_token(id_token)
-        except InvalidIdTokenError:
+            token, firebase_user = FIREBASE_TOKEN_CACHE.verify(id_token)
+        except (InvalidIdTokenError, UserNotFoundError):
             return TwoCentsAnonymousUser, None
-        uid = decoded_token.get("uid")
-        firebase_user = auth.get_user(uid)
 
-        try:
-            user = User.objects.get(email__iexact=firebase_user.email)
+        user = get_registered_user(token)
+        if user is not None:
             logging.info(
                 f"Firebase recognized the user to be a registered user {(user.pk, user.email)}"
             )
-        except User.DoesNotExist:
+        else:
             user = firebase_user
             logging.info(
                 f"Firebase recognized the user to be a non-registered user {user.email}"
             )
 
         return user, None
+
+
+def get_registered_user(token: VerifiedToken) -> Optional[User]:
+    """looks the user up by email once per token and by primary key after that"""
+    if token.user_id is not None:
+        user = User.objects.filter(pk=token.user_id).first()
+        if user is not None:
+            return user
+    try:
+        user = User.objects.get(email__iexact=token.email)
+    except User.DoesNotExist:
+        # not memoized so that the user is found once they register
+        return None
+    token.user_id = user.pk
+    return user
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from firebase_admin import auth
+from firebase_admin.auth import RevokedIdTokenError, UserRecord
+
+DEFAULT_MAX_TOKENS = 10_000
+DEFAULT_REVOCATION_CHECK_SECONDS = 5 * 60
+
+
+@dataclass
+class VerifiedToken:
+    uid: str
+    email: Optional[str]
+    issued_at: float
+    expires_at: float
+    # seconds since the epoch from the "iat" and "exp" claims
+    user_id: Optional[int] = None
+    # the registered user of the email - memoized for the lifetime of the token
+
+
+class FirebaseTokenCache:
+    """
+    Verifies every id token once and remembers it until it expires so that the following requests skip the
+    signature check - the firebase sdk checks the signature locally against its http cached public keys
+
+    The firebase user is fetched at most once every `revocation_check_seconds` per uid to honour revoked tokens and
+    disabled users - a revoked token is rejected within that window instead of on every request
+    """
+
+    def __init__(
+        self,
+        verify_id_token: Callable[[str], Dict] = auth.verify_id_token,
+        get_user: Callable[[str], UserRecord] = auth.get_user,
+        clock: Callable[[], float] = time.time,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        revocation_check_seconds: float = DEFAULT_REVOCATION_CHECK_SECONDS,
+    ):
+        self.verify_id_token = verify_id_token
+        self.get_user = get_user
+        self.clock = clock
+        self.max_tokens = max_tokens
+        self.revocation_check_seconds = revocation_check_seconds
+        self._tokens: "OrderedDict[str, VerifiedToken]" = OrderedDict()
+        self._users: "OrderedDict[str, Tuple[float, UserRecord]]" = OrderedDict()
+        # uid -> (fetched at, firebase user) - bounded by max_tokens like the tokens
+        self._lock = threading.Lock()
+
+    def verify(self, id_token: str) -> Tuple[VerifiedToken, UserRecord]:
+        """raises the `InvalidIdTokenError`s of the firebase sdk for invalid, expired and revoked tokens"""
+        now = self.clock()
+        token = self._get_token(id_token, now)
+        if token is None:
+            claims = self.verify_id_token(id_token)
+            token = VerifiedToken(
+                uid=claims["uid"],
+                email=claims.get("email"),
+                issued_at=claims["iat"],
+                expires_at=claims["exp"],
+            )
+            self._set_token(id_token, token)
+        firebase_user = self._get_firebase_user(token.uid, now)
+        if (
+            firebase_user.disabled
+            or token.issued_at * 1000 < firebase_user.tokens_valid_after_timestamp
+        ):
+            self._drop_token(id_token)
+            raise RevokedIdTokenError("The Firebase ID token has been revoked.")
+        if token.email is None:
+            token.email = firebase_user.email
+        return token, firebase_user
+
+    def _get_token(self, id_token: str, now: float) -> Optional[VerifiedToken]:
+        with self._lock:
+            token = self._tokens.get(id_token)
+            if token is None:
+                return None
+            if token.expires_at <= now:
+                # verified again so that the sdk raises its expired token error
+                del self._tokens[id_token]
+                return None
+            self._tokens.move_to_end(id_token)
+            return token
+
+    def _set_token(self, id_token: str, token: VerifiedToken):
+        with self._lock:
+            self._tokens[id_token] = token
+            while len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+
+    def _drop_token(self, id_token: str):
+        with self._lock:
+            self._tokens.pop(id_token, None)
+
+    def _get_firebase_user(self, uid: str, now: float) -> UserRecord:
+        with self._lock:
+            fetched_at, firebase_user = self._users.get(uid, (None, None))
+            if fetched_at is not None:
+                self._users.move_to_end(uid)
+        if fetched_at is not None and now - fetched_at < self.revocation_check_seconds:
+            return firebase_user
+        firebase_user = self.get_user(uid)
+        with self._lock:
+            self._users[uid] = (now, firebase_user)
+            self._users.move_to_end(uid)
+            while len(self._users) > self.max_tokens:
+                self._users.popitem(last=False)
+        return firebase_user
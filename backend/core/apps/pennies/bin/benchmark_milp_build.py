@@ -0,0 +1,38 @@
+import timeit
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.strategies.milp.milp import MILP
+from pennies.strategies.milp.parameters import MILPParameters
+from pennies.utilities.examples import large_request
+
+NUM_INSTRUMENTS = 20
+YEARS_TO_DEATH = 60
+REPEATS = 5
+
+
+def main():
+    request = large_request(
+        num_instruments=NUM_INSTRUMENTS, years_to_death=YEARS_TO_DEATH
+    )
+    problem_input = ProblemInputFactory.from_request(request)
+    user_finances = problem_input.user_finances
+    parameters = problem_input.parameters
+    milp = MILP.create(user_finances, parameters)
+
+    def create_parameters():
+        MILPParameters(user_finances, milp.sets, parameters)
+
+    def create_milp():
+        MILP.create(user_finances, parameters)
+
+    print(f"{NUM_INSTRUMENTS} instruments, {YEARS_TO_DEATH} years")
+    for name, function in [
+        ("parameters", create_parameters),
+        ("model build", create_milp),
+    ]:
+        times = timeit.repeat(function, number=1, repeat=REPEATS)
+        print(f"\t{name}: best {min(times):.3f}s, mean {sum(times) / REPEATS:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import timeit
+
+import numpy as np
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.plan_processing.monte_carlo import MonteCarloForecastFactory
+from pennies.strategies.greedy import AvalancheStrategy
+from pennies.utilities.examples import all_requests
+
+NUM_PATHS = 10_000
+REPEATS = 5
+
+
+def main():
+    problem_input = ProblemInputFactory.from_request(all_requests()[1])
+    plan = AvalancheStrategy().create_plan(
+        problem_input.user_finances, problem_input.parameters
+    )
+
+    def create_forecast():
+        MonteCarloForecastFactory.create(
+            plan, problem_input, num_paths=NUM_PATHS, rng=np.random.default_rng(0)
+        )
+
+    print(f"{NUM_PATHS} paths, {len(plan.columns)} months")
+    times = timeit.repeat(create_forecast, number=1, repeat=REPEATS)
+    print(f"\tforecast: best {min(times):.3f}s, mean {sum(times) / REPEATS:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
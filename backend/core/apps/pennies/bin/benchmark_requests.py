@@ -0,0 +1,61 @@
+import argparse
+import sys
+from pathlib import Path
+
+from pennies.utilities.benchmark import (
+    get_stored_cases,
+    get_synthetic_cases,
+    run_benchmark,
+    write_results,
+    read_results,
+    compare_results,
+)
+
+PATH_TO_DATA = Path("tests", "data")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay the stored requests and the synthetic profiles through solve_request"
+    )
+    parser.add_argument("--results", type=Path, default=Path("benchmark.json"))
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--strategies", nargs="*", default=None)
+    parser.add_argument("--no-stored", action="store_true")
+    parser.add_argument("--no-synthetic", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    cases = []
+    if not args.no_stored:
+        cases += get_stored_cases(PATH_TO_DATA)
+    if not args.no_synthetic:
+        cases += get_synthetic_cases()
+    results = run_benchmark(cases, strategies=args.strategies, repeats=args.repeats)
+    write_results(results, args.results)
+    for result in results:
+        print(
+            f"{result.case} - {result.strategy}: p50 {result.p50_seconds:.3f}s,"
+            f" p95 {result.p95_seconds:.3f}s, peak rss {result.peak_rss_mb:.0f}MB,"
+            f" {result.num_variables} variables, objective {result.objective}"
+        )
+    if args.baseline is None:
+        return 0
+
+    comparisons = compare_results(results, read_results(args.baseline))
+    regressions = [c for c in comparisons if c.is_regression]
+    for comparison in regressions:
+        print(
+            f"REGRESSION {comparison.current.case} - {comparison.current.strategy}:"
+            f" {comparison.time_ratio:.2f}x baseline time,"
+            f" objective change {comparison.objective_change}"
+        )
+    print(f"{len(regressions)} regressions in {len(comparisons)} comparisons")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
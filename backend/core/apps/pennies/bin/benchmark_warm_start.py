@@ -0,0 +1,50 @@
+import timeit
+from pathlib import Path
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.strategies.milp.strategy import InvestmentMILPStrategy
+from pennies.strategies.milp.warm_start import HeuristicWarmStart
+from pennies.utilities.examples import all_requests
+
+PATH_TO_DATA = Path("tests", "data")
+HEURISTIC = "avalanche"
+REPEATS = 3
+
+
+def get_cases():
+    cases = [(f"example {i}", request) for i, request in enumerate(all_requests())]
+    for path in sorted(PATH_TO_DATA.glob("*.json")):
+        cases.append((path.stem, PenniesRequest.parse_file(path)))
+    return cases
+
+
+def main():
+    strategy = InvestmentMILPStrategy()
+    total_times = {False: 0.0, True: 0.0}
+    for name, request in get_cases():
+        problem_input = ProblemInputFactory.from_request(request)
+        parameters = strategy.overwrite_parameters(problem_input.parameters)
+        user_finances = problem_input.user_finances
+
+        def solve(is_warm_start):
+            milp = strategy.create_milp(user_finances, parameters)
+            if is_warm_start:
+                HeuristicWarmStart.create(milp, HEURISTIC).load()
+            milp.solve(warmstart=is_warm_start)
+
+        print(name)
+        for label, is_warm_start in [("cold start", False), ("warm start", True)]:
+            times = timeit.repeat(
+                lambda: solve(is_warm_start), number=1, repeat=REPEATS
+            )
+            total_times[is_warm_start] += min(times)
+            print(f"\t{label}: best {min(times):.3f}s, mean {sum(times) / REPEATS:.3f}s")
+    print(
+        f"total of the best times: cold start {total_times[False]:.3f}s,"
+        f" warm start {total_times[True]:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
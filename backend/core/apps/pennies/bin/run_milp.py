@@ -43,7 +43,7 @@ def main():
                 withdrawal = pe.value(solution.vars.get_withdrawal(i, t))
             else:
                 withdrawal = 0
-            name = user_finances.portfolio.get_instrument(i).name
+            name = solution.sets.get_instrument(i).name
             print(f"\t{name=}, {allocation=}, {balance=}, {withdrawal=}")
         gross_monthly_income = pe.value(
             solution.attribute_utility.get_gross_monthly_income(t)
@@ -1,8 +1,17 @@
 import logging
+import time
 import traceback
-from typing import Dict
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Dict, Optional, List, Tuple
 
 from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.parameters import Parameters, PlanExecutor
 from pennies.model.problem_input import ProblemInput
 from pennies.model.request import PenniesRequest
 from pennies.model.response import PenniesResponse
@@ -12,30 +21,89 @@ from pennies.plan_processing.plan import ProcessedFinancialPlan
 from pennies.plan_processing.solution import ProcessedSolution
 from pennies.plan_processing.solution_processor import SolutionProcessor
 from pennies.strategies import get_strategy, StrategyName
+from pennies.strategies.milp.strategy import MILPStrategy, SharedMILP
+from pennies.utilities.metrics import RequestMetrics, record_strategy_metrics
 
 
-def create_plan(problem_input: ProblemInput, strategy_name: str) -> FinancialPlan:
-    return get_strategy(strategy_name).create_plan(
-        problem_input.user_finances, problem_input.parameters
+def create_shared_milp(problem_input: ProblemInput) -> Optional[SharedMILP]:
+    if not problem_input.parameters.is_shared_milp:
+        return None
+    return SharedMILP(
+        user_finances=problem_input.user_finances, parameters=problem_input.parameters,
     )
 
 
+def create_plan(
+    problem_input: ProblemInput,
+    strategy_name: str,
+    shared_milp: Optional[SharedMILP] = None,
+) -> FinancialPlan:
+    strategy = get_strategy(strategy_name)
+    if shared_milp is not None and isinstance(strategy, MILPStrategy):
+        return shared_milp.create_plan(strategy)
+    return strategy.create_plan(problem_input.user_finances, problem_input.parameters)
+
+
 def create_processed_plan(
-    problem_input: ProblemInput, strategy_name: str,
+    problem_input: ProblemInput,
+    strategy_name: str,
+    shared_milp: Optional[SharedMILP] = None,
+    metrics: Optional[RequestMetrics] = None,
 ) -> ProcessedFinancialPlan:
-    return SolutionProcessor.process_plan(
-        create_plan(problem_input, strategy_name), problem_input
-    )
+    with record_strategy_metrics(metrics, strategy_name):
+        return SolutionProcessor.process_plan(
+            create_plan(problem_input, strategy_name, shared_milp), problem_input
+        )
+
+
+def create_processed_plan_with_metrics(
+    problem_input: ProblemInput, strategy_name: str
+) -> Tuple[Optional[ProcessedFinancialPlan], RequestMetrics]:
+    """pooled plans may be solved in another process so their metrics are returned with the plan"""
+    metrics = RequestMetrics()
+    return create_processed_plan(problem_input, strategy_name, metrics=metrics), metrics
+
+
+def create_pooled_plan(
+    problem_input: ProblemInput,
+    strategy_name: str,
+    deadline: Optional[float] = None,
+    is_with_metrics: bool = False,
+):
+    """
+    `deadline` is a time.time() timestamp because the plan may be solved in another process.
+    plans that start after the deadline are skipped and the solver time limit is capped to the time that is left
+    so that abandoned plans free their pool worker
+    """
+    if deadline is not None:
+        remaining_seconds = deadline - time.time()
+        if remaining_seconds <= 0:
+            return (None, RequestMetrics()) if is_with_metrics else None
+        problem_input.parameters.max_milp_seconds = max(
+            1, min(problem_input.parameters.max_milp_seconds, int(remaining_seconds))
+        )
+    if is_with_metrics:
+        return create_processed_plan_with_metrics(problem_input, strategy_name)
+    return create_processed_plan(problem_input, strategy_name)
+
+
+def _get_default_strategies(problem_input: ProblemInput) -> List[str]:
+    strategies = [StrategyName.investment_milp.value, StrategyName.goal_milp.value]
+    if problem_input.user_finances.portfolio.has_loans:
+        strategies.append(StrategyName.loan_milp.value)
+    return strategies
 
 
 def create_solution(problem_input: ProblemInput):
     if problem_input.strategies is None:
-        strategies = [StrategyName.investment_milp.value, StrategyName.goal_milp.value]
-        if problem_input.user_finances.portfolio.has_loans:
-            strategies.append(StrategyName.loan_milp.value)
+        strategies = _get_default_strategies(problem_input)
     else:
         strategies = problem_input.strategies
-    plans = {strategy: create_plan(problem_input, strategy) for strategy in strategies}
+    shared_milp = create_shared_milp(problem_input)
+    plans = {
+        strategy: create_plan(problem_input, strategy, shared_milp)
+        for strategy in strategies
+    }
     # purge none plans
     plans = {strategy: plan for strategy, plan in plans.items() if plan is not None}
 
@@ -46,42 +114,146 @@ def create_solution(problem_input: ProblemInput):
     return Solution(plans=plans, problem_input=problem_input)
 
 
-def create_processed_solution(problem_input: ProblemInput) -> ProcessedSolution:
+_EXECUTORS: Dict[Tuple[PlanExecutor, int], Executor] = dict()
+
+
+def _get_executor(parameters: Parameters) -> Executor:
+    """
+    executors are kept alive between requests so that workers are only started once.
+    plans that miss their deadline keep running in the background until their solver time limit, which is capped
+    to the deadline by `create_pooled_plan`
+    """
+    key = (parameters.plan_executor, parameters.max_plan_workers)
+    if key not in _EXECUTORS:
+        if parameters.plan_executor == PlanExecutor.PROCESS:
+            executor = ProcessPoolExecutor(max_workers=parameters.max_plan_workers)
+        elif parameters.plan_executor == PlanExecutor.THREAD:
+            executor = ThreadPoolExecutor(max_workers=parameters.max_plan_workers)
+        else:
+            raise ValueError(f"{parameters.plan_executor} is not a recognized executor")
+        _EXECUTORS[key] = executor
+    return _EXECUTORS[key]
+
+
+def _with_own_parameters(problem_input: ProblemInput) -> ProblemInput:
+    # the strategies overwrite their parameters so every concurrent plan needs its own copy
+    return problem_input.copy(update={"parameters": problem_input.parameters.copy()})
+
+
+def create_processed_plans_concurrently(
+    problem_input: ProblemInput, metrics: Optional[RequestMetrics] = None
+) -> Dict[str, Optional[ProcessedFinancialPlan]]:
+    """
+    dispatch all strategies at once - the goal plan is solved speculatively and discarded
+    if the investment plan satisfies every goal. plans not done by the deadline are dropped
+    """
+    is_default_strategies = problem_input.strategies is None
+    if is_default_strategies:
+        strategies = _get_default_strategies(problem_input)
+    else:
+        strategies = problem_input.strategies
+    deadline_seconds = problem_input.parameters.plan_deadline_seconds
+    deadline = None if deadline_seconds is None else time.time() + deadline_seconds
+
+    def get_remaining_seconds() -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.time())
+
+    def get_plan(future: Future) -> Optional[ProcessedFinancialPlan]:
+        if metrics is None:
+            return future.result()
+        plan, plan_metrics = future.result()
+        metrics.strategies.update(plan_metrics.strategies)
+        return plan
+
+    executor = _get_executor(problem_input.parameters)
+    futures = {
+        strategy: executor.submit(
+            create_pooled_plan,
+            _with_own_parameters(problem_input),
+            strategy,
+            deadline,
+            metrics is not None,
+        )
+        for strategy in strategies
+    }
+    if is_default_strategies:
+        investment_future = futures[StrategyName.investment_milp.value]
+        wait([investment_future], timeout=get_remaining_seconds())
+        if investment_future.done():
+            investment_plan = get_plan(investment_future)
+            if investment_plan is not None and not investment_plan.has_failed_goal:
+                futures.pop(StrategyName.goal_milp.value).cancel()
+    wait(futures.values(), timeout=get_remaining_seconds())
     plans = dict()
+    for strategy, future in futures.items():
+        if future.done():
+            plans[strategy] = get_plan(future)
+        else:
+            future.cancel()
+            logging.warning(f"{strategy} was not solved before the deadline")
+    return plans
+
+
+def create_processed_solution(
+    problem_input: ProblemInput, metrics: Optional[RequestMetrics] = None
+) -> ProcessedSolution:
+    if problem_input.parameters.plan_executor is not None:
+        # every pooled plan builds its own MILP
+        plans = create_processed_plans_concurrently(problem_input, metrics)
+    else:
+        plans = create_processed_plans_sequentially(problem_input, metrics)
+
+    # purge none plans
+    plans = {strategy: plan for strategy, plan in plans.items() if plan is not None}
+
+    # fail if all plans failed.
+    if len(plans.values()) == 0:
+        raise ValueError("Not able to solve any plan")
+
+    return ProcessedSolution(plans)
+
+
+def create_processed_plans_sequentially(
+    problem_input: ProblemInput, metrics: Optional[RequestMetrics] = None
+) -> Dict[str, Optional[ProcessedFinancialPlan]]:
+    plans = dict()
+    shared_milp = create_shared_milp(problem_input)
     if problem_input.strategies is None:
         # dynamically determine appropriate strategies based on user profile
         investment_plan = create_processed_plan(
-            problem_input, StrategyName.investment_milp.value
+            problem_input, StrategyName.investment_milp.value, shared_milp, metrics
         )
         plans[StrategyName.investment_milp.value] = investment_plan
         if investment_plan is None or investment_plan.has_failed_goal:
             plans[StrategyName.goal_milp.value] = create_processed_plan(
-                problem_input, StrategyName.goal_milp.value,
+                problem_input, StrategyName.goal_milp.value, shared_milp, metrics
             )
         if problem_input.user_finances.portfolio.has_loans:
             plans[StrategyName.loan_milp.value] = create_processed_plan(
-                problem_input, StrategyName.loan_milp.value
+                problem_input, StrategyName.loan_milp.value, shared_milp, metrics
             )
     else:
         for strategy_name in problem_input.strategies:
-            plans[strategy_name] = create_processed_plan(problem_input, strategy_name)
-
-    # purge none plans
-    plans = {strategy: plan for strategy, plan in plans.items() if plan is not None}
-
-    # fail if all plans failed.
-    if len(plans.values()) == 0:
-        raise ValueError("Not able to solve any plan")
-
-    return ProcessedSolution(plans)
+            plans[strategy_name] = create_processed_plan(
+                problem_input, strategy_name, shared_milp, metrics
+            )
+    return plans
 
 
-def solve_request(request: Dict) -> Dict:
+def solve_request(request: Dict, metrics: Optional[RequestMetrics] = None) -> Dict:
+    """pass in a metrics object to record the phase timings and model sizes of the request"""
     try:
         logging.info(request)
-        pennies_request = PenniesRequest.parse_obj(request)
-        model_input = ProblemInputFactory.from_request(pennies_request)
-        solution = create_processed_solution(model_input)
+        request_metrics = RequestMetrics() if metrics is None else metrics
+        with request_metrics.time_phase("request_parsing"):
+            pennies_request = PenniesRequest.parse_obj(request)
+            model_input = ProblemInputFactory.from_request(pennies_request)
+        if metrics is None and model_input.parameters.is_log_metrics:
+            metrics = request_metrics
+        with request_metrics.time_phase("solution"):
+            solution = create_processed_solution(model_input, metrics)
+        if model_input.parameters.is_log_metrics:
+            request_metrics.log()
         return PenniesResponse(result=solution, status=PenniesStatus.SUCCESS).dict()
 
     except Exception:
@@ -89,3 +261,8 @@ def solve_request(request: Dict) -> Dict:
         return PenniesResponse(
             result=traceback.format_exc(), status=PenniesStatus.FAILURE
         ).dict()
+
+
+def solve_request_with_metrics(request: Dict) -> Tuple[Dict, RequestMetrics]:
+    metrics = RequestMetrics()
+    return solve_request(request, metrics), metrics
@@ -1,23 +1,37 @@
 from typing import List, Dict, Optional
 from uuid import UUID
 
+import numpy as np
+
 from pennies.model.investment import BaseInvestment
 from pennies.model.parameters import Parameters
 from pennies.model.portfolio import Portfolio
 from pennies.model.portfolio_manager import PortfolioManager
-from pennies.model.solution import MonthlyAllocation, MonthlySolution, FinancialPlan
+from pennies.model.portfolio_simulator import PortfolioSimulator
+from pennies.model.solution import (
+    MonthlyAllocation,
+    MonthlySolution,
+    FinancialPlan,
+    MonthlySolutionColumns,
+)
 from pennies.model.user_personal_finances import UserPersonalFinances
 from pennies.utilities.finance import (
     calculate_monthly_income_tax,
+    calculate_monthly_income_tax_array,
     estimate_taxable_withdrawal,
 )
 
 
 def calculate_taxable_withdrawals(
-    investments: List[BaseInvestment], withdrawals: Dict[UUID, float], months: List[int]
+    investments: List[BaseInvestment],
+    withdrawals: Dict[UUID, float],
+    starting_month: int,
+    final_month: int,
 ) -> float:
     return sum(
-        estimate_taxable_withdrawal(i, withdrawals.get(i.id_, 0), months)
+        estimate_taxable_withdrawal(
+            i, withdrawals.get(i.id_, 0), starting_month, final_month
+        )
         for i in investments
     )
 
@@ -31,6 +45,72 @@ class FinancialPlanFactory:
         parameters: Parameters,
         monthly_withdrawals: Optional[List[Dict[str, float]]] = None,
     ) -> FinancialPlan:
+        """simulates the plan with the array backed portfolio simulator"""
+        if monthly_withdrawals is None:
+            monthly_withdrawals = [dict() for _ in range(len(monthly_payments))]
+
+        months = [
+            index + parameters.starting_month for index in range(len(monthly_payments))
+        ]
+        financial_profile = user_personal_finances.financial_profile
+        simulator = PortfolioSimulator.create(user_personal_finances.portfolio, months)
+        payments = simulator.to_array(monthly_payments)
+        withdrawals = simulator.to_array(monthly_withdrawals, is_strict=True)
+        simulation = simulator.simulate(payments, withdrawals)
+
+        is_non_guaranteed = simulator.get_instrument_mask(
+            [
+                i.id_
+                for i in user_personal_finances.portfolio.non_guaranteed_investments()
+            ]
+        )
+        is_rrsp = simulator.get_instrument_mask(
+            [i.id_ for i in user_personal_finances.portfolio.rrsp_investments]
+        )
+        total_withdrawals = withdrawals[is_non_guaranteed].sum(axis=0)
+        pre_tax_monthly_income = np.array(
+            [financial_profile.get_pre_tax_monthly_income(m) for m in months]
+        )
+        gross_income = pre_tax_monthly_income + total_withdrawals
+        taxable_income = (
+            pre_tax_monthly_income
+            + simulator.get_taxable_withdrawals(withdrawals).sum(axis=0)
+            - payments[is_rrsp].sum(axis=0)
+        )
+        province = financial_profile.province_of_residence
+        taxes_paid = calculate_monthly_income_tax_array(taxable_income, province)
+        monthly_allowance = (
+            gross_income - taxes_paid - total_withdrawals
+        ) * financial_profile.savings_fraction
+
+        num_months = len(months)
+        columns = MonthlySolutionColumns(
+            instruments=simulator.instruments,
+            months=np.array(months, dtype=int),
+            balances=simulation.balances[:, :num_months],
+            is_active=simulation.is_active[:, :num_months],
+            interest_rates=simulator.interest_rates,
+            payments=payments,
+            has_payment=simulator.to_key_mask(monthly_payments),
+            withdrawals=withdrawals,
+            has_withdrawal=simulator.to_key_mask(monthly_withdrawals),
+            leftover=monthly_allowance
+            - np.array([sum(mp.values()) for mp in monthly_payments]),
+            taxes_paid=taxes_paid,
+            gross_income=gross_income,
+            taxable_income=taxable_income,
+        )
+        return FinancialPlan(columns=columns)
+
+    @classmethod
+    def create_with_portfolio_manager(
+        cls,
+        monthly_payments: List[Dict[str, float]],
+        user_personal_finances: UserPersonalFinances,
+        parameters: Parameters,
+        monthly_withdrawals: Optional[List[Dict[str, float]]] = None,
+    ) -> FinancialPlan:
+        """the reference implementation - forwards a deep copy of the portfolio every month"""
         if monthly_withdrawals is None:
             monthly_withdrawals = [dict() for _ in range(len(monthly_payments))]
 
@@ -54,7 +134,8 @@ class FinancialPlanFactory:
             taxable_withdrawals = calculate_taxable_withdrawals(
                 user_personal_finances.portfolio.investments,
                 withdrawals,
-                list(range(parameters.starting_month, month)),
+                parameters.starting_month,
+                month,
             )
             rrsp_contributions = sum(
                 mp.get(i.id_, 0) for i in cur_portfolio.rrsp_investments
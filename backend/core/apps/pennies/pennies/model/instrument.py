@@ -1,6 +1,7 @@
-from typing import Optional
+from typing import Optional, Iterable
 from uuid import UUID, uuid4
 
+import numpy as np
 from pydantic import Field
 from pydantic.main import BaseModel
 
@@ -31,7 +32,13 @@ class Instrument(BaseModel):
         return None
 
     def monthly_interest_rate(self, month: int) -> float:
-        return self.interest_rate.get_monthly_interest_rate(month)
+        return self.interest_rate.get_curve_interest_rate(month)
+
+    def get_monthly_interest_rates(self, months: Iterable[int]) -> np.ndarray:
+        return self.interest_rate.get_monthly_interest_rates(months)
+
+    def get_growth_factor(self, starting_month: int, final_month: int) -> float:
+        return self.interest_rate.get_growth_factor(starting_month, final_month)
 
     def get_type(self) -> str:
         ...
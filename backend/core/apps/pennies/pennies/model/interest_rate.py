@@ -1,16 +1,75 @@
 from abc import ABC
-from typing import Union, Literal
+from typing import Union, Literal, Optional, Iterable, Dict
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, PrivateAttr
 
 from pennies.model.prime import PrimeInterestRateForecast
 from pennies.utilities.datetime import MONTHS_IN_YEAR
 
 
+# long enough for every plan so that the curves are only built once
+CURVE_HORIZON_MONTHS = 100 * MONTHS_IN_YEAR
+
+
 class CompoundingRate(BaseModel, ABC):
+    _curve: Optional[np.ndarray] = PrivateAttr(default=None)
+    _growth_curves: Dict[int, np.ndarray] = PrivateAttr(default_factory=dict)
+
     def get_monthly_interest_rate(self, month: int) -> float:
         raise NotImplementedError()
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        """the vectorized get_monthly_interest_rate"""
+        raise NotImplementedError()
+
+    def get_interest_rate_curve(self, num_months: int = 0) -> np.ndarray:
+        """the monthly interest rate of every month from month zero - read only, at least num_months long"""
+        if self._curve is None or len(self._curve) < num_months:
+            months = np.arange(max(num_months, CURVE_HORIZON_MONTHS))
+            curve = np.broadcast_to(
+                self.create_interest_rate_curve(months), months.shape
+            ).astype(float)
+            curve.setflags(write=False)
+            self._curve = curve
+        return self._curve
+
+    def get_monthly_interest_rates(self, months: Iterable[int]) -> np.ndarray:
+        months = np.fromiter(months, dtype=int)
+        if len(months) == 0:
+            return np.zeros(0)
+        if months.min() < 0:
+            return np.array([self.get_monthly_interest_rate(m) for m in months])
+        return self.get_interest_rate_curve(months.max() + 1)[months]
+
+    def get_curve_interest_rate(self, month: int) -> float:
+        """get_monthly_interest_rate read from the curve"""
+        if month < 0:
+            return self.get_monthly_interest_rate(month)
+        return float(self.get_interest_rate_curve(month + 1)[month])
+
+    def get_growth_curve(self, starting_month: int, num_months: int = 0) -> np.ndarray:
+        """
+        the growth of a dollar over the first n months from the starting month for every n - read only, at least
+        num_months + 1 long
+        """
+        curve = self._growth_curves.get(starting_month)
+        if curve is None or len(curve) <= num_months:
+            length = max(num_months, CURVE_HORIZON_MONTHS)
+            rates = self.get_monthly_interest_rates(
+                range(starting_month, starting_month + length)
+            )
+            curve = np.ones(length + 1)
+            curve[1:] = np.cumprod(1 + rates)
+            curve.setflags(write=False)
+            self._growth_curves[starting_month] = curve
+        return curve
+
+    def get_growth_factor(self, starting_month: int, final_month: int) -> float:
+        """the growth of a dollar from the start of the starting month to the start of the final month"""
+        num_months = max(0, final_month - starting_month)
+        return float(self.get_growth_curve(starting_month, num_months)[num_months])
+
     def get_volatility(self):
         raise NotImplementedError()
 
@@ -32,6 +91,9 @@ class ZeroGrowthRate(ReturnRate):
     def get_monthly_interest_rate(self, month: int) -> float:
         return 0
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        return np.zeros(len(months))
+
     def get_volatility(self):
         return 0
 
@@ -44,6 +106,9 @@ class FixedLoanInterestRate(InterestRate):
     def get_monthly_interest_rate(self, month: int) -> float:
         return self.apr / MONTHS_IN_YEAR / 100
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        return np.full(len(months), self.apr / MONTHS_IN_YEAR / 100)
+
     def get_volatility(self):
         return self.volatility
 
@@ -61,6 +126,10 @@ class VariableLoanInterestRate(InterestRate):
             / 100
         )
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        prime = self._prime_forecast.get_prime_curve(len(months))[months]
+        return (prime + self.prime_modifier) / MONTHS_IN_YEAR / 100
+
     def get_volatility(self):
         return self.volatility
 
@@ -75,6 +144,9 @@ class FixedInvestmentInterestRate(ReturnRate):
     def get_monthly_interest_rate(self, month: int) -> float:
         return self.roi / MONTHS_IN_YEAR / 100
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        return np.full(len(months), self.roi / MONTHS_IN_YEAR / 100)
+
     def get_volatility(self):
         return self.volatility
 
@@ -94,6 +166,10 @@ class VariableInvestmentInterestRate(ReturnRate):
             / 100
         )
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        prime = self._prime_forecast.get_prime_curve(len(months))[months]
+        return (prime + self.prime_modifier) / MONTHS_IN_YEAR / 100
+
     def get_volatility(self):
         return self.volatility
 
@@ -106,6 +182,9 @@ class InvestmentReturnRate(ReturnRate):
     def get_monthly_interest_rate(self, month: int) -> float:
         return self.roi / MONTHS_IN_YEAR / 100
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        return np.full(len(months), self.roi / MONTHS_IN_YEAR / 100)
+
     def get_volatility(self):
         return self.volatility
 
@@ -123,6 +202,13 @@ class GuaranteedInvestmentReturnRate(ReturnRate):
         else:
             return 0
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        return np.where(
+            months <= self.final_month,
+            self.interest_rate.get_interest_rate_curve(len(months))[months],
+            0,
+        )
+
     def get_volatility(self):
         return self.interest_rate.get_volatility()
 
@@ -144,6 +230,13 @@ class MortgageInterestRate(InterestRate):
         else:
             return self.default_interest_rate.get_monthly_interest_rate(month)
 
+    def create_interest_rate_curve(self, months: np.ndarray) -> np.ndarray:
+        return np.where(
+            months <= self.current_term_end_month,
+            self.interest_rate.get_interest_rate_curve(len(months))[months],
+            self.default_interest_rate.get_interest_rate_curve(len(months))[months],
+        )
+
 
 AllLoanInterestTypes = Union[
     FixedLoanInterestRate,
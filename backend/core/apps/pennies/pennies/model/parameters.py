@@ -1,14 +1,40 @@
+from enum import Enum
+from typing import Optional
+
 from pydantic.main import BaseModel
 
 
+class PlanExecutor(Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
 class Parameters(BaseModel):
     max_months_in_payment_horizon = 60
     max_months_in_retirement_period = 60
     optimality_gap = 0.01
     is_log_milp = False
+    is_log_metrics = False
+    # log the phase timings, model size and solver statistics of every strategy
     max_milp_nodes = 500_000
     max_milp_seconds = 3
     starting_month = 0
+    solver_backend = "cbc"
+    # one of the registered solver backends - e.g. cbc or highs (requires highspy)
+    is_matrix_milp = False
+    # assemble the constraint matrix with numpy instead of pyomo rules - only used by backends that accept matrices
+    warm_start_heuristic: Optional[str] = None
+    # greedy heuristic (snowball, avalanche or avalanche_ball) whose plan is the starting incumbent of the MILP
+    is_shared_milp = False
+    # build the MILP once and re-solve it for every MILP strategy by changing the objective weights - the plans
+    # agree with the per-strategy builds within the optimality gap (see test_shared_milp)
+    plan_executor: Optional[PlanExecutor] = None
+    # solve the strategies concurrently on a thread or process pool instead of one after another
+    max_plan_workers = 3
+    plan_deadline_seconds: Optional[float] = None
+    # plans that are not done by the deadline are dropped from a concurrently solved solution
+    monte_carlo_paths: Optional[int] = None
+    # simulate this many random return paths of every plan for its net worth bands and goal success probabilities
     instrument_upper_bound_factor = 1.4
     # multiplying the max possible value of an instrument upper bound just to be safe
     additional_allocation_factor = 1.5
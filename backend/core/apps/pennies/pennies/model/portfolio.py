@@ -1,7 +1,9 @@
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from uuid import UUID
 
-from pydantic import BaseModel, validator, ValidationError
+from pydantic import BaseModel, validator, ValidationError, PrivateAttr
 
 from pennies.model.constants import InvestmentAccountType
 from pennies.model.instrument import Instrument
@@ -12,11 +14,103 @@ from pennies.model.investment import (
     BaseInvestment,
 )
 from pennies.model.loan import Loan, Mortgage
-from pennies.utilities.dict import get_value_from_dict
+from pennies.utilities.dict import get_value_from_dict, add_to_dict, remove_from_dict
+
+
+class InstrumentDict(dict):
+    """The instruments of a portfolio - every write bumps the version so that the index of the portfolio is rebuilt"""
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, key, *args):
+        if key in self:
+            self.version += 1
+        return super().pop(key, *args)
+
+    def popitem(self):
+        item = super().popitem()
+        self.version += 1
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
+@dataclass
+class PortfolioIndex:
+    """
+    The instruments of a portfolio by kind. It is only valid for the dictionary and the version it was built from so
+    that replacing the dictionary or writing to it rebuilds it
+    """
+
+    instruments: InstrumentDict
+    version: int
+    loans: Tuple[Loan, ...]
+    non_mortgage_loans: Tuple[Loan, ...]
+    loans_by_id: Dict[UUID, Loan]
+    investments: Tuple[BaseInvestment, ...]
+    non_guaranteed_investments: Tuple[NonGuaranteedInvestment, ...]
+    non_cash_investments: Tuple[NonGuaranteedInvestment, ...]
+    rrsp_investments: Tuple[BaseInvestment, ...]
+    cash_investment: Optional[Cash]
+
+    @classmethod
+    def create(cls, instruments: InstrumentDict) -> "PortfolioIndex":
+        loans = tuple(i for i in instruments.values() if isinstance(i, Loan))
+        investments = tuple(
+            i for i in instruments.values() if isinstance(i, BaseInvestment)
+        )
+        non_guaranteed_investments = tuple(
+            i for i in instruments.values() if isinstance(i, NonGuaranteedInvestment)
+        )
+        return cls(
+            instruments=instruments,
+            version=instruments.version,
+            loans=loans,
+            non_mortgage_loans=tuple(l for l in loans if not isinstance(l, Mortgage)),
+            loans_by_id={loan.id_: loan for loan in loans},
+            investments=investments,
+            non_guaranteed_investments=non_guaranteed_investments,
+            non_cash_investments=tuple(
+                i for i in non_guaranteed_investments if not isinstance(i, Cash)
+            ),
+            rrsp_investments=tuple(
+                i for i in investments if i.account_type == InvestmentAccountType.RRSP
+            ),
+            cash_investment=next(
+                (i for i in non_guaranteed_investments if isinstance(i, Cash)), None
+            ),
+        )
+
+    def is_valid_for(self, instruments: InstrumentDict) -> bool:
+        return self.instruments is instruments and self.version == instruments.version
+
+    def __deepcopy__(self, memo):
+        # a deep copied portfolio has new instruments so its index is rebuilt on first use
+        return None
 
 
 class Portfolio(BaseModel):
     instruments: Dict[UUID, Instrument] = dict()
+    _index: Optional[PortfolioIndex] = PrivateAttr(default=None)
 
     @validator("instruments", pre=True)
     def list_to_dict(cls, v):
@@ -46,42 +140,53 @@ class Portfolio(BaseModel):
         v[cash.id_] = cash
         return v
 
+    @validator("instruments")
+    def to_instrument_dict(cls, v):
+        return InstrumentDict(v)
+
     @property
-    def loans(self) -> List[Loan]:
-        return list(l for l in self.instruments.values() if isinstance(l, Loan))
+    def index(self) -> "PortfolioIndex":
+        """the instruments by kind - rebuilt when the instruments are replaced or written to"""
+        if not isinstance(self.instruments, InstrumentDict):
+            # a plain dictionary was assigned to the instruments
+            self.instruments = InstrumentDict(self.instruments)
+        if self._index is None or not self._index.is_valid_for(self.instruments):
+            self._index = PortfolioIndex.create(self.instruments)
+        return self._index
+
+    def add_instrument(self, instrument: Instrument):
+        add_to_dict(instrument.id_, self.instruments, instrument)
+
+    def remove_instrument(self, id_: UUID):
+        remove_from_dict(id_, self.instruments)
 
     @property
-    def non_mortgage_loans(self) -> List[Loan]:
-        return list(l for l in self.loans if not isinstance(l, Mortgage))
+    def loans(self) -> Tuple[Loan, ...]:
+        return self.index.loans
 
     @property
-    def loans_by_id(self) -> Dict[UUID, Loan]:
-        return {loan.id_: loan for loan in self.loans}
+    def non_mortgage_loans(self) -> Tuple[Loan, ...]:
+        return self.index.non_mortgage_loans
 
     @property
-    def rrsp_investments(self) -> List[BaseInvestment]:
-        return list(
-            i for i in self.investments if i.account_type == InvestmentAccountType.RRSP
-        )
+    def loans_by_id(self) -> Mapping[UUID, Loan]:
+        # read only so that the callers can not change the index
+        return MappingProxyType(self.index.loans_by_id)
 
     @property
-    def investments(self):
-        return list(
-            i for i in self.instruments.values() if isinstance(i, BaseInvestment)
-        )
+    def rrsp_investments(self) -> Tuple[BaseInvestment, ...]:
+        return self.index.rrsp_investments
 
-    def non_guaranteed_investments(self) -> List[NonGuaranteedInvestment]:
-        return list(
-            i
-            for i in self.instruments.values()
-            if isinstance(i, NonGuaranteedInvestment)
-        )
+    @property
+    def investments(self) -> Tuple[BaseInvestment, ...]:
+        return self.index.investments
+
+    def non_guaranteed_investments(self) -> Tuple[NonGuaranteedInvestment, ...]:
+        return self.index.non_guaranteed_investments
 
     @property
-    def non_cash_investments(self) -> List[NonGuaranteedInvestment]:
-        return list(
-            i for i in self.non_guaranteed_investments() if not isinstance(i, Cash)
-        )
+    def non_cash_investments(self) -> Tuple[NonGuaranteedInvestment, ...]:
+        return self.index.non_cash_investments
 
     def get_loan(self, loan_name: str) -> Loan:
         return get_value_from_dict(loan_name, self.instruments)
@@ -118,10 +223,10 @@ class Portfolio(BaseModel):
 
     @property
     def cash_investment(self):
-        for investment in self.non_guaranteed_investments():
-            if isinstance(investment, Cash):
-                return investment
-        raise ValueError("No cash investment exists")
+        cash_investment = self.index.cash_investment
+        if cash_investment is None:
+            raise ValueError("No cash investment exists")
+        return cash_investment
 
     @property
     def has_loans(self):
@@ -6,7 +6,6 @@ from pennies.model.instrument import Instrument
 from pennies.model.investment import GuaranteedInvestment, NonGuaranteedInvestment
 from pennies.model.loan import Loan, RevolvingLoan
 from pennies.model.portfolio import Portfolio
-from pennies.utilities.dict import remove_from_dict
 
 
 class PortfolioManager:
@@ -56,7 +55,7 @@ class PortfolioManager:
     def _remove_paid_off_loans(cls, portfolio: Portfolio) -> None:
         paid_off_loans = [loan for loan in portfolio.loans if loan.is_paid_off()]
         for loan in paid_off_loans:
-            remove_from_dict(loan.id_, portfolio.instruments)
+            portfolio.remove_instrument(loan.id_)
 
     @classmethod
     def _incur_portfolio_interest(cls, portfolio: Portfolio, month: int):
@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+
+from pennies.model.constants import InvestmentAccountType
+from pennies.model.instrument import Instrument
+from pennies.model.investment import (
+    BaseInvestment,
+    GuaranteedInvestment,
+    NonGuaranteedInvestment,
+)
+from pennies.model.loan import Loan, RevolvingLoan
+from pennies.model.portfolio import Portfolio
+from pennies.model.taxes import CAPITAL_GAINS_TAX_FRACTION
+
+# the same tolerances as the portfolio manager
+PAYMENT_TOLERANCE = 0.01
+PAID_OFF_TOLERANCE = 0.1
+
+
+@dataclass
+class PortfolioSimulation:
+    """The balances of every instrument at the start of every simulated month"""
+
+    instruments: List[Instrument]
+    months: List[int]
+    balances: np.ndarray
+    # instrument x (month + 1) - the last column is the balance after the last month
+    is_active: np.ndarray
+    # instrument x (month + 1) - paid off loans are removed from the portfolio
+
+    def get_portfolio(self, index: int) -> Portfolio:
+        """the portfolio at the start of the month - the instruments are shallow copies with the simulated balance"""
+        return Portfolio.construct(
+            instruments={
+                instrument.id_: instrument.copy(
+                    update={"current_balance": float(self.balances[i, index])}
+                )
+                for i, instrument in enumerate(self.instruments)
+                if self.is_active[i, index]
+            }
+        )
+
+    def get_final_portfolio(self) -> Portfolio:
+        return self.get_portfolio(len(self.months))
+
+
+@dataclass
+class PortfolioSimulator:
+    """
+    Forwards a portfolio through a payment plan like the portfolio manager, but keeps the balances in an
+    instrument x month array so that interest, payments, withdrawals and pay offs are applied to every
+    instrument at once
+    """
+
+    instruments: List[Instrument]
+    months: List[int]
+    instrument_indices: Dict[UUID, int]
+    interest_rates: np.ndarray
+    # instrument x month - guaranteed investments stop growing after they mature
+    is_loan: np.ndarray
+    is_guaranteed: np.ndarray
+    can_withdraw: np.ndarray
+    # instrument x month
+
+    @classmethod
+    def create(cls, portfolio: Portfolio, months: List[int]) -> "PortfolioSimulator":
+        instruments = list(portfolio.instruments.values())
+        interest_rates = np.array(
+            [i.get_monthly_interest_rates(months) for i in instruments], dtype=float,
+        ).reshape(len(instruments), len(months))
+        is_guaranteed = cls._get_mask(instruments, GuaranteedInvestment)
+        month_array = np.array(months, dtype=float)
+        final_months = np.array(
+            [np.inf if i.final_month is None else i.final_month for i in instruments],
+            dtype=float,
+        )[:, None]
+        interest_rates[is_guaranteed[:, None] & (month_array > final_months)] = 0
+        can_withdraw = (
+            cls._get_mask(instruments, RevolvingLoan)
+            | cls._get_mask(instruments, NonGuaranteedInvestment)
+        )[:, None] | (is_guaranteed[:, None] & (month_array >= final_months))
+        return cls(
+            instruments=instruments,
+            months=list(months),
+            instrument_indices={i.id_: index for index, i in enumerate(instruments)},
+            interest_rates=interest_rates,
+            is_loan=cls._get_mask(instruments, Loan),
+            is_guaranteed=is_guaranteed,
+            can_withdraw=can_withdraw,
+        )
+
+    @classmethod
+    def _get_mask(cls, instruments: List[Instrument], type_) -> np.ndarray:
+        return np.array([isinstance(i, type_) for i in instruments], dtype=bool)
+
+    def get_instrument_mask(self, ids: List[UUID]) -> np.ndarray:
+        mask = np.zeros(len(self.instruments), dtype=bool)
+        mask[[self.instrument_indices[id_] for id_ in ids]] = True
+        return mask
+
+    def get_account_type_mask(self, account_type: InvestmentAccountType) -> np.ndarray:
+        return np.array(
+            [
+                isinstance(i, BaseInvestment) and i.account_type == account_type
+                for i in self.instruments
+            ],
+            dtype=bool,
+        )
+
+    def to_array(
+        self, monthly_values: List[Dict[UUID, float]], is_strict: bool = False
+    ) -> np.ndarray:
+        """
+        instrument x month array of the payments or withdrawals
+        values for instruments that are not in the portfolio are dropped unless strict
+        """
+        values = np.zeros((len(self.instruments), len(self.months)))
+        for index, month_values in enumerate(monthly_values):
+            for id_, value in month_values.items():
+                i = self.instrument_indices.get(id_)
+                if i is None:
+                    if is_strict:
+                        raise KeyError(f"{id_} is not in the portfolio")
+                    continue
+                values[i, index] = value
+        return values
+
+    def to_key_mask(self, monthly_values: List[Dict[UUID, float]]) -> np.ndarray:
+        """instrument x month mask of the instruments that have a payment or withdrawal"""
+        mask = np.zeros((len(self.instruments), len(self.months)), dtype=bool)
+        for index, month_values in enumerate(monthly_values):
+            for id_ in month_values:
+                i = self.instrument_indices.get(id_)
+                if i is not None:
+                    mask[i, index] = True
+        return mask
+
+    def get_taxable_withdrawals(self, withdrawals: np.ndarray) -> np.ndarray:
+        """
+        vectorized estimate_taxable_withdrawal - the capital gains of a non-registered investment in a month
+        are estimated from its growth since the first simulated month
+        """
+        growth = np.ones((len(self.instruments), len(self.months)))
+        if len(self.months) > 1:
+            growth[:, 1:] = np.cumprod(1 + self.interest_rates[:, :-1], axis=1)
+        capital_gains_fraction = np.divide(
+            growth - 1, growth, out=np.zeros_like(growth), where=growth > 0
+        )
+        is_rrsp = self.get_account_type_mask(InvestmentAccountType.RRSP)
+        is_tfsa = self.get_account_type_mask(InvestmentAccountType.TFSA)
+        is_investment = self._get_mask(self.instruments, BaseInvestment)
+        is_non_registered = is_investment & ~is_rrsp & ~is_tfsa
+        taxable_withdrawals = np.zeros_like(withdrawals)
+        taxable_withdrawals[is_rrsp] = withdrawals[is_rrsp]
+        taxable_withdrawals[is_non_registered] = (
+            withdrawals[is_non_registered]
+            * capital_gains_fraction[is_non_registered]
+            * CAPITAL_GAINS_TAX_FRACTION
+        )
+        return taxable_withdrawals
+
+    def simulate(
+        self, payments: np.ndarray, withdrawals: Optional[np.ndarray] = None
+    ) -> PortfolioSimulation:
+        """the month to month recursion - every step updates all of the instruments"""
+        num_instruments, num_months = len(self.instruments), len(self.months)
+        if withdrawals is None:
+            withdrawals = np.zeros((num_instruments, num_months))
+        payments = np.where(np.abs(payments) <= PAYMENT_TOLERANCE, 0, payments)
+        if np.any(self.is_guaranteed[:, None] & (payments != 0)):
+            raise ValueError("Cannot execute payments for guaranteed investments")
+        if np.any(~self.can_withdraw & (withdrawals != 0)):
+            raise ValueError(
+                "Cannot withdraw from a loan or a guaranteed investment that has not matured"
+            )
+
+        balances = np.zeros((num_instruments, num_months + 1))
+        is_active = np.zeros((num_instruments, num_months + 1), dtype=bool)
+        balances[:, 0] = [i.current_balance for i in self.instruments]
+        is_active[:, 0] = True
+        for t in range(num_months):
+            balance = balances[:, t].copy()
+            active = is_active[:, t]
+            balance += balance * self.interest_rates[:, t]
+            payment = np.where(active, payments[:, t], 0)
+            is_paying_off = self.is_loan & (payment != 0) & (payment >= np.abs(balance))
+            balance = np.where(is_paying_off, 0, balance + payment)
+            balance -= np.where(active, withdrawals[:, t], 0)
+            balances[:, t + 1] = balance
+            is_active[:, t + 1] = active & ~(
+                self.is_loan & (np.abs(balance) <= PAID_OFF_TOLERANCE)
+            )
+        return PortfolioSimulation(
+            instruments=self.instruments,
+            months=self.months,
+            balances=balances,
+            is_active=is_active,
+        )
@@ -1,3 +1,4 @@
+import numpy as np
 from pydantic import BaseModel
 
 from pennies.utilities.datetime import MONTHS_IN_YEAR
@@ -6,6 +7,9 @@ CURRENT_PRIME = 2.5
 FUTURE_PRIME_START_YEAR = 3
 FUTURE_EXPECTED_PRIME = 2.5
 
+# the prime forecast is the same for every rate so one curve is shared by all of them
+_PRIME_CURVE = np.zeros(0)
+
 
 class PrimeInterestRateForecast(BaseModel):
     def get_prime(self, month: int):
@@ -13,3 +17,18 @@ class PrimeInterestRateForecast(BaseModel):
             return CURRENT_PRIME
         else:
             return FUTURE_EXPECTED_PRIME
+
+    @classmethod
+    def get_prime_curve(cls, num_months: int) -> np.ndarray:
+        """the prime of every month from month zero - read only, at least num_months long"""
+        global _PRIME_CURVE
+        if len(_PRIME_CURVE) < num_months:
+            months = np.arange(num_months)
+            curve = np.where(
+                months <= FUTURE_PRIME_START_YEAR * MONTHS_IN_YEAR,
+                CURRENT_PRIME,
+                FUTURE_EXPECTED_PRIME,
+            ).astype(float)
+            curve.setflags(write=False)
+            _PRIME_CURVE = curve
+        return _PRIME_CURVE
@@ -1,8 +1,15 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Dict, Optional, NewType
 from uuid import UUID
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, root_validator
 
+from pennies.model.instrument import Instrument
+from pennies.model.investment import NonGuaranteedInvestment, Cash
+from pennies.model.loan import Loan
 from pennies.model.portfolio import Portfolio
 from pennies.model.problem_input import ProblemInput
 from pennies.utilities.dict import get_value_from_dict
@@ -90,67 +97,296 @@ class MonthlySolution(BaseModel):
         return sum(w for w in self.withdrawals.values())
 
 
+@dataclass
+class MonthlySolutionColumns:
+    """
+    The monthly solutions of a plan stored column-wise. The instruments are stored once and the balances,
+    payments and withdrawals are instrument x month arrays - portfolios are only built when a month is accessed
+    """
+
+    instruments: List[Instrument]
+    months: np.ndarray
+    balances: np.ndarray
+    # instrument x month - the balance at the start of the month
+    is_active: np.ndarray
+    # instrument x month - paid off loans are removed from the portfolio
+    interest_rates: np.ndarray
+    payments: np.ndarray
+    has_payment: np.ndarray
+    # instrument x month - the instruments that are keyed in the monthly payments
+    withdrawals: np.ndarray
+    has_withdrawal: np.ndarray
+    leftover: np.ndarray
+    taxes_paid: np.ndarray
+    gross_income: np.ndarray
+    taxable_income: np.ndarray
+
+    @classmethod
+    def from_monthly_solutions(
+        cls, monthly_solutions: List[MonthlySolution]
+    ) -> "MonthlySolutionColumns":
+        instruments_by_id: Dict[UUID, Instrument] = dict()
+        for ms in monthly_solutions:
+            for id_, instrument in ms.portfolio.instruments.items():
+                instruments_by_id.setdefault(id_, instrument)
+        instruments = list(instruments_by_id.values())
+        instrument_indices = {id_: i for i, id_ in enumerate(instruments_by_id)}
+        shape = (len(instruments), len(monthly_solutions))
+        balances = np.zeros(shape)
+        is_active = np.zeros(shape, dtype=bool)
+        payments = np.zeros(shape)
+        has_payment = np.zeros(shape, dtype=bool)
+        withdrawals = np.zeros(shape)
+        has_withdrawal = np.zeros(shape, dtype=bool)
+        for t, ms in enumerate(monthly_solutions):
+            for id_, instrument in ms.portfolio.instruments.items():
+                balances[instrument_indices[id_], t] = instrument.current_balance
+                is_active[instrument_indices[id_], t] = True
+            for id_, payment in ms.allocation.payments.items():
+                if id_ in instrument_indices:
+                    payments[instrument_indices[id_], t] = payment
+                    has_payment[instrument_indices[id_], t] = True
+            for id_, withdrawal in ms.withdrawals.items():
+                if id_ in instrument_indices:
+                    withdrawals[instrument_indices[id_], t] = withdrawal
+                    has_withdrawal[instrument_indices[id_], t] = True
+        months = np.array([ms.month for ms in monthly_solutions], dtype=int)
+        return cls(
+            instruments=instruments,
+            months=months,
+            balances=balances,
+            is_active=is_active,
+            interest_rates=np.array(
+                [i.get_monthly_interest_rates(months) for i in instruments],
+                dtype=float,
+            ).reshape(shape),
+            payments=payments,
+            has_payment=has_payment,
+            withdrawals=withdrawals,
+            has_withdrawal=has_withdrawal,
+            leftover=np.array([ms.allocation.leftover for ms in monthly_solutions]),
+            taxes_paid=np.array([ms.taxes_paid for ms in monthly_solutions]),
+            gross_income=np.array([ms.gross_income for ms in monthly_solutions]),
+            taxable_income=np.array([ms.taxable_income for ms in monthly_solutions]),
+        )
+
+    @classmethod
+    def concatenate(
+        cls, columns: List["MonthlySolutionColumns"]
+    ) -> "MonthlySolutionColumns":
+        """instruments that are missing from some of the columns are inactive in those months"""
+        instruments_by_id: Dict[UUID, Instrument] = dict()
+        for c in columns:
+            for instrument in c.instruments:
+                instruments_by_id.setdefault(instrument.id_, instrument)
+        instrument_indices = {id_: i for i, id_ in enumerate(instruments_by_id)}
+
+        def concatenate_arrays(attribute: str) -> np.ndarray:
+            arrays = []
+            for c in columns:
+                array = getattr(c, attribute)
+                aligned = np.zeros((len(instruments_by_id), len(c)), dtype=array.dtype)
+                aligned[[instrument_indices[i.id_] for i in c.instruments]] = array
+                arrays.append(aligned)
+            return np.concatenate(arrays, axis=1)
+
+        return cls(
+            instruments=list(instruments_by_id.values()),
+            months=np.concatenate([c.months for c in columns]),
+            balances=concatenate_arrays("balances"),
+            is_active=concatenate_arrays("is_active"),
+            interest_rates=concatenate_arrays("interest_rates"),
+            payments=concatenate_arrays("payments"),
+            has_payment=concatenate_arrays("has_payment"),
+            withdrawals=concatenate_arrays("withdrawals"),
+            has_withdrawal=concatenate_arrays("has_withdrawal"),
+            leftover=np.concatenate([c.leftover for c in columns]),
+            taxes_paid=np.concatenate([c.taxes_paid for c in columns]),
+            gross_income=np.concatenate([c.gross_income for c in columns]),
+            taxable_income=np.concatenate([c.taxable_income for c in columns]),
+        )
+
+    def __len__(self):
+        return len(self.months)
+
+    @cached_property
+    def instrument_indices(self) -> Dict[UUID, int]:
+        return {instrument.id_: i for i, instrument in enumerate(self.instruments)}
+
+    @cached_property
+    def is_loan(self) -> np.ndarray:
+        return np.array([isinstance(i, Loan) for i in self.instruments], dtype=bool)
+
+    @cached_property
+    def is_non_guaranteed_investment(self) -> np.ndarray:
+        return np.array(
+            [isinstance(i, NonGuaranteedInvestment) for i in self.instruments],
+            dtype=bool,
+        )
+
+    @property
+    def active_balances(self) -> np.ndarray:
+        """instrument x month balances with zeros for the instruments that are not in the portfolio"""
+        return np.where(self.is_active, self.balances, 0)
+
+    @property
+    def active_interest(self) -> np.ndarray:
+        """instrument x month interest incurred on the balance at the start of the month"""
+        return np.where(self.is_active, self.balances * self.interest_rates, 0)
+
+    @cached_property
+    def is_cash(self) -> np.ndarray:
+        return np.array([isinstance(i, Cash) for i in self.instruments], dtype=bool)
+
+    def get_instrument_at(self, id_: UUID, index: int) -> Optional[Instrument]:
+        """the instrument with its balance at the start of the month - none if it is not in the portfolio"""
+        i = self.instrument_indices.get(id_)
+        if i is None or not self.is_active[i, index]:
+            return None
+        return self.instruments[i].copy(
+            update={"current_balance": float(self.balances[i, index])}
+        )
+
+    def get_portfolio(self, index: int) -> Portfolio:
+        return Portfolio.construct(
+            instruments={
+                instrument.id_: instrument.copy(
+                    update={"current_balance": float(self.balances[i, index])}
+                )
+                for i, instrument in enumerate(self.instruments)
+                if self.is_active[i, index]
+            }
+        )
+
+    def get_monthly_solution(self, index: int) -> MonthlySolution:
+        return MonthlySolution.construct(
+            month=int(self.months[index]),
+            portfolio=self.get_portfolio(index),
+            allocation=MonthlyAllocation.construct(
+                payments=self._get_instrument_values(
+                    self.payments, self.has_payment, index
+                ),
+                leftover=float(self.leftover[index]),
+            ),
+            taxes_paid=float(self.taxes_paid[index]),
+            gross_income=float(self.gross_income[index]),
+            taxable_income=float(self.taxable_income[index]),
+            withdrawals=self._get_instrument_values(
+                self.withdrawals, self.has_withdrawal, index
+            ),
+        )
+
+    def _get_instrument_values(
+        self, values: np.ndarray, has_value: np.ndarray, index: int
+    ) -> Dict[UUID, float]:
+        return {
+            instrument.id_: float(values[i, index])
+            for i, instrument in enumerate(self.instruments)
+            if has_value[i, index]
+        }
+
+
+class MonthlySolutions(Sequence):
+    """A read-only list of the monthly solutions of a plan that are built from the columns on access"""
+
+    def __init__(self, columns: MonthlySolutionColumns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("monthly solution index out of range")
+        return self.columns.get_monthly_solution(index)
+
+
 class FinancialPlan(BaseModel):
-    monthly_solutions: List[MonthlySolution]
+    columns: MonthlySolutionColumns
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @root_validator(pre=True)
+    def monthly_solutions_to_columns(cls, values):
+        monthly_solutions = values.pop("monthly_solutions", None)
+        if monthly_solutions is not None:
+            values["columns"] = MonthlySolutionColumns.from_monthly_solutions(
+                monthly_solutions
+            )
+        return values
+
+    @property
+    def monthly_solutions(self) -> MonthlySolutions:
+        return MonthlySolutions(self.columns)
+
+    @property
+    def net_worths(self) -> np.ndarray:
+        return self.columns.active_balances.sum(axis=0)
+
+    @property
+    def debts(self) -> np.ndarray:
+        return np.abs(self.columns.active_balances[self.columns.is_loan].sum(axis=0))
 
     def get_total_payments(self):
-        return sum(ms.get_total_payments() for ms in self.monthly_solutions)
+        return float(self.columns.payments.sum())
 
     def get_net_worth(self):
-        if len(self.monthly_solutions) == 0:
+        if len(self.columns) == 0:
             return 0
-        return self.monthly_solutions[-1].get_value()
+        return float(self.net_worths[-1])
 
     def get_net_worth_at(self, month: int):
-        return self.monthly_solutions[month - 1].get_value()
+        return float(self.columns.active_balances[:, month - 1].sum())
 
     def get_total_interest_paid_on_loans(self):
-        return sum(
-            ms.get_total_loans_interest(ms.month) for ms in self.monthly_solutions
-        )
+        return float(self.columns.active_interest[self.columns.is_loan].sum())
 
     def get_total_interest_earned_on_investments(self):
-        return sum(
-            ms.get_total_investments_interest(ms.month) for ms in self.monthly_solutions
+        columns = self.columns
+        return float(
+            columns.active_interest[columns.is_non_guaranteed_investment].sum()
         )
 
     def get_total_interest(self):
-        return sum(ms.get_total_interest(ms.month) for ms in self.monthly_solutions)
+        return float(self.columns.active_interest.sum())
 
     def get_interest_paid_on_loan(self, id_: UUID):
-        return sum(
-            abs(ms.get_loan_interest_incurred(id_)) for ms in self.monthly_solutions
-        )
+        i = self.columns.instrument_indices.get(id_)
+        if i is None:
+            return 0
+        return float(np.abs(self.columns.active_interest[i]).sum())
 
     @property
     def retirement_month(self) -> int:
-        if len(self.monthly_solutions) == 0:
+        if len(self.columns) == 0:
             return 0
-        return len(self.monthly_solutions)  # TODO: this is wrong!
+        return len(self.columns)  # TODO: this is wrong!
 
     @property
     def first_positive_net_worth_month(self) -> Optional[int]:
-        for month, ms in enumerate(self.monthly_solutions):
-            net_worth = ms.portfolio.net_worth
-            if net_worth <= _ALMOST_ZERO_LOWER_BOUND:
-                continue
-            return month + 1
-        return None
+        return _get_first_month_or_none(self.net_worths > _ALMOST_ZERO_LOWER_BOUND)
 
     @property
     def debt_free_month(self) -> Optional[int]:
-        for month, ms in enumerate(self.monthly_solutions):
-            debt = ms.portfolio.get_debt()
-            if debt >= _ALMOST_ZERO_UPPER_BOUND:
-                continue
-            return month + 1
-        return None
+        return _get_first_month_or_none(self.debts < _ALMOST_ZERO_UPPER_BOUND)
 
     def get_total_income_taxes_paid(self):
-        return sum(ms.taxes_paid for ms in self.monthly_solutions)
+        return float(self.columns.taxes_paid.sum())
 
     def get_total_withdrawals(self):
-        return sum(ms.get_total_withdrawals() for ms in self.monthly_solutions)
+        return float(self.columns.withdrawals.sum())
+
+
+def _get_first_month_or_none(is_month: np.ndarray) -> Optional[int]:
+    """the first month (starting at one) that satisfies the condition"""
+    if not is_month.any():
+        return None
+    return int(np.argmax(is_month)) + 1
 
 
 class Solution(BaseModel):
@@ -1,5 +1,6 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
+import numpy as np
 from pydantic.main import BaseModel
 
 from pennies.model.constants import Province
@@ -27,6 +28,7 @@ class TaxBracket(BaseModel):
 class IncomeTaxBrackets(BaseModel):
     data: List[TaxBracket]
     _cumulative_incomes: List[float] = None
+    _monthly_bracket_arrays: Tuple[np.ndarray, np.ndarray] = None
 
     @property
     def num_brackets(self):
@@ -42,6 +44,20 @@ class IncomeTaxBrackets(BaseModel):
             self._cumulative_incomes = cumulative_incomes
         return self._cumulative_incomes[bracket_index]
 
+    def get_monthly_bracket_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """the monthly marginal upper bound and the marginal tax rate fraction of every bracket"""
+        if self._monthly_bracket_arrays is None:
+            # assigned together so that concurrent plans never see half of the arrays
+            self._monthly_bracket_arrays = (
+                np.array(
+                    [bracket.monthly_marginal_upper_bound for bracket in self.data]
+                ),
+                np.array(
+                    [bracket.marginal_tax_rate_as_fraction for bracket in self.data]
+                ),
+            )
+        return self._monthly_bracket_arrays
+
     class Config:
         underscore_attrs_are_private = True
 
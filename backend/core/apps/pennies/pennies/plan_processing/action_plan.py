@@ -3,7 +3,8 @@ from typing import List
 from pydantic import BaseModel
 
 from pennies.model.loan import Loan
-from pennies.model.solution import FinancialPlan, MonthlySolution
+from pennies.model.solution import MonthlySolution
+from pennies.plan_processing.scan import PlanScan
 
 
 class Payment(BaseModel):
@@ -20,12 +21,12 @@ class ActionPlan(BaseModel):
 
 class ActionPlanFactory:
     @classmethod
-    def from_plan(cls, plan: FinancialPlan) -> ActionPlan:
-        if len(plan.monthly_solutions) == 0:
+    def from_scan(cls, scan: PlanScan) -> ActionPlan:
+        if scan.first_solution is None:
             raise ValueError("Cannot process plan with now monthly allocations")
         return ActionPlan(
-            monthly_allowance=cls.get_monthly_allowance(plan.monthly_solutions[0]),
-            payments=cls.get_payments(plan.monthly_solutions[0]),
+            monthly_allowance=cls.get_monthly_allowance(scan.first_solution),
+            payments=cls.get_payments(scan.first_solution),
         )
 
     @classmethod
@@ -6,17 +6,11 @@ from typing import Optional, List
 from pydantic import BaseModel
 
 from pennies.model.goal import BigPurchase, NestEgg
-from pennies.model.instrument import Instrument
 from pennies.model.investment import NonGuaranteedInvestment
 from pennies.model.loan import Loan
 from pennies.model.problem_input import ProblemInput
-from pennies.model.solution import FinancialPlan, MonthlySolution
-from pennies.plan_processing.utilities import (
-    get_loan_pay_off_date,
-    get_actual_big_purchase_amount_and_withdrawals,
-    get_nest_egg_completion_month_or_none,
-    get_nest_egg_cash_balance_requirements,
-)
+from pennies.plan_processing.scan import PlanScan
+from pennies.plan_processing.utilities import get_nest_egg_cash_balance_requirements
 from pennies.utilities.datetime import (
     get_first_date_of_next_month,
     get_date_plus_month,
@@ -30,7 +24,6 @@ Plan failure types:
     - not meeting goals on time
 """
 
-_ALMOST_ZERO = 1
 _TOLERANCE = 0.01
 _ALLOWED_LOAN_PAYMENT_FAILURES = 4
 
@@ -142,31 +135,31 @@ PlanFailures = List[PlanFailure]
 
 class PlanFailuresFactory:
     @classmethod
-    def create(cls, plan: FinancialPlan, problem_input: ProblemInput):
+    def create(cls, scan: PlanScan, problem_input: ProblemInput):
         start_date = get_first_date_of_next_month(datetime.today()).date()
         failures = list()
-        failures.extend(cls.get_loan_defaults(plan, problem_input, start_date))
+        failures.extend(cls.get_loan_defaults(scan, problem_input, start_date))
         failures.extend(
-            cls.get_loan_min_payment_failures(plan, problem_input, start_date)
+            cls.get_loan_min_payment_failures(scan, problem_input, start_date)
         )
         failures.extend(
             cls.get_pre_authorized_contribution_failures(
-                plan, problem_input, start_date
+                scan, problem_input, start_date
             )
         )
-        failures.extend(cls.get_goal_failures(plan, problem_input, start_date))
+        failures.extend(cls.get_goal_failures(scan, problem_input, start_date))
         return failures
 
     @classmethod
     def get_loan_defaults(
-        cls, plan: FinancialPlan, problem_input: ProblemInput, start_date: date
+        cls, scan: PlanScan, problem_input: ProblemInput, start_date: date
     ) -> List[PlanFailure]:
         failures = []
         for loan in problem_input.user_finances.portfolio.loans:
             final_month = (
                 loan.final_month or problem_input.user_finances.portfolio.final_month
             )
-            pay_off_date = get_loan_pay_off_date(loan, plan, start_date)
+            pay_off_date = scan.get_pay_off_date(loan.id_, start_date)
             final_date = get_date_plus_month(start_date, final_month)
             if pay_off_date is None or pay_off_date > final_date:
                 # unable to pay off loan on time
@@ -177,13 +170,11 @@ class PlanFailuresFactory:
 
     @classmethod
     def get_loan_min_payment_failures(
-        cls, plan: FinancialPlan, problem_input: ProblemInput, start_date: date
+        cls, scan: PlanScan, problem_input: ProblemInput, start_date: date
     ) -> List[PlanFailure]:
         failures = []
         for loan in problem_input.user_finances.portfolio.loans:
-            missed_payment_dates = cls.get_missed_payment_dates(
-                loan, plan.monthly_solutions, start_date
-            )
+            missed_payment_dates = scan.get_missed_payment_dates(loan.id_, start_date)
             num_missed_payments = len(missed_payment_dates)
             if num_missed_payments > _ALLOWED_LOAN_PAYMENT_FAILURES:
                 failures.append(
@@ -193,40 +184,16 @@ class PlanFailuresFactory:
                 )
         return failures
 
-    @classmethod
-    def get_missed_payment_dates(
-        cls,
-        instrument: Instrument,
-        monthly_solutions: List[MonthlySolution],
-        start_date: date,
-    ):
-        missed_payment_dates = list()
-        for ms in monthly_solutions:
-            instrument = ms.portfolio.get_instrument_or_none(instrument.id_)
-            if instrument is None:
-                break  # loan has been paid off
-            if instrument.current_balance > -_ALMOST_ZERO:
-                break  # loan has been paid off pretty much
-            expected_loan_payment = instrument.get_minimum_monthly_payment(ms.month)
-            if expected_loan_payment < 10:
-                continue
-            loan_payment = ms.get_loan_payment(instrument.id_)
-            if expected_loan_payment - 2 <= loan_payment:
-                continue  # met the minimum monthly payment
-            missed_payment_date = get_date_plus_month(start_date, ms.month)
-            missed_payment_dates.append(missed_payment_date)
-        return missed_payment_dates
-
     @classmethod
     def get_pre_authorized_contribution_failures(
-        cls, plan: FinancialPlan, problem_input: ProblemInput, start_date: date
+        cls, scan: PlanScan, problem_input: ProblemInput, start_date: date
     ) -> List[PlanFailure]:
         failures = []
         for (
             investment
         ) in problem_input.user_finances.portfolio.non_guaranteed_investments():
-            missed_payment_dates = cls.get_missed_payment_dates(
-                investment, plan.monthly_solutions, start_date
+            missed_payment_dates = scan.get_missed_payment_dates(
+                investment.id_, start_date
             )
             if missed_payment_dates:
                 failures.append(
@@ -238,7 +205,7 @@ class PlanFailuresFactory:
 
     @classmethod
     def get_goal_failures(
-        cls, plan: FinancialPlan, problem_input: ProblemInput, start_date: date
+        cls, scan: PlanScan, problem_input: ProblemInput, start_date: date
     ) -> List[PlanFailure]:
         failures = []
         goals = problem_input.user_finances.goals
@@ -251,9 +218,7 @@ class PlanFailuresFactory:
                 amount_needed = cash_balance_dict.get(goal.id_)
                 if amount_needed is None:
                     continue
-                completion_month = get_nest_egg_completion_month_or_none(
-                    goal, plan, amount_needed
-                )
+                completion_month = scan.nest_egg_completion_months.get(goal.id_)
                 expected_date = get_date_plus_month(start_date, goal.due_month)
                 if completion_month is None:
                     failure = PlanFailure.make_failed_nest_egg_goal(
@@ -267,7 +232,7 @@ class PlanFailuresFactory:
                     )
                     failures.append(failure)
             elif isinstance(goal, BigPurchase):
-                amount, _ = get_actual_big_purchase_amount_and_withdrawals(goal, plan)
+                amount, _ = scan.big_purchases[goal.id_]
                 if amount < goal.amount - _TOLERANCE:
                     failure = PlanFailure.make_failed_big_purchase_goal(goal, amount)
                     failures.append(failure)
@@ -8,13 +8,8 @@ from pydantic import BaseModel
 from pennies.model.goal import AllGoalTypes, NestEgg, BigPurchase
 from pennies.model.loan import Loan
 from pennies.model.problem_input import ProblemInput
-from pennies.model.solution import FinancialPlan
-from pennies.plan_processing.utilities import (
-    get_loan_pay_off_date,
-    get_nest_egg_completion_month_or_none,
-    get_actual_big_purchase_amount_and_withdrawals,
-    get_nest_egg_cash_balance_requirements,
-)
+from pennies.plan_processing.scan import PlanScan
+from pennies.plan_processing.utilities import get_nest_egg_cash_balance_requirements
 from pennies.utilities.datetime import (
     get_first_date_of_next_month,
     get_months_difference,
@@ -171,14 +166,14 @@ class MilestoneFactory:
 
 class PlanMilestonesFactory:
     @classmethod
-    def create(cls, plan: FinancialPlan, problem_input: ProblemInput) -> PlanMilestones:
+    def create(cls, scan: PlanScan, problem_input: ProblemInput) -> PlanMilestones:
         start_date = get_first_date_of_next_month(datetime.today()).date()
         milestones = list()
-        milestones.extend(cls.get_loan_payoff_milestones(plan, start_date))
-        debt_free_milestone = cls.get_debt_free_milestone(plan, start_date)
+        milestones.extend(cls.get_loan_payoff_milestones(scan, start_date))
+        debt_free_milestone = cls.get_debt_free_milestone(scan, start_date)
         if debt_free_milestone is not None:
             milestones.append(debt_free_milestone)
-        positive_net_worth_ms = cls.get_positive_net_worth_milestone(plan, start_date)
+        positive_net_worth_ms = cls.get_positive_net_worth_milestone(scan, start_date)
         if positive_net_worth_ms is not None:
             milestones.append(positive_net_worth_ms)
         retirement_month = (
@@ -186,11 +181,11 @@ class PlanMilestonesFactory:
         )
         retirement_milestone = MilestoneFactory.make_retirement_milestone(
             retirement_date=get_date_plus_month(start_date, retirement_month),
-            net_worth=plan.get_net_worth_at(retirement_month),
+            net_worth=scan.plan.get_net_worth_at(retirement_month),
         )
         milestones.append(retirement_milestone)
         goal_milestones = cls.get_goal_milestones(
-            plan, problem_input.user_finances.goals, start_date
+            scan, problem_input.user_finances.goals, start_date
         )
         milestones.extend(goal_milestones)
 
@@ -202,21 +197,21 @@ class PlanMilestonesFactory:
 
     @classmethod
     def get_loan_payoff_milestones(
-        cls, plan: FinancialPlan, start_date: date
+        cls, scan: PlanScan, start_date: date
     ) -> List[Milestone]:
-        if len(plan.monthly_solutions) == 0:
+        if scan.first_solution is None:
             return list()
         all_loans = list(
             loan
-            for loan in plan.monthly_solutions[0].portfolio.loans
+            for loan in scan.first_solution.portfolio.loans
             if loan.current_balance < 0
         )
         milestones = list()
         for loan in all_loans:
-            payoff_date = get_loan_pay_off_date(loan, plan, start_date)
+            payoff_date = scan.get_pay_off_date(loan.id_, start_date)
             if payoff_date is None:
                 continue
-            interest_paid = plan.get_interest_paid_on_loan(loan.id_)
+            interest_paid = scan.get_interest_paid(loan.id_)
             milestones.append(
                 MilestoneFactory.make_loan_pay_off_milestone(
                     loan, payoff_date, interest_paid
@@ -226,12 +221,12 @@ class PlanMilestonesFactory:
 
     @classmethod
     def get_debt_free_milestone(
-        cls, plan: FinancialPlan, start_date: date
+        cls, scan: PlanScan, start_date: date
     ) -> Optional[Milestone]:
-        starting_portfolio = plan.monthly_solutions[0].portfolio
+        starting_portfolio = scan.first_solution.portfolio
         if len(starting_portfolio.loans) == 0:
             return None  # if they don't have any loans they are already debt free
-        month = plan.debt_free_month
+        month = scan.plan.debt_free_month
         if month is None:
             return None
         debt_free_date = get_date_plus_month(start_date, month)
@@ -239,12 +234,12 @@ class PlanMilestonesFactory:
 
     @classmethod
     def get_positive_net_worth_milestone(
-        cls, plan: FinancialPlan, start_date: date
+        cls, scan: PlanScan, start_date: date
     ) -> Optional[Milestone]:
-        starting_portfolio = plan.monthly_solutions[0].portfolio
+        starting_portfolio = scan.first_solution.portfolio
         if len(starting_portfolio.loans) == 0:
             return None  # if they don't have any loans they already have a positive net worth
-        month = plan.first_positive_net_worth_month
+        month = scan.plan.first_positive_net_worth_month
         if month is None:
             return None
         milestone_date = get_date_plus_month(start_date, month)
@@ -252,14 +247,12 @@ class PlanMilestonesFactory:
 
     @classmethod
     def get_nest_egg_milestones(
-        cls, goals: Dict[UUID, NestEgg], plan: FinancialPlan, start_date: date
+        cls, goals: Dict[UUID, NestEgg], scan: PlanScan, start_date: date
     ) -> List[Milestone]:
         milestones = list()
         nest_egg_requirements = get_nest_egg_cash_balance_requirements(goals=goals)
-        for goal, amount_needed in nest_egg_requirements:
-            completion_month = get_nest_egg_completion_month_or_none(
-                goal, plan, amount_needed
-            )
+        for goal, _ in nest_egg_requirements:
+            completion_month = scan.nest_egg_completion_months.get(goal.id_)
             if completion_month is None:
                 continue
             else:
@@ -274,7 +267,7 @@ class PlanMilestonesFactory:
 
     @classmethod
     def get_big_purchase_milestones(
-        cls, goals: Dict[UUID, AllGoalTypes], plan: FinancialPlan, start_date: date
+        cls, goals: Dict[UUID, AllGoalTypes], scan: PlanScan, start_date: date
     ):
         milestones = list()
         big_purchase_goals = [
@@ -282,10 +275,7 @@ class PlanMilestonesFactory:
         ]
         big_purchase_goals = sorted(big_purchase_goals, key=lambda x: x.due_month)
         for goal in big_purchase_goals:
-            (
-                actual_purchase,
-                withdrawals,
-            ) = get_actual_big_purchase_amount_and_withdrawals(goal, plan)
+            actual_purchase, withdrawals = scan.big_purchases[goal.id_]
             milestone = MilestoneFactory.make_big_purchase_milestone(
                 goal=goal,
                 goal_due_date=get_date_plus_month(start_date, goal.due_month),
@@ -297,15 +287,15 @@ class PlanMilestonesFactory:
 
     @classmethod
     def get_goal_milestones(
-        cls, plan: FinancialPlan, goals: Dict[UUID, AllGoalTypes], start_date: date
+        cls, scan: PlanScan, goals: Dict[UUID, AllGoalTypes], start_date: date
     ) -> List[Milestone]:
         milestones = list()
         milestones.extend(
-            cls.get_nest_egg_milestones(goals=goals, plan=plan, start_date=start_date)
+            cls.get_nest_egg_milestones(goals=goals, scan=scan, start_date=start_date)
         )
         milestones.extend(
             cls.get_big_purchase_milestones(
-                goals=goals, plan=plan, start_date=start_date
+                goals=goals, scan=scan, start_date=start_date
             )
         )
         return milestones
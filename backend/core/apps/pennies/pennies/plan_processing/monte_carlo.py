@@ -0,0 +1,250 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from pydantic import BaseModel
+
+from pennies.model.goal import AllGoalTypes, BigPurchase
+from pennies.model.problem_input import ProblemInput
+from pennies.model.solution import FinancialPlan
+from pennies.plan_processing.net_worth_forecast import SAMPLE_RATE
+from pennies.plan_processing.utilities import get_nest_egg_cash_balance_requirements
+from pennies.utilities.datetime import (
+    MONTHS_IN_YEAR,
+    get_date_plus_month,
+    get_first_date_of_next_month,
+)
+
+NET_WORTH_PERCENTILES = [5, 25, 50, 75, 95]
+DOLLAR_TOLERANCE = 1
+MIN_MONTHLY_RETURN = -0.99
+# a month can not lose more than the whole balance
+
+
+class NetWorthBand(BaseModel):
+    percentile: int
+    data: List[float]
+
+
+class GoalSuccessProbability(BaseModel):
+    goal_id: UUID
+    name: str
+    probability: float
+
+
+class MonteCarloForecast(BaseModel):
+    num_paths: int
+    labels: List[date]
+    net_worth_bands: List[NetWorthBand]
+    goal_success_probabilities: List[GoalSuccessProbability]
+    retirement_shortfall_probability: float
+    # the fraction of paths that overdraw an investment after retirement
+
+
+@dataclass
+class MonteCarloSimulation:
+    """The balances of every path at the start of every month - [path x month + 1] so the last column is the end"""
+
+    months: np.ndarray
+    net_worths: np.ndarray
+    investment_balances: Dict[int, np.ndarray]
+    # instrument index -> path x (month + 1) - only for the volatile investments
+    cash_balances: np.ndarray
+
+    @property
+    def num_paths(self) -> int:
+        return self.net_worths.shape[0]
+
+
+@dataclass
+class MonteCarloSimulator:
+    """
+    Replays the payments and withdrawals of a finished plan with random monthly returns for the investments that
+    have a volatility. Loans, guaranteed investments and steady investments follow their plan balances because the
+    schedule fixes them.
+
+    The monthly return of a volatile investment is normally distributed around its monthly interest rate with an
+    annual standard deviation of its volatility. The returns of different investments are independent, and the paths
+    come in antithetic pairs.
+    """
+
+    plan: FinancialPlan
+    volatile_instruments: List[int]
+    monthly_volatilities: np.ndarray
+
+    @classmethod
+    def create(cls, plan: FinancialPlan) -> "MonteCarloSimulator":
+        columns = plan.columns
+        volatilities = np.array(
+            [i.volatility for i in columns.instruments], dtype=float
+        )
+        is_volatile = columns.is_non_guaranteed_investment & (volatilities > 0)
+        return cls(
+            plan=plan,
+            volatile_instruments=np.flatnonzero(is_volatile).tolist(),
+            monthly_volatilities=volatilities / 100 / np.sqrt(MONTHS_IN_YEAR),
+        )
+
+    def simulate(
+        self, num_paths: int, rng: Optional[np.random.Generator] = None
+    ) -> MonteCarloSimulation:
+        """
+        the balance recursion b[t + 1] = b[t] * (1 + r[t]) + c[t] is stepped one month at a time for all of the paths
+        and volatile investments at once. The arrays are month x investment x path so that every step only touches
+        contiguous memory, and the path x month arrays of the simulation are transposed views of them.
+        The second half of the paths are antithetic - they mirror the normal draws of the first half, which halves
+        the draws and lowers the variance of the bands
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        columns = self.plan.columns
+        num_months = len(columns)
+        final_balances = self._get_final_balances()
+        balances = np.concatenate([columns.active_balances, final_balances], axis=1)
+        volatile_instruments = self.volatile_instruments
+
+        num_draws = (num_paths + 1) // 2
+        draws = rng.standard_normal((num_months, len(volatile_instruments), num_draws))
+        monthly_volatilities = self.monthly_volatilities[volatile_instruments][:, None]
+        mean_growths = 1 + columns.interest_rates[volatile_instruments].T[:, :, None]
+        contributions = (
+            columns.payments[volatile_instruments]
+            - columns.withdrawals[volatile_instruments]
+        ).T[:, :, None]
+
+        path_balances = np.empty((num_months + 1, len(volatile_instruments), num_paths))
+        path_balances[0] = balances[volatile_instruments, :1]
+        growth = np.empty((len(volatile_instruments), 2 * num_draws))
+        returns = np.empty((len(volatile_instruments), num_draws))
+        for month in range(num_months):
+            np.multiply(draws[month], monthly_volatilities, out=returns)
+            np.add(mean_growths[month], returns, out=growth[:, :num_draws])
+            np.subtract(mean_growths[month], returns, out=growth[:, num_draws:])
+            np.maximum(growth, 1 + MIN_MONTHLY_RETURN, out=growth)
+            next_balances = path_balances[month + 1]
+            np.multiply(path_balances[month], growth[:, :num_paths], out=next_balances)
+            next_balances += contributions[month]
+
+        is_deterministic = np.ones(len(columns.instruments), dtype=bool)
+        is_deterministic[volatile_instruments] = False
+        is_volatile_cash = columns.is_cash[volatile_instruments]
+        deterministic_balances = balances[is_deterministic].sum(axis=0)
+        deterministic_cash = balances[is_deterministic & columns.is_cash].sum(axis=0)
+        net_worths = path_balances.sum(axis=1)
+        net_worths += deterministic_balances[:, None]
+        cash_balances = path_balances[:, is_volatile_cash].sum(axis=1)
+        cash_balances += deterministic_cash[:, None]
+        return MonteCarloSimulation(
+            months=np.append(columns.months, columns.months[-1] + 1),
+            net_worths=net_worths.T,
+            investment_balances={
+                i: path_balances[:, index].T
+                for index, i in enumerate(volatile_instruments)
+            },
+            cash_balances=cash_balances.T,
+        )
+
+    def _get_final_balances(self) -> np.ndarray:
+        """the balances after the last month of the plan"""
+        columns = self.plan.columns
+        final = columns.balances[:, -1] * (1 + columns.interest_rates[:, -1])
+        final += columns.payments[:, -1] - columns.withdrawals[:, -1]
+        final = np.where(columns.is_loan & (final >= 0), 0, final)
+        return np.where(columns.is_active[:, -1], final, 0)[:, None]
+
+
+class MonteCarloForecastFactory:
+    @classmethod
+    def create(
+        cls,
+        plan: FinancialPlan,
+        problem_input: ProblemInput,
+        num_paths: int,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Optional[MonteCarloForecast]:
+        if len(plan.columns) == 0:
+            return None
+        simulation = MonteCarloSimulator.create(plan).simulate(num_paths, rng)
+        sampled_net_worths = simulation.net_worths[:, :-1:SAMPLE_RATE]
+        bands = np.percentile(sampled_net_worths, NET_WORTH_PERCENTILES, axis=0)
+        cur_date: date = get_first_date_of_next_month(datetime.today())
+        return MonteCarloForecast(
+            num_paths=num_paths,
+            labels=[
+                get_date_plus_month(cur_date, index * SAMPLE_RATE)
+                for index in range(sampled_net_worths.shape[1])
+            ],
+            net_worth_bands=[
+                NetWorthBand(
+                    percentile=percentile, data=[round(value) for value in band]
+                )
+                for percentile, band in zip(NET_WORTH_PERCENTILES, bands.tolist())
+            ],
+            goal_success_probabilities=cls._get_goal_success_probabilities(
+                plan, simulation, problem_input.user_finances.goals
+            ),
+            retirement_shortfall_probability=cls._get_retirement_shortfall_probability(
+                simulation,
+                problem_input.user_finances.financial_profile.retirement_month,
+            ),
+        )
+
+    @classmethod
+    def _get_index(cls, simulation: MonteCarloSimulation, month: int) -> int:
+        return int(np.clip(month - simulation.months[0], 0, len(simulation.months) - 1))
+
+    @classmethod
+    def _get_goal_success_probabilities(
+        cls,
+        plan: FinancialPlan,
+        simulation: MonteCarloSimulation,
+        goals: Dict[UUID, AllGoalTypes],
+    ) -> List[GoalSuccessProbability]:
+        """
+        a nest egg succeeds when the cash covers it by the due month and a big purchase succeeds when none of the
+        investments that pay for it are overdrawn by the withdrawal
+        """
+        probabilities = list()
+        for goal, amount_needed in get_nest_egg_cash_balance_requirements(goals):
+            index = cls._get_index(simulation, goal.due_month)
+            is_success = (
+                simulation.cash_balances[:, index] >= amount_needed - DOLLAR_TOLERANCE
+            )
+            probabilities.append(
+                GoalSuccessProbability(
+                    goal_id=goal.id_,
+                    name=goal.name,
+                    probability=float(np.mean(is_success)),
+                )
+            )
+        columns = plan.columns
+        for goal in goals.values():
+            if not isinstance(goal, BigPurchase):
+                continue
+            index = cls._get_index(simulation, goal.due_month)
+            is_success = np.ones(simulation.num_paths, dtype=bool)
+            if index < len(columns):
+                for i in np.flatnonzero(columns.withdrawals[:, index] > 0).tolist():
+                    balances = simulation.investment_balances.get(i)
+                    if balances is not None:
+                        is_success &= balances[:, index + 1] >= -DOLLAR_TOLERANCE
+            probabilities.append(
+                GoalSuccessProbability(
+                    goal_id=goal.id_,
+                    name=goal.name,
+                    probability=float(np.mean(is_success)),
+                )
+            )
+        return probabilities
+
+    @classmethod
+    def _get_retirement_shortfall_probability(
+        cls, simulation: MonteCarloSimulation, retirement_month: int
+    ) -> float:
+        index = cls._get_index(simulation, retirement_month)
+        is_shortfall = np.zeros(simulation.num_paths, dtype=bool)
+        for balances in simulation.investment_balances.values():
+            is_shortfall |= balances[:, index:].min(axis=1) < -DOLLAR_TOLERANCE
+        return float(np.mean(is_shortfall))
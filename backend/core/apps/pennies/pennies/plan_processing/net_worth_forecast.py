@@ -1,14 +1,13 @@
 from datetime import datetime, date
 from typing import List
-from uuid import UUID
 
 from pydantic import BaseModel
 
 from pennies.model.loan import Loan
-from pennies.model.solution import FinancialPlan, MonthlySolution
+from pennies.plan_processing.scan import PlanScan
 from pennies.utilities.datetime import get_first_date_of_next_month, get_date_plus_month
 
-_SAMPLE_RATE = 6  # months
+SAMPLE_RATE = 6  # months
 
 
 class InstrumentForecast(BaseModel):
@@ -25,41 +24,26 @@ class NetWorthForecast(BaseModel):
 
 class NetWorthForecastFactory:
     @classmethod
-    def from_plan(cls, plan: FinancialPlan) -> NetWorthForecast:
-
-        sampled_monthly_solutions = list(
-            ms for i, ms in enumerate(plan.monthly_solutions) if i % _SAMPLE_RATE == 0
-        )
-
+    def from_scan(cls, scan: PlanScan) -> NetWorthForecast:
         return NetWorthForecast(
-            datasets=cls._get_instrument_forecasts(sampled_monthly_solutions),
-            labels=cls._get_all_datetime(sampled_monthly_solutions),
+            datasets=cls._get_instrument_forecasts(scan),
+            labels=cls._get_all_datetime(scan.sampled_balances.shape[1]),
         )
 
     @classmethod
-    def _get_all_datetime(cls, monthly_solutions: List[MonthlySolution]) -> List[date]:
+    def _get_all_datetime(cls, num_samples: int) -> List[date]:
         cur_date: date = get_first_date_of_next_month(datetime.today())
         return list(
-            get_date_plus_month(cur_date, index * _SAMPLE_RATE)
-            for index in range(len(monthly_solutions))
+            get_date_plus_month(cur_date, index * SAMPLE_RATE)
+            for index in range(num_samples)
         )
 
     @classmethod
-    def _get_instrument_forecasts(
-        cls, monthly_solutions: List[MonthlySolution]
-    ) -> List[InstrumentForecast]:
-
-        if len(monthly_solutions) == 0:
+    def _get_instrument_forecasts(cls, scan: PlanScan) -> List[InstrumentForecast]:
+        if scan.first_solution is None:
             return list()
 
-        def get_instrument_balance_or_zero(id_: UUID, ms: MonthlySolution):
-            instrument = ms.portfolio.instruments.get(id_, None)
-            if instrument is None:
-                return 0
-            else:
-                return round(instrument.current_balance)
-
-        instruments = list(monthly_solutions[0].portfolio.instruments.values())
+        columns = scan.plan.columns
         return [
             InstrumentForecast(
                 instrument_id=instrument.db_id,
@@ -67,10 +51,8 @@ class NetWorthForecastFactory:
                 if isinstance(instrument, Loan)
                 else "investment",
                 label=instrument.name,
-                data=[
-                    get_instrument_balance_or_zero(instrument.id_, ms)
-                    for ms in monthly_solutions
-                ],
+                data=[round(balance) for balance in scan.sampled_balances[i].tolist()],
             )
-            for instrument in instruments
+            for i, instrument in enumerate(columns.instruments)
+            if columns.is_active[i, 0]
         ]
@@ -1,8 +1,11 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 from pennies.plan_processing.action_plan import ActionPlan
 from pennies.plan_processing.failures import PlanFailures, PlanFailureType
 from pennies.plan_processing.milestones import PlanMilestones
+from pennies.plan_processing.monte_carlo import MonteCarloForecast
 from pennies.plan_processing.net_worth_forecast import NetWorthForecast
 from pennies.plan_processing.summaries import PlanSummaries
 
@@ -13,6 +16,7 @@ class ProcessedFinancialPlan(BaseModel):
     milestones: PlanMilestones
     action_plan: ActionPlan
     failures: PlanFailures
+    monte_carlo: Optional[MonteCarloForecast] = None
 
     @property
     def has_failed_goal(self) -> bool:
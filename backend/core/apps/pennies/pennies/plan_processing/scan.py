@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from pennies.model.goal import AllGoalTypes, BigPurchase, NestEgg
+from pennies.model.loan import RevolvingLoan, MIN_REVOLVING_LOAN_PAYMENT_THRESHOLD
+from pennies.model.solution import FinancialPlan, MonthlySolution
+from pennies.plan_processing.utilities import get_nest_egg_cash_balance_requirements
+from pennies.utilities.datetime import get_date_plus_month
+
+_ALMOST_ZERO_LOWER_BOUND = -1
+_ALMOST_ZERO = 1
+DOLLAR_TOLERANCE = 1
+MIN_EXPECTED_PAYMENT = 10
+MISSED_PAYMENT_TOLERANCE = 2
+
+
+@dataclass
+class PlanScan:
+    """
+    Everything that the plan processing factories read from the monthly solutions, computed in one pass over the
+    plan columns so that no factory walks the months again
+    """
+
+    plan: FinancialPlan
+    first_solution: Optional[MonthlySolution]
+    sampled_balances: np.ndarray
+    # instrument x sampled month
+    pay_off_months: Dict[UUID, Optional[int]]
+    # the first month (starting at one) that each instrument is paid off or removed from the portfolio
+    missed_payment_months: Dict[UUID, List[int]]
+    interest_paid: Dict[UUID, float]
+    nest_egg_completion_months: Dict[UUID, Optional[int]]
+    big_purchases: Dict[UUID, Tuple[float, List[Tuple[str, float]]]]
+    # the amount withdrawn for each big purchase and the withdrawals by instrument name
+
+    @classmethod
+    def create(
+        cls, plan: FinancialPlan, goals: Dict[UUID, AllGoalTypes], sample_rate: int
+    ) -> "PlanScan":
+        columns = plan.columns
+        instrument_ids = [i.id_ for i in columns.instruments]
+        active_balances = columns.active_balances
+        is_paid_off = ~columns.is_active | (
+            columns.balances >= _ALMOST_ZERO_LOWER_BOUND
+        )
+        pay_off_months = [
+            int(np.argmax(row)) + 1 if row.any() else None for row in is_paid_off
+        ]
+        interest_paid = np.abs(columns.active_interest).sum(axis=1)
+        cash_balances = active_balances[columns.is_cash].sum(axis=0)
+        return cls(
+            plan=plan,
+            first_solution=plan.monthly_solutions[0] if len(columns) else None,
+            sampled_balances=active_balances[:, ::sample_rate],
+            pay_off_months=dict(zip(instrument_ids, pay_off_months)),
+            missed_payment_months=cls._get_missed_payment_months(plan),
+            interest_paid=dict(zip(instrument_ids, interest_paid.tolist())),
+            nest_egg_completion_months={
+                goal.id_: cls._get_nest_egg_completion_month(
+                    goal, plan, cash_balances, amount_needed
+                )
+                for goal, amount_needed in get_nest_egg_cash_balance_requirements(goals)
+            }
+            if len(columns)
+            else dict(),
+            big_purchases={
+                goal.id_: cls._get_big_purchase(goal, plan)
+                for goal in goals.values()
+                if isinstance(goal, BigPurchase)
+            },
+        )
+
+    @classmethod
+    def _get_missed_payment_months(cls, plan: FinancialPlan) -> Dict[UUID, List[int]]:
+        """
+        the months that an outstanding instrument gets less than its minimum payment
+        an instrument stops being checked once its balance is almost zero or it is removed from the portfolio
+        """
+        columns = plan.columns
+        months = columns.months
+        missed_payment_months = dict()
+        for i, instrument in enumerate(columns.instruments):
+            is_outstanding = np.logical_and.accumulate(
+                columns.is_active[i] & (columns.balances[i] <= -_ALMOST_ZERO)
+            )
+            if not is_outstanding.any():
+                missed_payment_months[instrument.id_] = list()
+                continue
+            if isinstance(instrument, RevolvingLoan):
+                min_payments = np.abs(columns.balances[i]) * columns.interest_rates[i]
+                min_payments[min_payments <= MIN_REVOLVING_LOAN_PAYMENT_THRESHOLD] = 0
+            else:
+                min_payments = np.array(
+                    [instrument.get_minimum_monthly_payment(m) for m in months.tolist()]
+                )
+            is_missed = (
+                is_outstanding
+                & (min_payments >= MIN_EXPECTED_PAYMENT)
+                & (min_payments - MISSED_PAYMENT_TOLERANCE > columns.payments[i])
+            )
+            missed_payment_months[instrument.id_] = months[is_missed].tolist()
+        return missed_payment_months
+
+    @classmethod
+    def _get_nest_egg_completion_month(
+        cls,
+        goal: NestEgg,
+        plan: FinancialPlan,
+        cash_balances: np.ndarray,
+        amount_needed: float,
+    ) -> Optional[int]:
+        """the first month (starting at one) from the month before the goal is due that the cash covers the goal"""
+        first_index = max(0, goal.due_month - 1)
+        final_month = int(plan.columns.months[-1])
+        is_complete = (
+            cash_balances[first_index : final_month + 1]
+            >= amount_needed - DOLLAR_TOLERANCE
+        )
+        if is_complete.any():
+            return first_index + int(np.argmax(is_complete)) + 1
+        if len(is_complete) == 0 and 0 >= amount_needed - DOLLAR_TOLERANCE:
+            return first_index
+        return None
+
+    @classmethod
+    def _get_big_purchase(
+        cls, goal: BigPurchase, plan: FinancialPlan
+    ) -> Tuple[float, List[Tuple[str, float]]]:
+        # TODO: how to handle multiple big purchases on the same day???
+        columns = plan.columns
+        index = goal.due_month
+        withdrawal_list = [
+            (instrument.name, float(columns.withdrawals[i, index]))
+            for i, instrument in enumerate(columns.instruments)
+            if columns.has_withdrawal[i, index]
+            and columns.withdrawals[i, index] > 0
+            and columns.is_active[i, index]
+        ]
+        total_purchase = sum(amount for _, amount in withdrawal_list)
+        return total_purchase, withdrawal_list
+
+    def get_pay_off_date(self, instrument_id: UUID, start_date: date) -> Optional[date]:
+        if len(self.plan.columns) == 0:
+            return None
+        month = self.pay_off_months.get(instrument_id, 1)
+        if month is None:
+            return None
+        return get_date_plus_month(start_date, month)
+
+    def get_missed_payment_dates(
+        self, instrument_id: UUID, start_date: date
+    ) -> List[date]:
+        return [
+            get_date_plus_month(start_date, month)
+            for month in self.missed_payment_months.get(instrument_id, [])
+        ]
+
+    def get_interest_paid(self, instrument_id: UUID) -> float:
+        return self.interest_paid.get(instrument_id, 0)
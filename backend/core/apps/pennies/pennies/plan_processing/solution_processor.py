@@ -2,11 +2,17 @@ from pennies.model.problem_input import ProblemInput
 from pennies.plan_processing.action_plan import ActionPlanFactory
 from pennies.plan_processing.failures import PlanFailuresFactory
 from pennies.plan_processing.milestones import PlanMilestonesFactory
-from pennies.plan_processing.net_worth_forecast import NetWorthForecastFactory
+from pennies.plan_processing.monte_carlo import MonteCarloForecastFactory
+from pennies.plan_processing.net_worth_forecast import (
+    NetWorthForecastFactory,
+    SAMPLE_RATE,
+)
 from pennies.plan_processing.plan import ProcessedFinancialPlan
+from pennies.plan_processing.scan import PlanScan
 from pennies.plan_processing.solution import ProcessedSolution
 from pennies.plan_processing.summaries import PlanSummariesFactory
 from pennies.model.solution import Solution, FinancialPlan
+from pennies.utilities.metrics import timed_phase
 
 
 class SolutionProcessor:
@@ -23,10 +29,32 @@ class SolutionProcessor:
     def process_plan(
         cls, plan: FinancialPlan, problem_input: ProblemInput
     ) -> ProcessedFinancialPlan:
+        with timed_phase("plan_scan"):
+            scan = PlanScan.create(
+                plan, problem_input.user_finances.goals, sample_rate=SAMPLE_RATE
+            )
+        with timed_phase("net_worth_forecast"):
+            net_worth = NetWorthForecastFactory.from_scan(scan)
+        with timed_phase("summaries"):
+            summaries = PlanSummariesFactory.from_scan(scan, problem_input)
+        with timed_phase("milestones"):
+            milestones = PlanMilestonesFactory.create(scan, problem_input)
+        with timed_phase("action_plan"):
+            action_plan = ActionPlanFactory.from_scan(scan)
+        with timed_phase("failures"):
+            failures = PlanFailuresFactory.create(scan, problem_input)
+        monte_carlo = None
+        num_paths = problem_input.parameters.monte_carlo_paths
+        if num_paths:
+            with timed_phase("monte_carlo"):
+                monte_carlo = MonteCarloForecastFactory.create(
+                    plan, problem_input, num_paths
+                )
         return ProcessedFinancialPlan(
-            net_worth=NetWorthForecastFactory.from_plan(plan),
-            summaries=PlanSummariesFactory.from_plan(plan, problem_input),
-            milestones=PlanMilestonesFactory.create(plan, problem_input),
-            action_plan=ActionPlanFactory.from_plan(plan),
-            failures=PlanFailuresFactory.create(plan, problem_input),
+            net_worth=net_worth,
+            summaries=summaries,
+            milestones=milestones,
+            action_plan=action_plan,
+            failures=failures,
+            monte_carlo=monte_carlo,
         )
@@ -1,4 +1,3 @@
-from collections import defaultdict
 from datetime import date, datetime
 from typing import List, Optional
 
@@ -6,6 +5,7 @@ from pydantic import BaseModel
 
 from pennies.model.problem_input import ProblemInput
 from pennies.model.solution import FinancialPlan
+from pennies.plan_processing.scan import PlanScan
 from pennies.utilities.datetime import get_first_date_of_next_month, get_date_plus_month
 
 _MAX_LOOKAHEAD_IN_MONTHS = 12
@@ -25,9 +25,8 @@ class PlanSummaries(BaseModel):
 
 class PlanSummariesFactory:
     @classmethod
-    def from_plan(
-        cls, plan: FinancialPlan, problem_input: ProblemInput
-    ) -> PlanSummaries:
+    def from_scan(cls, scan: PlanScan, problem_input: ProblemInput) -> PlanSummaries:
+        plan = scan.plan
         retirement_month = (
             problem_input.user_finances.financial_profile.retirement_month
         )
@@ -46,23 +45,24 @@ class PlanSummariesFactory:
                 round(num_sols * _MAX_LOOKAHEAD_AS_FRACTION_OF_PLAN),
             )
 
-        num_sols = len(plan.monthly_solutions)
+        columns = plan.columns
+        num_sols = len(columns)
         if num_sols == 0:
             return list()
 
         final_index = get_final_lookahead_index(num_sols)
-        total_payments = defaultdict(int)
-        for ms in plan.monthly_solutions[:final_index]:
-            for id_, payment in ms.allocation.payments.items():
-                total_payments[id_] += payment
+        total_payments = columns.payments[:, :final_index].sum(axis=1)
+        has_payment = columns.has_payment[:, :final_index].any(axis=1)
         sorted_payments = sorted(
-            dict(total_payments).items(), key=lambda x: x[1], reverse=True
-        )
-        # TODO: once allocation is keyed on UUID, get instruments from portfolio
-        return list(
-            plan.monthly_solutions[0].portfolio.get_instrument(instrument_id).name
-            for instrument_id, _ in sorted_payments
+            (
+                (instrument, total_payments[i])
+                for i, instrument in enumerate(columns.instruments)
+                if has_payment[i]
+            ),
+            key=lambda x: x[1],
+            reverse=True,
         )
+        return list(instrument.name for instrument, _ in sorted_payments)
 
     @classmethod
     def get_important_dates(cls, plan: FinancialPlan) -> List[_ImportantDate]:
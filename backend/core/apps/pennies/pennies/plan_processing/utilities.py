@@ -1,49 +1,7 @@
-from datetime import date
-from typing import Optional, Tuple, Dict, List
+from typing import Tuple, Dict, List
 from uuid import UUID
 
-from pennies.model.goal import NestEgg, BigPurchase, AllGoalTypes
-from pennies.model.investment import Cash
-from pennies.model.loan import Loan
-from pennies.model.solution import FinancialPlan
-from pennies.utilities.datetime import get_date_plus_month
-
-_ALMOST_ZERO_LOWER_BOUND = -1
-DOLLAR_TOLERANCE = 1
-
-
-def get_loan_pay_off_date(
-    loan: Loan, plan: FinancialPlan, start_date: date
-) -> Optional[date]:
-    for month, ms in enumerate(plan.monthly_solutions):
-        loan_at_month = ms.portfolio.loans_by_id.get(loan.id_, None)
-        if loan_at_month is None:
-            return get_date_plus_month(start_date, month + 1)
-        elif loan_at_month.current_balance >= _ALMOST_ZERO_LOWER_BOUND:
-            return get_date_plus_month(start_date, month + 1)
-    return None
-
-
-def get_nest_egg_completion_month_or_none(
-    goal: NestEgg, plan: FinancialPlan, amount_needed: float
-) -> Optional[int]:
-    current_month = max(0, goal.due_month - 1)
-    final_month = plan.monthly_solutions[-1].month
-    current_cash_balance = 0
-    while current_month <= final_month:
-        current_month += 1
-        monthly_solution = plan.monthly_solutions[current_month - 1]
-        current_cash_balance = sum(
-            i.current_balance
-            for i in monthly_solution.portfolio.non_guaranteed_investments()
-            if isinstance(i, Cash)
-        )
-        if current_cash_balance >= amount_needed - DOLLAR_TOLERANCE:
-            return current_month
-    if current_cash_balance >= amount_needed - DOLLAR_TOLERANCE:
-        return current_month
-    else:
-        return None
+from pennies.model.goal import NestEgg, AllGoalTypes
 
 
 def get_nest_egg_cash_balance_requirements(
@@ -58,18 +16,3 @@ def get_nest_egg_cash_balance_requirements(
         goal = nest_egg_goals[i]
         nest_egg_requirements.append((goal, amount_needed))
     return nest_egg_requirements
-
-
-def get_actual_big_purchase_amount_and_withdrawals(
-    goal: BigPurchase, plan: FinancialPlan
-) -> Tuple[float, List[Tuple[str, float]]]:
-    # TODO: how to handle multiple big purchases on the same day???
-    monthly_withdrawal = plan.monthly_solutions[goal.due_month].withdrawals
-    portfolio = plan.monthly_solutions[goal.due_month].portfolio
-    withdrawal_list = [
-        (portfolio.get_instrument(investment_id).name, amount,)
-        for investment_id, amount in monthly_withdrawal.items()
-        if amount > 0
-    ]
-    total_purchase = sum(amount for _, amount in withdrawal_list)
-    return total_purchase, withdrawal_list
@@ -2,6 +2,8 @@ from collections import defaultdict
 from typing import Dict, Optional, Iterable, List, Tuple
 from uuid import UUID
 
+import numpy as np
+
 from pennies.model.decision_periods import (
     DecisionPeriodsManagerFactory,
     WorkingPeriod,
@@ -15,16 +17,21 @@ from pennies.model.investment import NonGuaranteedInvestment
 from pennies.model.loan import Loan
 from pennies.model.parameters import Parameters
 from pennies.model.portfolio import Portfolio
-from pennies.model.portfolio_manager import PortfolioManager
-from pennies.model.solution import FinancialPlan, MonthlySolution, MonthlyAllocation
+from pennies.model.portfolio_simulator import PortfolioSimulator
+from pennies.model.solution import (
+    FinancialPlan,
+    MonthlyAllocation,
+    MonthlySolutionColumns,
+)
 from pennies.model.user_personal_finances import UserPersonalFinances
 from pennies.strategies.allocation_strategy import PlanningStrategy
-from pennies.strategies.milp.strategy import MILPStrategy
 from pennies.utilities.finance import (
     calculate_loan_ending_payment,
     calculate_average_monthly_interest_rate,
     calculate_monthly_income_tax,
+    calculate_monthly_income_tax_array,
 )
+from pennies.utilities.metrics import timed_phase
 
 DEFAULT_GOAL_SPEND_IN_DEBT = 0.6
 MAX_MILP_SECONDS = 1
@@ -60,35 +67,36 @@ class GreedyPlanningStrategy(PlanningStrategy):
                 working_period=working_period,
             )
 
-            for month, allocation, withdrawal in zip(
-                working_period.months, allocations, withdrawals
-            ):
-                monthly_payments.append(allocation.payments)
-                monthly_withdrawals.append(withdrawal)
-                cur_portfolio = cur_portfolio.copy(deep=True)
-                PortfolioManager.forward_on_month(
-                    cur_portfolio,
-                    payments=allocation.payments,
-                    month=month,
-                    withdrawals=withdrawal,
-                )
+            payments = [allocation.payments for allocation in allocations]
+            monthly_payments.extend(payments)
+            monthly_withdrawals.extend(withdrawals)
+            simulator = PortfolioSimulator.create(cur_portfolio, working_period.months)
+            cur_portfolio = simulator.simulate(
+                simulator.to_array(payments),
+                simulator.to_array(withdrawals, is_strict=True),
+            ).get_final_portfolio()
+            for _ in working_period.months:
                 for goal_id, contribution in goal_contributions.items():
                     total_goal_contributions[goal_id] += contribution
-        monthly_solutions = FinancialPlanFactory.create(
-            monthly_payments,
-            user_finances,
-            parameters,
-            monthly_withdrawals=monthly_withdrawals,
-        ).monthly_solutions
-        milp_monthly_solutions = self.solve_with_milp(
+        with timed_phase("simulation"):
+            greedy_plan = FinancialPlanFactory.create(
+                monthly_payments,
+                user_finances,
+                parameters,
+                monthly_withdrawals=monthly_withdrawals,
+            )
+        milp_plan = self.solve_with_milp(
             start_month,
             cur_portfolio,
             user_finances.financial_profile,
             parameters,
             user_finances.goals,
         )
-        monthly_solutions.extend(milp_monthly_solutions)
-        return FinancialPlan(monthly_solutions=monthly_solutions)
+        return FinancialPlan(
+            columns=MonthlySolutionColumns.concatenate(
+                [greedy_plan.columns, milp_plan.columns]
+            )
+        )
 
     @classmethod
     def _make_decision_periods(
@@ -108,17 +116,19 @@ class GreedyPlanningStrategy(PlanningStrategy):
         financial_profile: FinancialProfile,
         parameters: Parameters,
         goals: Dict[UUID, AllGoalTypes],
-    ) -> List[MonthlySolution]:
+    ) -> FinancialPlan:
+        # the milp strategies warm start from the greedy heuristics so they are imported here
+        from pennies.strategies.milp.strategy import MILPStrategy
+
         milp_parameters = Parameters.parse_obj(
             dict(parameters.dict(), starting_month=start_month)
         )
         user_finances = UserPersonalFinances(
             portfolio=portfolio, financial_profile=financial_profile, goals=goals
         )
-        financial_plan = MILPStrategy().create_plan(
+        return MILPStrategy().create_plan(
             user_finances=user_finances, parameters=milp_parameters
         )
-        return financial_plan.monthly_solutions
 
     def create_allocation_for_working_period(
         self,
@@ -148,10 +158,15 @@ class GreedyHeuristicStrategy(GreedyPlanningStrategy):
     ):
         if len(months) == 0:
             return 0
-        total_monthly_allowance = sum(
-            cls.get_monthly_allowance(financial_profile, month) for month in months
+        savings_fraction = financial_profile.percent_salary_for_spending / 100
+        gross_incomes = np.array(
+            [financial_profile.get_pre_tax_monthly_income(month) for month in months]
+        )
+        taxes = calculate_monthly_income_tax_array(
+            gross_incomes, financial_profile.province_of_residence
         )
-        return total_monthly_allowance / len(months)
+        monthly_allowances = (gross_incomes - taxes) * savings_fraction
+        return sum(monthly_allowances.tolist()) / len(months)
 
     def create_allocation_for_working_period(
         self,
@@ -207,7 +222,7 @@ class GreedyHeuristicStrategy(GreedyPlanningStrategy):
             )
         if allowance and portfolio.non_guaranteed_investments():
             best_investment = self.get_best_investment(
-                portfolio.non_guaranteed_investments(), working_period.months
+                portfolio.non_guaranteed_investments(), working_period.months[0]
             )
             payments[best_investment.id_] += allowance
             allowance = 0
@@ -354,7 +369,7 @@ class GreedyHeuristicStrategy(GreedyPlanningStrategy):
 
     @classmethod
     def get_best_investment(
-        cls, investments: Iterable[NonGuaranteedInvestment], month
+        cls, investments: Iterable[NonGuaranteedInvestment], month: int
     ) -> Optional[NonGuaranteedInvestment]:
         best_investment: Optional[NonGuaranteedInvestment] = None
         for investment in investments:
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from pennies.model.parameters import Parameters
 from pennies.model.user_personal_finances import UserPersonalFinances
@@ -7,6 +8,7 @@ from pennies.strategies.milp.objective import MILPObjective
 from pennies.strategies.milp.parameters import MILPParameters
 from pennies.strategies.milp.sets import MILPSets
 from pennies.strategies.milp.variables import MILPVariables
+from pennies.utilities.metrics import timed_phase
 
 
 @dataclass
@@ -16,21 +18,36 @@ class MILPComponents:
     sets: MILPSets
     parameters: MILPParameters
     variables: MILPVariables
-    constraints: MILPConstraints
+    constraints: Optional[MILPConstraints]
+    # not created when the constraint matrix is assembled directly
     objective: MILPObjective
 
     @classmethod
-    def create(cls, user_finances: UserPersonalFinances, parameters: Parameters):
-        sets = MILPSets.create(
-            user_finances,
-            parameters.max_months_in_payment_horizon,
-            parameters.max_months_in_retirement_period,
-            parameters.starting_month,
-        )
-        milp_parameters = MILPParameters(user_finances, sets, parameters)
-        variables = MILPVariables.create(user_finances, sets)
-        constraints = MILPConstraints.create(sets, milp_parameters, variables)
-        objective = MILPObjective.create(sets, milp_parameters, variables,)
+    def create(
+        cls,
+        user_finances: UserPersonalFinances,
+        parameters: Parameters,
+        is_matrix_milp: bool = False,
+    ):
+        with timed_phase("sets"):
+            sets = MILPSets.create(
+                user_finances,
+                parameters.max_months_in_payment_horizon,
+                parameters.max_months_in_retirement_period,
+                parameters.starting_month,
+            )
+        with timed_phase("milp_parameters"):
+            milp_parameters = MILPParameters(user_finances, sets, parameters)
+        with timed_phase("variables"):
+            variables = MILPVariables.create(user_finances, sets)
+        with timed_phase("constraints"):
+            constraints = (
+                None
+                if is_matrix_milp
+                else MILPConstraints.create(sets, milp_parameters, variables)
+            )
+        with timed_phase("objective"):
+            objective = MILPObjective.create(sets, milp_parameters, variables,)
         return cls(
             sets=sets,
             parameters=milp_parameters,
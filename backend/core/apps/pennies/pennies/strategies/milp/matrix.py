@@ -0,0 +1,1098 @@
+import itertools
+from dataclasses import dataclass
+from math import ceil
+from typing import List, Tuple, Callable
+
+import numpy as np
+import pyomo.environ as pe
+from pyomo.common.collections import ComponentMap
+from pyomo.core import ConcreteModel
+from pyomo.core.base.var import _GeneralVarData
+from pyomo.core.expr.numvalue import value
+from pyomo.repn import generate_standard_repn
+from scipy import sparse
+
+from pennies.model.rrsp import RRIFMinPaymentCalculator
+from pennies.strategies.milp.parameters import MILPParameters
+from pennies.strategies.milp.sets import MILPSets
+from pennies.strategies.milp.variables import MILPVariables
+from pennies.utilities.datetime import MONTHS_IN_YEAR
+from pennies.utilities.finance import (
+    calculate_instrument_balance,
+    estimate_taxable_withdrawal,
+)
+
+
+def get_model_variables(pyomodel: ConcreteModel) -> List[_GeneralVarData]:
+    """the variables of a model in column order"""
+    return list(pyomodel.component_data_objects(pe.Var, active=True))
+
+
+def _as_index_tuple(index) -> Tuple:
+    return index if isinstance(index, tuple) else (index,)
+
+
+@dataclass
+class MILPMatrices:
+    """
+    A MILP in matrix form:
+        optimize c x + objective_offset
+        subject to row_lower <= A x <= row_upper and col_lower <= x <= col_upper
+    The columns are the pyomo variables so that a solution can be loaded back into the model
+    """
+
+    variables: List[_GeneralVarData]
+    a_matrix: sparse.csr_matrix
+    row_lower: np.ndarray
+    row_upper: np.ndarray
+    row_labels: List[Tuple[str, Tuple]]
+    c: np.ndarray
+    objective_offset: float
+    col_lower: np.ndarray
+    col_upper: np.ndarray
+    integrality: np.ndarray
+    is_maximize: bool = True
+
+    @property
+    def num_rows(self) -> int:
+        return self.a_matrix.shape[0]
+
+    @property
+    def num_columns(self) -> int:
+        return len(self.variables)
+
+    @classmethod
+    def from_pyomodel(cls, pyomodel: ConcreteModel) -> "MILPMatrices":
+        """extracts the matrices from the constraints and objective of a rule based pyomo model"""
+        variables = get_model_variables(pyomodel)
+        column_indices = get_column_indices(variables)
+        rows, columns, values = [], [], []
+        row_lower, row_upper, row_labels = [], [], []
+        for c in pyomodel.component_data_objects(pe.Constraint, active=True):
+            repn = generate_standard_repn(c.body, quadratic=False)
+            if not repn.is_linear():
+                raise ValueError(f"Constraint {c.name} is not linear")
+            for coefficient, v in zip(repn.linear_coefs, repn.linear_vars):
+                rows.append(len(row_labels))
+                columns.append(column_indices[v])
+                values.append(coefficient)
+            constant = value(repn.constant)
+            row_lower.append(-np.inf if not c.has_lb() else value(c.lower) - constant)
+            row_upper.append(np.inf if not c.has_ub() else value(c.upper) - constant)
+            row_labels.append(
+                (c.parent_component().local_name, _as_index_tuple(c.index()))
+            )
+        a_matrix = sparse.csr_matrix(
+            (values, (rows, columns)), shape=(len(row_labels), len(variables))
+        )
+        a_matrix.eliminate_zeros()
+        c, objective_offset, is_maximize = extract_objective(pyomodel, column_indices)
+        col_lower, col_upper = get_variable_bounds(variables)
+        return cls(
+            variables=variables,
+            a_matrix=a_matrix,
+            row_lower=np.array(row_lower, dtype=float),
+            row_upper=np.array(row_upper, dtype=float),
+            row_labels=row_labels,
+            c=c,
+            objective_offset=objective_offset,
+            col_lower=col_lower,
+            col_upper=col_upper,
+            integrality=get_integrality(variables),
+            is_maximize=is_maximize,
+        )
+
+
+def get_column_indices(variables: List[_GeneralVarData]) -> ComponentMap:
+    return ComponentMap((v, index) for index, v in enumerate(variables))
+
+
+def get_variable_bounds(
+    variables: List[_GeneralVarData],
+) -> Tuple[np.ndarray, np.ndarray]:
+    lower = np.array([-np.inf if v.lb is None else v.lb for v in variables])
+    upper = np.array([np.inf if v.ub is None else v.ub for v in variables])
+    return lower, upper
+
+
+def get_integrality(variables: List[_GeneralVarData]) -> np.ndarray:
+    return np.array([v.is_integer() or v.is_binary() for v in variables], dtype=bool)
+
+
+def extract_objective(
+    pyomodel: ConcreteModel, column_indices: ComponentMap
+) -> Tuple[np.ndarray, float, bool]:
+    objective = next(pyomodel.component_data_objects(pe.Objective, active=True))
+    repn = generate_standard_repn(objective.expr, quadratic=False)
+    c = np.zeros(len(column_indices))
+    for coefficient, v in zip(repn.linear_coefs, repn.linear_vars):
+        c[column_indices[v]] += coefficient
+    return c, value(repn.constant), objective.sense == pe.maximize
+
+
+NO_COLUMN = -1
+
+
+def _pad(columns: List[List[int]]) -> np.ndarray:
+    """pads the columns of sums with NO_COLUMN so that sums of different lengths can be assembled together"""
+    width = max((len(c) for c in columns), default=0)
+    padded = np.full((len(columns), width), NO_COLUMN, dtype=int)
+    for row, c in enumerate(columns):
+        padded[row, : len(c)] = c
+    return padded
+
+
+class _RowBlocks:
+    """Collects blocks of constraint rows in coordinate form"""
+
+    def __init__(self, num_columns: int):
+        self.num_columns = num_columns
+        self.rows: List[np.ndarray] = []
+        self.columns: List[np.ndarray] = []
+        self.values: List[np.ndarray] = []
+        self.lower: List[np.ndarray] = []
+        self.upper: List[np.ndarray] = []
+        self.labels: List[Tuple[str, Tuple]] = []
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.labels)
+
+    def add(self, name: str, indices: List[Tuple], terms, lower=-np.inf, upper=np.inf):
+        """
+        adds a row for every index - every term is a (columns, coefficients) pair
+            columns: one column per row or a 2d array of columns to sum per row - NO_COLUMN entries are skipped
+            coefficients: a scalar, one coefficient per row or one coefficient per column
+        """
+        num_rows = len(indices)
+        if num_rows == 0:
+            return
+        row_numbers = np.arange(self.num_rows, self.num_rows + num_rows)
+        for columns, coefficients in terms:
+            columns = np.asarray(columns, dtype=int)
+            if columns.ndim == 1:
+                columns = columns[:, None]
+            coefficients = np.asarray(coefficients, dtype=float)
+            if coefficients.ndim == 1:
+                coefficients = coefficients[:, None]
+            coefficients = np.broadcast_to(coefficients, columns.shape)
+            rows = np.broadcast_to(row_numbers[:, None], columns.shape)
+            is_column = columns != NO_COLUMN
+            self.rows.append(rows[is_column])
+            self.columns.append(columns[is_column])
+            self.values.append(coefficients[is_column])
+        self.lower.append(np.broadcast_to(np.asarray(lower, dtype=float), num_rows))
+        self.upper.append(np.broadcast_to(np.asarray(upper, dtype=float), num_rows))
+        self.labels.extend((name, index) for index in indices)
+
+    def to_csr(self) -> sparse.csr_matrix:
+        a_matrix = sparse.coo_matrix(
+            (
+                np.concatenate(self.values + [np.zeros(0)]),
+                (
+                    np.concatenate(self.rows + [np.zeros(0, dtype=int)]),
+                    np.concatenate(self.columns + [np.zeros(0, dtype=int)]),
+                ),
+            ),
+            shape=(self.num_rows, self.num_columns),
+        ).tocsr()
+        # repeated variables in a row are summed the same way pyomo collects the terms of an expression
+        a_matrix.sum_duplicates()
+        a_matrix.eliminate_zeros()
+        return a_matrix
+
+    def get_row_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            np.concatenate(self.lower + [np.zeros(0)]),
+            np.concatenate(self.upper + [np.zeros(0)]),
+        )
+
+
+@dataclass
+class MILPMatrixAssembler:
+    """
+    Computes the MILP matrices straight from the sets and parameters instead of generating and
+    walking a pyomo expression for every constraint.
+    Every block of rows mirrors (and is labelled with) a field of MILPConstraints and the objective
+    mirrors ObjectiveComponents - the two must be kept in sync.
+    """
+
+    sets: MILPSets
+    pars: MILPParameters
+    vars: MILPVariables
+    variables: List[_GeneralVarData]
+
+    column_indices: ComponentMap = None
+
+    def __post_init__(self):
+        self.column_indices = get_column_indices(self.variables)
+
+    def get_columns(self, get_var: Callable, indices: List[Tuple]) -> np.ndarray:
+        return np.array(
+            [self.column_indices[get_var(*index)] for index in indices], dtype=int
+        )
+
+    def get_sum_columns(
+        self, get_var: Callable, indices_per_row: List[List[Tuple]]
+    ) -> np.ndarray:
+        return _pad(
+            [
+                [self.column_indices[get_var(*index)] for index in indices]
+                for indices in indices_per_row
+            ]
+        )
+
+    def get_allocation_sums(self, instruments: List, periods_per_row: List[List[int]]):
+        return self.get_sum_columns(
+            self.vars.get_allocation,
+            [
+                list(itertools.product(instruments, periods))
+                for periods in periods_per_row
+            ],
+        )
+
+    def get_withdrawal_sums(self, investments: List, periods_per_row: List[List[int]]):
+        return self.get_sum_columns(
+            self.vars.get_withdrawal,
+            [
+                list(itertools.product(investments, periods))
+                for periods in periods_per_row
+            ],
+        )
+
+    def get_balance_sums(self, instruments_per_row: List[List], periods: List[int]):
+        return self.get_sum_columns(
+            self.vars.get_balance,
+            [
+                [(i, t) for i in instruments]
+                for instruments, t in zip(instruments_per_row, periods)
+            ],
+        )
+
+    def get_tax_sums(self, periods: List[int]):
+        brackets = list(self.sets.taxing_entities_and_brackets)
+        return self.get_sum_columns(
+            self.vars.get_taxes_accrued_in_bracket,
+            [[(t, e, b) for e, b in brackets] for t in periods],
+        )
+
+    def get_goal_allocation_sums(self, periods: List[int]):
+        return self.get_sum_columns(
+            self.vars.get_goal_allocation,
+            [
+                [
+                    (g,)
+                    for g in self.sets.purchase_goals
+                    if self.pars.get_goal_decision_period(g) == t
+                ]
+                for t in periods
+            ],
+        )
+
+    def get_rrsp_allocation_sums(self, years: List[int]):
+        decision_periods = self.sets.decision_periods
+        return self.get_allocation_sums(
+            self.sets.rrsp_investments,
+            [
+                decision_periods.get_indices_of_decision_period_instance_in_year(y)
+                for y in years
+            ],
+        )
+
+    def get_tfsa_allocation_sums(self, years: List[int]):
+        decision_periods = self.sets.decision_periods
+        return self.get_allocation_sums(
+            self.sets.tfsa_investments,
+            [
+                decision_periods.get_indices_of_decision_period_instance_in_year(y)
+                for y in years
+            ],
+        )
+
+    def add_define_loan_paid_off_indicator(self, blocks: _RowBlocks):
+        indices = list(
+            itertools.product(self.sets.loans, self.sets.working_periods_as_set)
+        )
+        upper_bounds = [self.pars.get_loan_upper_bound(l) for l, _ in indices]
+        blocks.add(
+            "define_loan_paid_off_indicator",
+            indices,
+            [
+                (self.get_columns(self.vars.get_balance, indices), 1),
+                (
+                    self.get_columns(self.vars.get_is_unpaid, indices),
+                    -np.array(upper_bounds),
+                ),
+            ],
+            lower=0,
+        )
+
+    def add_allocate_minimum_payments(self, blocks: _RowBlocks):
+        indices = list(
+            itertools.product(self.sets.instruments, self.sets.working_periods_as_set)
+        )
+        indices = [
+            (i, t) for i, t in indices if not self.pars.get_is_guaranteed_investment(i)
+        ]
+        is_loan = np.array(
+            [not self.pars.get_is_non_guaranteed_investment(i) for i, _ in indices],
+            dtype=bool,
+        )
+        min_payments = np.array(
+            [self.pars.get_minimum_monthly_payment(i, t) for i, t in indices]
+        )
+        # loans that are paid off get enough slack to not need a minimum payment
+        upper_bounds = np.array(
+            [
+                self.pars.get_allocation_upper_bound(t) if loan else 0
+                for (_, t), loan in zip(indices, is_loan)
+            ]
+        )
+        is_unpaid_columns = np.array(
+            [
+                self.column_indices[self.vars.get_is_unpaid(i, t)]
+                if loan
+                else NO_COLUMN
+                for (i, t), loan in zip(indices, is_loan)
+            ],
+            dtype=int,
+        )
+        blocks.add(
+            "allocate_minimum_payments",
+            indices,
+            [
+                (self.get_columns(self.vars.get_min_payment_violation, indices), 1),
+                (self.get_columns(self.vars.get_allocation, indices), 1),
+                (is_unpaid_columns, -upper_bounds),
+            ],
+            lower=min_payments - upper_bounds,
+        )
+
+    def add_define_account_balance(self, blocks: _RowBlocks):
+        first_period = min(self.sets.all_decision_periods_as_set)
+        indices = list(
+            itertools.product(
+                self.sets.instruments, self.sets.all_decision_periods_as_set
+            )
+        )
+        balance_growth, allocation_growth = [], []
+        for i, t in indices:
+            n = self.sets.get_num_months_in_decision_period(t)
+            r = self.pars.get_average_interest_rate(i, t)
+            # the balance is linear in the previous balance and in the net allocation
+            balance_growth.append(calculate_instrument_balance(1, n, r, 0, 0))
+            allocation_growth.append(calculate_instrument_balance(0, n, r, 0, 1))
+        balance_growth = np.array(balance_growth)
+        allocation_growth = np.array(allocation_growth)
+        is_first = np.array([t == first_period for _, t in indices], dtype=bool)
+        previous_balance_columns = np.array(
+            [
+                NO_COLUMN
+                if t == first_period
+                else self.column_indices[self.vars.get_balance(i, t - 1)]
+                for i, t in indices
+            ],
+            dtype=int,
+        )
+        withdrawal_columns = np.array(
+            [
+                self.column_indices[self.vars.get_withdrawal(i, t)]
+                if self.pars.get_is_investment(i)
+                else NO_COLUMN
+                for i, t in indices
+            ],
+            dtype=int,
+        )
+        starting_balances = np.array(
+            [self.pars.get_starting_balance(i) for i, _ in indices]
+        )
+        starting_balance_growth = np.where(
+            is_first, balance_growth * starting_balances, 0
+        )
+        blocks.add(
+            "define_account_balance",
+            indices,
+            [
+                (self.get_columns(self.vars.get_balance, indices), 1),
+                (previous_balance_columns, -balance_growth),
+                (
+                    self.get_columns(self.vars.get_allocation, indices),
+                    -allocation_growth,
+                ),
+                (withdrawal_columns, allocation_growth),
+            ],
+            lower=starting_balance_growth,
+            upper=starting_balance_growth,
+        )
+
+    def add_total_payments_limit(self, blocks: _RowBlocks):
+        periods = list(self.sets.all_decision_periods_as_set)
+        savings_fractions = np.array(
+            [self.pars.get_savings_fraction(t) for t in periods]
+        )
+        incomes = np.array(
+            [self.pars.get_before_tax_monthly_income(t) for t in periods]
+        )
+        savings = -savings_fractions * incomes
+        blocks.add(
+            "total_payments_limit",
+            [(t,) for t in periods],
+            [
+                (
+                    self.get_withdrawal_sums(
+                        self.sets.investments, [[t] for t in periods]
+                    ),
+                    savings_fractions,
+                ),
+                (self.get_tax_sums(periods), -savings_fractions),
+                (self.get_goal_allocation_sums(periods), -savings_fractions),
+                (
+                    self.get_allocation_sums(
+                        self.sets.instruments, [[t] for t in periods]
+                    ),
+                    -1,
+                ),
+            ],
+            lower=savings,
+            upper=savings,
+        )
+
+    def add_loans_are_non_positive(self, blocks: _RowBlocks):
+        indices = list(
+            itertools.product(
+                self.sets.instruments, self.sets.all_decision_periods_as_set
+            )
+        )
+        is_investment = np.array(
+            [self.pars.get_is_investment(i) for i, _ in indices], dtype=bool
+        )
+        blocks.add(
+            "loans_are_non_positive",
+            indices,
+            [(self.get_columns(self.vars.get_balance, indices), 1)],
+            lower=np.where(is_investment, 0, -np.inf),
+            upper=np.where(is_investment, np.inf, 0),
+        )
+
+    def add_pay_off_loans_by_end_date(self, blocks: _RowBlocks):
+        indices = [
+            (l, t)
+            for l, t in itertools.product(
+                self.sets.loans, self.sets.working_periods_as_set
+            )
+            if not self.pars.get_is_before_loan_due_date(l, t)
+        ]
+        blocks.add(
+            "pay_off_loans_by_end_date",
+            indices,
+            [
+                (self.get_columns(self.vars.get_loan_due_date_violation, indices), 1),
+                (self.get_columns(self.vars.get_balance, indices), 1),
+            ],
+            lower=0,
+        )
+
+    def _get_allocation_volatility(self, periods: List[int]):
+        """the allocation columns and volatilities and the volatility of the minimum payments"""
+        investments = self.sets.non_guaranteed_investments
+        volatilities = np.array(
+            [self.pars.get_instrument_volatility(i) for i in investments]
+        )
+        min_payment_volatilities = np.array(
+            [
+                sum(
+                    self.pars.get_minimum_monthly_payment(i, t) * volatility
+                    for i, volatility in zip(investments, volatilities)
+                )
+                for t in periods
+            ]
+        )
+        columns = self.get_allocation_sums(investments, [[t] for t in periods])
+        return columns, volatilities.reshape(1, -1), min_payment_volatilities
+
+    def add_limit_total_risk(self, blocks: _RowBlocks):
+        if not (self.pars.has_investments() and self.pars.has_loans()):
+            return
+        periods = list(self.sets.working_periods_as_set)
+        volatility_limit = self.pars.get_volatility_limit()
+        (
+            columns,
+            volatilities,
+            min_payment_volatilities,
+        ) = self._get_allocation_volatility(periods)
+        allowance_fractions = volatility_limit * np.array(
+            [self.pars.get_savings_fraction(t) for t in periods]
+        )
+        incomes = np.array(
+            [self.pars.get_before_tax_monthly_income(t) for t in periods]
+        )
+        blocks.add(
+            "limit_total_risk",
+            [(t,) for t in periods],
+            [
+                (
+                    self.get_columns(
+                        self.vars.get_total_risk_violation, [(t,) for t in periods]
+                    ),
+                    1,
+                ),
+                (columns, -volatilities),
+                (
+                    self.get_withdrawal_sums(
+                        self.sets.investments, [[t] for t in periods]
+                    ),
+                    allowance_fractions,
+                ),
+                (self.get_tax_sums(periods), -allowance_fractions),
+            ],
+            lower=-min_payment_volatilities - allowance_fractions * incomes,
+        )
+
+    def add_limit_investment_risk(self, blocks: _RowBlocks):
+        if not self.pars.has_investments():
+            return
+        periods = list(self.sets.working_periods_as_set)
+        volatility_limit = self.pars.get_volatility_limit()
+        (
+            columns,
+            volatilities,
+            min_payment_volatilities,
+        ) = self._get_allocation_volatility(periods)
+        blocks.add(
+            "limit_investment_risk",
+            [(t,) for t in periods],
+            [
+                (
+                    self.get_columns(
+                        self.vars.get_investment_risk_violation, [(t,) for t in periods]
+                    ),
+                    1,
+                ),
+                (columns, -volatilities),
+                (
+                    self.get_allocation_sums(
+                        self.sets.investments, [[t] for t in periods]
+                    ),
+                    volatility_limit,
+                ),
+            ],
+            lower=-min_payment_volatilities,
+        )
+
+    def _get_bracket_indices(self) -> List[Tuple[int, str, int]]:
+        return [
+            (t, e, b)
+            for t, (e, b) in itertools.product(
+                self.sets.all_decision_periods_as_set,
+                self.sets.taxing_entities_and_brackets,
+            )
+        ]
+
+    def add_define_taxes_accrued_in_bracket(self, blocks: _RowBlocks):
+        indices = self._get_bracket_indices()
+        rates = np.array(
+            [self.pars.get_bracket_marginal_tax_rate(e, b) for _, e, b in indices]
+        )
+        blocks.add(
+            "define_taxes_accrued_in_bracket",
+            indices,
+            [
+                (self.get_columns(self.vars.get_taxes_accrued_in_bracket, indices), 1),
+                (
+                    self.get_columns(self.vars.get_taxable_income_in_bracket, indices),
+                    -rates,
+                ),
+            ],
+            lower=0,
+        )
+
+    def add_satisfy_retirement_spending_requirement(self, blocks: _RowBlocks):
+        if not self.sets.investments:
+            return
+        periods = list(self.sets.retirement_periods_as_set)
+        blocks.add(
+            "satisfy_retirement_spending_requirement",
+            [(t,) for t in periods],
+            [
+                (
+                    self.get_columns(
+                        self.vars.get_retirement_spending_violation,
+                        [(t,) for t in periods],
+                    ),
+                    1,
+                ),
+                (
+                    self.get_withdrawal_sums(
+                        self.sets.investments, [[t] for t in periods]
+                    ),
+                    1,
+                ),
+            ],
+            lower=[self.pars.get_minimum_monthly_withdrawals(t) for t in periods],
+        )
+
+    def add_zero_allocations_for_guaranteed_investments(self, blocks: _RowBlocks):
+        indices = list(
+            itertools.product(
+                self.sets.guaranteed_investments, self.sets.all_decision_periods_as_set
+            )
+        )
+        blocks.add(
+            "zero_allocations_for_guaranteed_investments",
+            indices,
+            [(self.get_columns(self.vars.get_allocation, indices), 1)],
+            lower=0,
+            upper=0,
+        )
+
+    def add_define_taxable_monthly_income(self, blocks: _RowBlocks):
+        periods = list(self.sets.all_decision_periods_as_set)
+        investments = self.sets.investments
+        starting_month = self.sets.decision_periods.min_month
+        taxable_fractions = np.zeros((len(periods), len(investments)))
+        for row, t in enumerate(periods):
+            final_withdrawal_month = max(self.sets.get_months_in_decision_period(t))
+            for column, i in enumerate(investments):
+                # the taxable withdrawal is linear in the withdrawal
+                taxable_fractions[row, column] = estimate_taxable_withdrawal(
+                    self.pars.get_investment(i),
+                    1,
+                    starting_month,
+                    final_withdrawal_month,
+                )
+        blocks.add(
+            "define_taxable_monthly_income",
+            [(t,) for t in periods],
+            [
+                (
+                    self.get_columns(
+                        self.vars.get_taxable_monthly_income, [(t,) for t in periods]
+                    ),
+                    1,
+                ),
+                (
+                    self.get_withdrawal_sums(investments, [[t] for t in periods]),
+                    -taxable_fractions,
+                ),
+                (
+                    self.get_allocation_sums(
+                        self.sets.rrsp_investments, [[t] for t in periods]
+                    ),
+                    1,
+                ),
+            ],
+            lower=[self.pars.get_before_tax_monthly_income(t) for t in periods],
+        )
+
+    def _add_contribution_limits(
+        self,
+        blocks: _RowBlocks,
+        name: str,
+        get_limit: Callable,
+        starting_limit: float,
+        additional_limits: List[float],
+        withdrawal_sums: np.ndarray,
+        allocation_sums: np.ndarray,
+    ):
+        """this year's limit == last year's limit + additional limit + last year's withdrawals - allocations"""
+        years = self.sets.years
+        first_year = min(years)
+        previous_limit_columns = np.array(
+            [
+                NO_COLUMN if y <= first_year else self.column_indices[get_limit(y - 1)]
+                for y in years
+            ],
+            dtype=int,
+        )
+        right_hand_sides = np.array(additional_limits) + np.array(
+            [starting_limit if y <= first_year else 0 for y in years]
+        )
+        blocks.add(
+            name,
+            [(y,) for y in years],
+            [
+                (self.get_columns(get_limit, [(y,) for y in years]), 1),
+                (previous_limit_columns, -1),
+                (withdrawal_sums, -1),
+                (allocation_sums, 1),
+            ],
+            lower=right_hand_sides,
+            upper=right_hand_sides,
+        )
+
+    def add_define_rrsp_deduction_limits(self, blocks: _RowBlocks):
+        years = self.sets.years
+        first_year = min(years)
+        decision_periods = self.sets.decision_periods
+        withdrawal_sums = self.get_withdrawal_sums(
+            self.sets.rrsp_investments,
+            [
+                []
+                if y <= first_year
+                else decision_periods.get_indices_of_decision_period_instance_in_year(
+                    y - 1
+                )
+                for y in years
+            ],
+        )
+        self._add_contribution_limits(
+            blocks,
+            "define_rrsp_deduction_limits",
+            self.vars.get_rrsp_deduction_limit,
+            self.pars.get_starting_rrsp_deduction_limit(),
+            [self.pars.get_additional_rrsp_limit(y) for y in years],
+            withdrawal_sums,
+            self.get_rrsp_allocation_sums(years),
+        )
+
+    def add_set_minimum_rrif_withdrawals(self, blocks: _RowBlocks):
+        if not self.pars.has_rrsp_investments():
+            return
+        periods = list(self.sets.retirement_periods_as_set)
+        withdrawal_fractions = []
+        for t in periods:
+            max_year = max(self.sets.decision_periods.get_years_in_decision_period(t))
+            max_age = int(ceil(self.pars.get_age(max_year)))
+            payment_percentage = RRIFMinPaymentCalculator.get_min_payment_percentage(
+                max_age
+            )
+            withdrawal_fractions.append(payment_percentage / 100 / MONTHS_IN_YEAR)
+        rrsp_investments = self.sets.rrsp_investments
+        blocks.add(
+            "set_minimum_rrif_withdrawals",
+            [(t,) for t in periods],
+            [
+                (self.get_withdrawal_sums(rrsp_investments, [[t] for t in periods]), 1),
+                (
+                    self.get_balance_sums([rrsp_investments] * len(periods), periods),
+                    -np.array(withdrawal_fractions),
+                ),
+            ],
+            lower=0,
+        )
+
+    def add_define_tfsa_deduction_limits(self, blocks: _RowBlocks):
+        if not self.pars.has_tfsa_investments():
+            return
+        years = self.sets.years
+        first_year = min(years)
+        grouped_by_years = self.sets.decision_periods.grouped_by_years
+        withdrawal_sums = self.get_withdrawal_sums(
+            self.sets.tfsa_investments,
+            [
+                [] if y <= first_year else [dp.index for dp in grouped_by_years[y - 1]]
+                for y in years
+            ],
+        )
+        self._add_contribution_limits(
+            blocks,
+            "define_tfsa_deduction_limits",
+            self.vars.get_tfsa_contribution_limit,
+            self.pars.get_starting_tfsa_contribution_limit(),
+            [self.pars.get_additional_tfsa_limit(y) for y in years],
+            withdrawal_sums,
+            self.get_tfsa_allocation_sums(years),
+        )
+
+    def _get_is_withdrawal_allowed(self, i, t) -> bool:
+        """only allow withdrawals when the user is retired or they have to withdraw money for a goal"""
+        if self.pars.get_is_guaranteed_investment(i):
+            if not self.pars.get_has_guaranteed_investment_matured(i, t):
+                return False
+        return self.pars.get_is_retired(t) or self.pars.get_is_purchase_goal_due(t)
+
+    def add_set_withdrawal_limits(self, blocks: _RowBlocks):
+        indices = [
+            (i, t)
+            for i, t in itertools.product(
+                self.sets.investments, self.sets.all_decision_periods_as_set
+            )
+            if not self._get_is_withdrawal_allowed(i, t)
+        ]
+        blocks.add(
+            "set_withdrawal_limits",
+            indices,
+            [(self.get_columns(self.vars.get_withdrawal, indices), 1)],
+            lower=0,
+            upper=0,
+        )
+
+    def add_limit_monthly_payment(self, blocks: _RowBlocks):
+        indices, max_allocations = [], []
+        for i, t in itertools.product(
+            self.sets.instruments, self.sets.all_decision_periods_as_set
+        ):
+            max_allocation = self.pars.get_max_monthly_payment(i, t)
+            if max_allocation is not None:
+                indices.append((i, t))
+                max_allocations.append(max_allocation)
+        blocks.add(
+            "limit_monthly_payment",
+            indices,
+            [(self.get_columns(self.vars.get_allocation, indices), 1)],
+            upper=max_allocations,
+        )
+
+    def add_same_mortgage_payments(self, blocks: _RowBlocks):
+        first_period = self.sets.decision_periods.min_period_index
+        indices = [
+            (m, t)
+            for m, t in itertools.product(
+                self.sets.mortgages, self.sets.working_periods_as_set
+            )
+            if not self.pars.get_is_after_loan_due_date(m, t)
+        ]
+        blocks.add(
+            "same_mortgage_payments",
+            indices,
+            [
+                (self.get_columns(self.vars.get_allocation, indices), 1),
+                (
+                    self.get_columns(
+                        self.vars.get_allocation,
+                        [(m, first_period) for m, _ in indices],
+                    ),
+                    -1,
+                ),
+            ],
+            lower=0,
+            upper=0,
+        )
+
+    def add_penalize_purchase_goal_violations(self, blocks: _RowBlocks):
+        goals = self.sets.purchase_goals
+        expected_goal_allocations = []
+        for g in goals:
+            t = self.pars.get_goal_decision_period(g)
+            num_months = self.sets.get_num_months_in_decision_period(t)
+            expected_goal_allocations.append(
+                self.pars.get_goal_amount(g, t) / num_months
+            )
+        indices = [(g,) for g in goals]
+        blocks.add(
+            "penalize_purchase_goal_violations",
+            indices,
+            [
+                (self.get_columns(self.vars.get_purchase_goal_violation, indices), 1),
+                (self.get_columns(self.vars.get_goal_allocation, indices), 1),
+            ],
+            lower=expected_goal_allocations,
+        )
+
+    def add_penalize_savings_goal_violations(self, blocks: _RowBlocks):
+        indices = self.sets.savings_goals_and_decision_periods
+        blocks.add(
+            "penalize_savings_goal_violations",
+            indices,
+            [
+                (self.get_columns(self.vars.get_savings_goal_violation, indices), 1),
+                (
+                    self.get_balance_sums(
+                        [
+                            self.sets.get_allowed_investments_for_goal(g)
+                            for g, _ in indices
+                        ],
+                        [t for _, t in indices],
+                    ),
+                    1,
+                ),
+            ],
+            lower=[self.pars.get_goal_amount(g, t) for g, t in indices],
+        )
+
+    def add_bracket_constraints(self, blocks: _RowBlocks):
+        """the piecewise linear income tax brackets"""
+        indices = self._get_bracket_indices()
+        brackets = [(e, b) for _, e, b in indices]
+        marginal_incomes = np.array(
+            [self.pars.get_bracket_marginal_income(e, b) for e, b in brackets]
+        )
+        previous_incomes = np.array(
+            [
+                self.pars.get_previous_bracket_cumulative_income(e, b)
+                for e, b in brackets
+            ]
+        )
+        upper_bounds = np.array(
+            [self.pars.get_taxable_income_upper_bound(e, b) for e, b in brackets]
+        )
+        bracket_incomes = self.get_columns(
+            self.vars.get_taxable_income_in_bracket, indices
+        )
+        incomes = self.get_columns(
+            self.vars.get_taxable_monthly_income, [(t,) for t, _, _ in indices]
+        )
+        indicators = self.get_columns(
+            self.vars.get_income_surplus_greater_than_bracket_band, indices
+        )
+        blocks.add(
+            "bracket_taxable_income_upper_bound1",
+            indices,
+            [(bracket_incomes, 1)],
+            upper=marginal_incomes,
+        )
+        blocks.add(
+            "bracket_taxable_income_upper_bound2",
+            indices,
+            [(bracket_incomes, 1), (incomes, -1)],
+            upper=-previous_incomes,
+        )
+        blocks.add(
+            "bracket_taxable_income_lower_bound1",
+            indices,
+            [(bracket_incomes, 1), (incomes, -1), (indicators, upper_bounds)],
+            lower=-previous_incomes,
+        )
+        blocks.add(
+            "bracket_taxable_income_lower_bound2",
+            indices,
+            [(bracket_incomes, 1), (indicators, -upper_bounds)],
+            lower=marginal_incomes - upper_bounds,
+        )
+        blocks.add(
+            "income_surplus_upper_bound",
+            indices,
+            [(incomes, 1), (indicators, -upper_bounds)],
+            upper=marginal_incomes + previous_incomes,
+        )
+        blocks.add(
+            "bracket_band_upper_bound",
+            indices,
+            [(incomes, 1), (indicators, -upper_bounds)],
+            lower=marginal_incomes + previous_incomes - upper_bounds,
+        )
+
+    def add_set_annual_rrsp_allocation_limit(self, blocks: _RowBlocks):
+        if not self.pars.has_rrsp_investments():
+            return
+        years = self.sets.years
+        blocks.add(
+            "set_annual_rrsp_allocation_limit",
+            [(y,) for y in years],
+            [(self.get_rrsp_allocation_sums(years), 1)],
+            upper=[self.pars.get_additional_rrsp_limit(y) for y in years],
+        )
+
+    def assemble_objective(self) -> np.ndarray:
+        """the coefficients of the maximized objective - see ObjectiveComponents"""
+        c = np.zeros(len(self.variables))
+
+        def add(get_var: Callable, indices: List[Tuple], coefficients):
+            np.add.at(c, self.get_columns(get_var, indices), coefficients)
+
+        working_periods = [(t,) for t in self.sets.working_periods_as_set]
+        all_periods = list(self.sets.all_decision_periods_as_set)
+        mandatory_cost = self.pars.get_mandatory_requirement_violation_cost()
+        risk_cost = self.pars.get_risk_violation_cost()
+        goal_cost = self.pars.get_goal_violation_cost()
+
+        add(self.vars.get_total_risk_violation, working_periods, -risk_cost)
+        add(self.vars.get_investment_risk_violation, working_periods, -risk_cost)
+        add(
+            self.vars.get_loan_due_date_violation,
+            list(itertools.product(self.sets.loans, self.sets.working_periods_as_set)),
+            -mandatory_cost,
+        )
+        add(
+            self.vars.get_retirement_spending_violation,
+            [(t,) for t in self.sets.retirement_periods_as_set],
+            -mandatory_cost,
+        )
+        add(
+            self.vars.get_savings_goal_violation,
+            self.sets.savings_goals_and_decision_periods,
+            -goal_cost,
+        )
+        add(
+            self.vars.get_purchase_goal_violation,
+            [(g,) for g in self.sets.purchase_goals],
+            -goal_cost,
+        )
+        add(
+            self.vars.get_min_payment_violation,
+            list(itertools.product(self.sets.loans, all_periods)),
+            -mandatory_cost,
+        )
+        add(
+            self.vars.get_min_payment_violation,
+            list(itertools.product(self.sets.non_guaranteed_investments, all_periods)),
+            -self.pars.get_preference_violation_cost(),
+        )
+        loan_periods = list(itertools.product(self.sets.loans, all_periods))
+        add(
+            self.vars.get_balance,
+            loan_periods,
+            [
+                self.pars.get_debt_utility_cost()
+                * self.sets.get_num_months_in_decision_period(t)
+                for _, t in loan_periods
+            ],
+        )
+        if self.pars.has_investments():
+            final_period = self.pars.get_final_decision_period_index()
+            add(
+                self.vars.get_balance,
+                [(i, final_period) for i in self.sets.instruments],
+                1,
+            )
+            add(
+                self.vars.get_allocation,
+                list(
+                    itertools.product(
+                        self.sets.registered_investments,
+                        self.sets.working_periods_as_set,
+                    )
+                ),
+                self.pars.get_registered_account_benefit(),
+            )
+        else:
+            indices = list(
+                itertools.product(
+                    self.sets.instruments, self.sets.working_periods_as_set
+                )
+            )
+            add(
+                self.vars.get_balance,
+                indices,
+                [self.pars.get_average_interest_rate(i, t) for i, t in indices],
+            )
+        return c
+
+    def assemble(self) -> MILPMatrices:
+        blocks = _RowBlocks(len(self.variables))
+        self.add_define_loan_paid_off_indicator(blocks)
+        self.add_allocate_minimum_payments(blocks)
+        self.add_define_account_balance(blocks)
+        self.add_total_payments_limit(blocks)
+        self.add_loans_are_non_positive(blocks)
+        self.add_pay_off_loans_by_end_date(blocks)
+        self.add_limit_total_risk(blocks)
+        self.add_limit_investment_risk(blocks)
+        self.add_define_taxes_accrued_in_bracket(blocks)
+        self.add_satisfy_retirement_spending_requirement(blocks)
+        self.add_zero_allocations_for_guaranteed_investments(blocks)
+        self.add_define_taxable_monthly_income(blocks)
+        self.add_define_rrsp_deduction_limits(blocks)
+        self.add_set_minimum_rrif_withdrawals(blocks)
+        self.add_define_tfsa_deduction_limits(blocks)
+        self.add_set_withdrawal_limits(blocks)
+        self.add_limit_monthly_payment(blocks)
+        self.add_same_mortgage_payments(blocks)
+        self.add_penalize_purchase_goal_violations(blocks)
+        self.add_penalize_savings_goal_violations(blocks)
+        self.add_bracket_constraints(blocks)
+        self.add_set_annual_rrsp_allocation_limit(blocks)
+        row_lower, row_upper = blocks.get_row_bounds()
+        col_lower, col_upper = get_variable_bounds(self.variables)
+        return MILPMatrices(
+            variables=self.variables,
+            a_matrix=blocks.to_csr(),
+            row_lower=row_lower,
+            row_upper=row_upper,
+            row_labels=blocks.labels,
+            c=self.assemble_objective(),
+            objective_offset=0,
+            col_lower=col_lower,
+            col_upper=col_upper,
+            integrality=get_integrality(self.variables),
+        )
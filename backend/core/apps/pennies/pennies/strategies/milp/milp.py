@@ -1,5 +1,8 @@
 import logging
+import math
 from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Type, Optional, List
 
 from pyomo import environ as pe
 from pyomo.core import ConcreteModel
@@ -8,11 +11,60 @@ from pennies.model.parameters import Parameters
 from pennies.model.user_personal_finances import UserPersonalFinances
 from pennies.strategies.milp.components import MILPComponents
 from pennies.strategies.milp.constraints import MILPConstraints
+from pennies.strategies.milp.matrix import (
+    MILPMatrices,
+    MILPMatrixAssembler,
+    get_model_variables,
+)
 from pennies.strategies.milp.objective import MILPObjective
 from pennies.strategies.milp.parameters import MILPParameters
 from pennies.strategies.milp.sets import MILPSets
+from pennies.strategies.milp.solver_backends import (
+    SolverBackend,
+    CBCSolverBackend,
+    HiGHSSolverBackend,
+)
 from pennies.strategies.milp.utilities import ConcreteModelBuilder
 from pennies.strategies.milp.variables import MILPVariables
+from pennies.utilities.metrics import (
+    ModelSize,
+    SolverStatistics,
+    get_strategy_metrics,
+    timed_phase,
+)
+
+
+class SolverBackendName(Enum):
+    CBC = "cbc"
+    HIGHS = "highs"
+
+
+_SOLVER_BACKENDS: Dict[str, Type[SolverBackend]] = {
+    SolverBackendName.CBC.value: CBCSolverBackend,
+    SolverBackendName.HIGHS.value: HiGHSSolverBackend,
+}
+
+
+def register_solver_backend(name: str, backend: Type[SolverBackend]):
+    _SOLVER_BACKENDS[name] = backend
+
+
+def get_solver_backend(name: str) -> Type[SolverBackend]:
+    backend = _SOLVER_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"{name} is not a registered solver backend")
+    if not backend.is_available():
+        logging.warning(f"Solver backend {name} is not available; falling back to cbc")
+        return CBCSolverBackend
+    return backend
+
+
+def is_matrix_milp(parameters: Parameters) -> bool:
+    """the pyomo constraints are skipped when assembling the matrix so the backend has to accept matrices"""
+    return (
+        parameters.is_matrix_milp
+        and get_solver_backend(parameters.solver_backend).accepts_matrices
+    )
 
 
 @dataclass
@@ -22,6 +74,8 @@ class MILP:
     problem_parameters: Parameters
     pyomodel: ConcreteModel
     components: MILPComponents
+    solver_backend: Optional[SolverBackend] = None
+    matrices: Optional[MILPMatrices] = None
 
     @property
     def sets(self) -> MILPSets:
@@ -48,19 +102,88 @@ class MILP:
         cls, user_finances: UserPersonalFinances, parameters: Parameters
     ) -> "MILP":
         milp_components = MILPComponents.create(
-            user_finances=user_finances, parameters=parameters
+            user_finances=user_finances,
+            parameters=parameters,
+            is_matrix_milp=is_matrix_milp(parameters),
         )
-        builder = ConcreteModelBuilder()
-        m = builder.build(
-            constraints=milp_components.constraints.as_list,
+        return cls.build(
+            user_finances,
+            parameters,
+            milp_components,
+            constraints=milp_components.constraints.as_list
+            if milp_components.constraints is not None
+            else [],
             variables=milp_components.variables.as_list,
-            objective=milp_components.objective.obj,
         )
-        return MILP(
-            problem_parameters=parameters,
-            user_finances=user_finances,
-            pyomodel=m,
-            components=milp_components,
+
+    @classmethod
+    def build(
+        cls,
+        user_finances: UserPersonalFinances,
+        parameters: Parameters,
+        milp_components: MILPComponents,
+        constraints: List[pe.Constraint],
+        variables: List[pe.Var],
+    ) -> "MILP":
+        with timed_phase("model_build"):
+            builder = ConcreteModelBuilder()
+            m = builder.build(
+                constraints=constraints,
+                variables=variables,
+                objective=milp_components.objective.obj,
+                parameters=milp_components.objective.weights.as_list,
+            )
+            milp = MILP(
+                problem_parameters=parameters,
+                user_finances=user_finances,
+                pyomodel=m,
+                components=milp_components,
+            )
+            if milp_components.constraints is None:
+                milp.matrices = milp.get_matrix_assembler().assemble()
+        strategy_metrics = get_strategy_metrics()
+        if strategy_metrics is not None:
+            strategy_metrics.model_size = milp.get_model_size()
+        return milp
+
+    def get_model_size(self) -> ModelSize:
+        variables = list(get_model_variables(self.pyomodel))
+        if self.matrices is not None:
+            num_constraints = self.matrices.num_rows
+        else:
+            num_constraints = sum(
+                1
+                for _ in self.pyomodel.component_data_objects(
+                    pe.Constraint, active=True
+                )
+            )
+        return ModelSize(
+            num_variables=len(variables),
+            num_binary_variables=sum(1 for v in variables if v.is_binary()),
+            num_constraints=num_constraints,
+        )
+
+    def get_solver_statistics(self, results) -> SolverStatistics:
+        """the best bound is the upper bound of the maximized objective"""
+        branch_and_bound = results.solver.statistics.branch_and_bound
+        num_nodes = branch_and_bound.number_of_created_subproblems
+        best_bound = results.problem.upper_bound
+        return SolverStatistics(
+            status=str(results.solver.status),
+            termination_condition=str(results.solver.termination_condition),
+            num_nodes=int(num_nodes) if isinstance(num_nodes, (int, float)) else None,
+            objective=pe.value(self.pyomodel.obj, exception=False),
+            best_bound=float(best_bound)
+            if isinstance(best_bound, (int, float)) and math.isfinite(best_bound)
+            else None,
+        )
+
+    def get_matrix_assembler(self) -> MILPMatrixAssembler:
+        return MILPMatrixAssembler(
+            sets=self.sets,
+            pars=self.milp_parameters,
+            vars=self.variables,
+            variables=get_model_variables(self.pyomodel),
         )
 
     def _is_valid_solution(self, results) -> bool:
@@ -73,17 +196,30 @@ class MILP:
 
         return (is_optimal and is_okay) or is_aborted
 
-    def create_solver(self):
-        solver = pe.SolverFactory("cbc")
-        solver.options["ratio"] = self.problem_parameters.optimality_gap
-        solver.options["seconds"] = self.problem_parameters.max_milp_seconds
-        solver.options["maxNodes"] = self.problem_parameters.max_milp_nodes
-        return solver
-
-    def solve(self) -> bool:
-        solver = self.create_solver()
-        is_log_milp = self.problem_parameters.is_log_milp
-        results = solver.solve(self.pyomodel, tee=is_log_milp)
+    def get_solver_backend(self) -> SolverBackend:
+        """the backend is kept with the model so that persistent backends can re-solve it"""
+        if self.solver_backend is None:
+            backend = get_solver_backend(self.problem_parameters.solver_backend)
+            self.solver_backend = backend(self.pyomodel, self.matrices)
+        return self.solver_backend
+
+    def update_objective_weights(self, parameters: Parameters):
+        """re-weigh the objective of the already built model for another strategy"""
+        self.problem_parameters = parameters
+        self.milp_parameters.model_parameters = parameters
+        self.objective.weights.update(self.milp_parameters)
+        if self.matrices is not None:
+            self.matrices.c = self.get_matrix_assembler().assemble_objective()
+
+    def solve(self, warmstart: bool = False) -> bool:
+        """warmstart passes the current variable values to the solver as the starting incumbent"""
+        with timed_phase("solve"):
+            results = self.get_solver_backend().solve(
+                self.problem_parameters, warmstart=warmstart
+            )
+        strategy_metrics = get_strategy_metrics()
+        if strategy_metrics is not None:
+            strategy_metrics.solver_statistics = self.get_solver_statistics(results)
         if not self._is_valid_solution(results):
             logging.error(
                 f"Did not get a valid solution; status: {results.solver.status};"
@@ -91,3 +227,10 @@ class MILP:
             )
             return False
         return True
+
+    def solve_with_fixed_integers(self) -> bool:
+        """keeps the current values of the integer variables and solves the continuous variables"""
+        results = self.get_solver_backend().solve_with_fixed_integers(
+            self.problem_parameters
+        )
+        return self._is_valid_solution(results)
@@ -67,7 +67,10 @@ class MILPSolution:
             return pe.value(self.vars.get_allocation(i_, t_))
 
         return [
-            {i: get_allocation(i, t) for i in self.sets.instruments}
+            {
+                self.sets.get_instrument_id(i): get_allocation(i, t)
+                for i in self.sets.instruments
+            }
             for t in list(sorted(self.sets.all_decision_periods_as_set))
             for _ in range(self.sets.get_num_months_in_decision_period(t))
         ]
@@ -77,7 +80,10 @@ class MILPSolution:
             return pe.value(self.vars.get_withdrawal(i_, t_))
 
         return [
-            {i: get_withdrawal(i, t) for i in self.sets.investments}
+            {
+                self.sets.get_instrument_id(i): get_withdrawal(i, t)
+                for i in self.sets.investments
+            }
             for t in list(sorted(self.sets.all_decision_periods_as_set))
             for _ in range(self.sets.get_num_months_in_decision_period(t))
         ]
@@ -150,23 +156,23 @@ class MILPSolution:
             withdrawals = monthly_withdrawals[dp_month]
             total_withdrawals = sum(w for w in withdrawals.values())
             tfsa_withdrawals = sum(
-                withdrawals.get(i, 0) for i in self.sets.tfsa_investments
+                withdrawals.get(self.sets.get_instrument_id(i), 0)
+                for i in self.sets.tfsa_investments
             )
             rrsp_contributions = sum(
-                payments.get(i, 0) for i in self.sets.rrsp_investments
+                payments.get(self.sets.get_instrument_id(i), 0)
+                for i in self.sets.rrsp_investments
             )
             portfolio_instruments = dict()
             for i in self.sets.instruments:
-                instrument = self.user_personal_finances.portfolio.get_instrument(
-                    i
-                ).copy(deep=True)
+                instrument = self.sets.get_instrument(i).copy(deep=True)
                 if dp.index == 0:
                     instrument.current_balance = self.pars.get_starting_balance(i)
                 else:
                     instrument.current_balance = round(
                         pe.value(self.vars.get_balance(i, dp.index - 1)), 2
                     )
-                portfolio_instruments[i] = instrument
+                portfolio_instruments[instrument.id_] = instrument
             portfolio = Portfolio(instruments=portfolio_instruments)
             allocation = MonthlyAllocation(
                 payments=payments,
@@ -1,5 +1,6 @@
 import itertools
 from dataclasses import dataclass
+from typing import List
 
 import pyomo.environ as pe
 
@@ -8,14 +9,51 @@ from pennies.strategies.milp.sets import MILPSets
 from pennies.strategies.milp.variables import MILPVariables
 
 
+@dataclass
+class ObjectiveWeights:
+    """The strategy dependent weights of the objective - mutable so that a built model can be re-solved"""
+
+    debt_utility_cost: pe.Param
+    goal_violation_cost: pe.Param
+    risk_violation_cost: pe.Param
+
+    @classmethod
+    def create(cls, pars: MILPParameters) -> "ObjectiveWeights":
+        return cls(
+            debt_utility_cost=pe.Param(
+                initialize=pars.get_debt_utility_cost(), mutable=True
+            ),
+            goal_violation_cost=pe.Param(
+                initialize=pars.get_goal_violation_cost(), mutable=True
+            ),
+            risk_violation_cost=pe.Param(
+                initialize=pars.get_risk_violation_cost(), mutable=True
+            ),
+        )
+
+    def update(self, pars: MILPParameters):
+        self.debt_utility_cost.value = pars.get_debt_utility_cost()
+        self.goal_violation_cost.value = pars.get_goal_violation_cost()
+        self.risk_violation_cost.value = pars.get_risk_violation_cost()
+
+    @property
+    def as_list(self) -> List[pe.Param]:
+        return [
+            self.debt_utility_cost,
+            self.goal_violation_cost,
+            self.risk_violation_cost,
+        ]
+
+
 @dataclass
 class ObjectiveComponents:
     sets: MILPSets
     pars: MILPParameters
     vars: MILPVariables
+    weights: ObjectiveWeights
 
     def get_risk_violation_costs(self):
-        return self.pars.get_risk_violation_cost() * (
+        return self.weights.risk_violation_cost * (
             sum(
                 self.vars.get_total_risk_violation(t)
                 + self.vars.get_investment_risk_violation(t)
@@ -56,13 +94,13 @@ class ObjectiveComponents:
         )
 
     def get_savings_goal_violation_cost(self):
-        return self.pars.get_goal_violation_cost() * sum(
+        return self.weights.goal_violation_cost * sum(
             self.vars.get_savings_goal_violation(g, t)
             for g, t in self.sets.savings_goals_and_decision_periods
         )
 
     def get_purchase_goal_violation_cost(self):
-        return self.pars.get_goal_violation_cost() * sum(
+        return self.weights.goal_violation_cost * sum(
             self.vars.get_purchase_goal_violation(g) for g in self.sets.purchase_goals
         )
 
@@ -94,7 +132,7 @@ class ObjectiveComponents:
         )
 
     def get_in_debt_cost(self):
-        return self.pars.get_debt_utility_cost() * sum(
+        return self.weights.debt_utility_cost * sum(
             -self.vars.get_balance(l, t)
             for l, t in itertools.product(
                 self.sets.loans, self.sets.all_decision_periods_as_set
@@ -125,11 +163,16 @@ class MILPObjective:
     obj: pe.Objective
     components: ObjectiveComponents
 
+    @property
+    def weights(self) -> ObjectiveWeights:
+        return self.components.weights
+
     @classmethod
     def create(
         cls, sets: MILPSets, pars: MILPParameters, vars_: MILPVariables,
     ) -> "MILPObjective":
-        components = ObjectiveComponents(sets, pars, vars_)
+        weights = ObjectiveWeights.create(pars)
+        components = ObjectiveComponents(sets, pars, vars_, weights)
         return MILPObjective(
             obj=pe.Objective(
                 rule=lambda _: components.get_obj_rule(),
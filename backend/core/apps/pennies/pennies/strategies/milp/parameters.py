@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from math import ceil
-from typing import Dict
+from typing import Dict, List, Optional
 from uuid import UUID
 
+import numpy as np
+
 from pennies.model.constants import InvestmentAccountType
+from pennies.model.decision_periods import DecisionPeriod
 from pennies.model.instrument import Instrument
 from pennies.model.investment import (
     NonGuaranteedInvestment,
@@ -30,14 +33,37 @@ class MILPParameters:
     model_parameters: ModelParameters
     loan_bounds: Dict[str, float] = None
 
+    # tables precomputed once so that the getters are array lookups
+    monthly_interest_rates: np.ndarray = None  # [instrument x month]
+    average_interest_rates: np.ndarray = None  # [instrument x decision period]
+    minimum_monthly_payments: np.ndarray = None  # [instrument x decision period]
+    maximum_monthly_payments: np.ndarray = None
+    # [instrument x decision period] - nan if the instrument has no maximum payment
+    before_tax_monthly_incomes: np.ndarray = None  # [decision period]
+    is_investment: np.ndarray = None  # [instrument]
+    is_guaranteed_investment: np.ndarray = None  # [instrument]
+    is_non_guaranteed_investment: np.ndarray = None  # [instrument]
+    is_rrsp_investment: np.ndarray = None  # [instrument]
+    is_tfsa_investment: np.ndarray = None  # [instrument]
+    is_revolving_loan: np.ndarray = None  # [instrument]
+    decision_periods_in_years: Dict[int, np.ndarray] = None
+    # the decision period of every month in the year
+    annual_incomes: Dict[int, float] = None
+    goal_decision_periods: Dict[UUID, int] = None
+    instrument_due_decision_periods: Dict[int, DecisionPeriod] = None
+    # filled on demand - only loans have a due decision period
+    retirement_decision_period_index: int = None
+
     def __post_init__(self):
+        self._create_instrument_tables()
+        self._create_decision_period_tables()
         self.loan_bounds = dict()
         final_month = self.user_finances.financial_profile.death_month
         for loan_id in self.sets.loans:
             loan = self._get_instrument(loan_id)
-            max_monthly_interest_rate = max(
-                loan.monthly_interest_rate(month) for month in range(final_month)
-            )
+            max_monthly_interest_rate = self.monthly_interest_rates[
+                loan_id, :final_month
+            ].max()
             upper_bound = (
                 loan.current_balance * (1 + max_monthly_interest_rate) ** final_month
             )
@@ -45,15 +71,114 @@ class MILPParameters:
                 ceil(upper_bound) * self.get_instrument_upper_bound_factor()
             )
 
-    def _get_instrument(self, id_: UUID) -> Instrument:
-        return self.user_finances.portfolio.instruments[id_]
+    def _create_instrument_tables(self):
+        instruments = [self._get_instrument(i) for i in self.sets.instruments]
+        decision_periods = self.sets.decision_periods.all_periods
+        num_months = max(
+            self.user_finances.financial_profile.death_month,
+            self.sets.decision_periods.max_month + 1,
+        )
+        self.monthly_interest_rates = np.array(
+            [
+                instrument.get_monthly_interest_rates(range(num_months))
+                for instrument in instruments
+            ],
+            dtype=float,
+        ).reshape(len(instruments), num_months)
+        self.average_interest_rates = np.array(
+            [
+                [
+                    sum(self.monthly_interest_rates[row, dp.months]) / len(dp.months)
+                    for dp in decision_periods
+                ]
+                for row in range(len(instruments))
+            ],
+            dtype=float,
+        ).reshape(len(instruments), len(decision_periods))
+
+        def get_maximum_payment(instrument: Instrument, months: List[int]):
+            maximum_payments = [
+                instrument.get_maximum_monthly_payment(month) for month in months
+            ]
+            return min(
+                (payment for payment in maximum_payments if payment is not None),
+                default=np.nan,
+            )
 
-    def get_average_interest_rate(self, id_: UUID, payment_horizon: int) -> float:
-        months = self.sets.decision_periods.data[payment_horizon].months
-        total_interest_rate = sum(
-            self._get_instrument(id_).monthly_interest_rate(month) for month in months
+        self.minimum_monthly_payments = np.array(
+            [
+                [
+                    max(instrument.get_minimum_monthly_payment(m) for m in dp.months)
+                    for dp in decision_periods
+                ]
+                for instrument in instruments
+            ],
+            dtype=float,
+        ).reshape(len(instruments), len(decision_periods))
+        self.maximum_monthly_payments = np.array(
+            [
+                [get_maximum_payment(instrument, dp.months) for dp in decision_periods]
+                for instrument in instruments
+            ],
+            dtype=float,
+        ).reshape(len(instruments), len(decision_periods))
+
+        def get_mask(is_type) -> np.ndarray:
+            return np.array([is_type(i) for i in instruments], dtype=bool)
+
+        self.is_investment = get_mask(lambda i: isinstance(i, BaseInvestment))
+        self.is_guaranteed_investment = get_mask(
+            lambda i: isinstance(i, GuaranteedInvestment)
+        )
+        self.is_non_guaranteed_investment = get_mask(
+            lambda i: isinstance(i, NonGuaranteedInvestment)
+        )
+        self.is_rrsp_investment = get_mask(
+            lambda i: isinstance(i, NonGuaranteedInvestment)
+            and i.account_type == InvestmentAccountType.RRSP
         )
-        return total_interest_rate / len(months)
+        self.is_tfsa_investment = get_mask(
+            lambda i: isinstance(i, NonGuaranteedInvestment)
+            and i.account_type == InvestmentAccountType.TFSA
+        )
+        self.is_revolving_loan = get_mask(lambda i: isinstance(i, RevolvingLoan))
+        self.instrument_due_decision_periods = dict()
+
+    def _create_decision_period_tables(self):
+        decision_periods = self.sets.decision_periods
+        financial_profile = self.user_finances.financial_profile
+        self.before_tax_monthly_incomes = np.array(
+            [
+                sum(financial_profile.get_pre_tax_monthly_income(m) for m in dp.months)
+                / len(dp.months)
+                for dp in decision_periods.all_periods
+            ],
+            dtype=float,
+        )
+        self.decision_periods_in_years = {
+            year: np.array(
+                decision_periods.get_indices_of_decision_period_instance_in_year(year),
+                dtype=int,
+            )
+            for year in self.sets.years
+        }
+        self.annual_incomes = {
+            year: float(sum(self.before_tax_monthly_incomes[indices]))
+            for year, indices in self.decision_periods_in_years.items()
+        }
+        self.retirement_decision_period_index = min(self.sets.retirement_periods_as_set)
+        self.goal_decision_periods = {
+            goal_id: decision_periods.get_corresponding_period_or_closest(
+                goal.due_month
+            ).index
+            for goal_id, goal in self.user_finances.goals.items()
+        }
+
+    def _get_instrument(self, id_: int) -> Instrument:
+        return self.sets.get_instrument(id_)
+
+    def get_average_interest_rate(self, id_: int, payment_horizon: int) -> float:
+        return float(self.average_interest_rates[id_, payment_horizon])
 
     def get_instrument_volatility(self, id) -> float:
         return self._get_instrument(id).volatility
@@ -61,42 +186,33 @@ class MILPParameters:
     def get_max_investment_volatility(self):
         return self.model_parameters.max_volatility
 
-    def get_starting_balance(self, id_: UUID):
+    def get_starting_balance(self, id_: int):
         return self._get_instrument(id_).current_balance
 
     def get_user_risk_profile_as_fraction(self) -> float:
         return self.user_finances.financial_profile.risk_tolerance / 100
 
     def get_minimum_monthly_payment(
-        self, instrument_id: UUID, payment_horizon_order: int
+        self, instrument_id: int, payment_horizon_order: int
     ):
-        instrument = self._get_instrument(instrument_id)
-        return max(
-            instrument.get_minimum_monthly_payment(m)
-            for m in self.sets.get_months_in_decision_period(payment_horizon_order)
+        return float(
+            self.minimum_monthly_payments[instrument_id, payment_horizon_order]
         )
 
     def get_before_tax_monthly_income(self, decision_period_index: int):
-        decision_period = self.sets.decision_periods.data[decision_period_index]
-        total_salary_in_decision_period = sum(
-            self.user_finances.financial_profile.get_pre_tax_monthly_income(month)
-            for month in decision_period.months
-        )
-        return total_salary_in_decision_period / len(decision_period.months)
+        return float(self.before_tax_monthly_incomes[decision_period_index])
 
     def get_is_revolving_loan(self, id_) -> bool:
-        return isinstance(
-            self.user_finances.portfolio.get_instrument(id_), RevolvingLoan
-        )
+        return bool(self.is_revolving_loan[id_])
 
     def get_is_non_guaranteed_investment(self, id_):
-        return isinstance(self._get_instrument(id_), NonGuaranteedInvestment)
+        return bool(self.is_non_guaranteed_investment[id_])
 
     def get_is_guaranteed_investment(self, id_):
-        return isinstance(self._get_instrument(id_), GuaranteedInvestment)
+        return bool(self.is_guaranteed_investment[id_])
 
     def get_is_investment(self, id_):
-        return isinstance(self._get_instrument(id_), BaseInvestment)
+        return bool(self.is_investment[id_])
 
     def has_loans(self) -> bool:
         return len(self.sets.loans) > 0
@@ -111,9 +227,13 @@ class MILPParameters:
         return final_month or retirement_month
 
     def get_instrument_due_decision_period(self, id_):
-        return self.sets.decision_periods.get_corresponding_period(
-            self.get_final_month(id_)
-        )
+        if id_ not in self.instrument_due_decision_periods:
+            self.instrument_due_decision_periods[
+                id_
+            ] = self.sets.decision_periods.get_corresponding_period(
+                self.get_final_month(id_)
+            )
+        return self.instrument_due_decision_periods[id_]
 
     def get_final_decision_period_index(self):
         return self.sets.decision_periods.max_period_index
@@ -146,12 +266,13 @@ class MILPParameters:
             return 0
 
     def get_annual_income(self, year: int):
-        decision_periods = self.sets.decision_periods.get_decision_period_instances_in_year(
-            year
-        )
-        return sum(
-            self.get_before_tax_monthly_income(dp.index) for dp in decision_periods
-        )
+        annual_income = self.annual_incomes.get(year)
+        if annual_income is None:
+            indices = self.sets.decision_periods.get_indices_of_decision_period_instance_in_year(
+                year
+            )
+            return float(sum(self.before_tax_monthly_incomes[indices]))
+        return annual_income
 
     def get_additional_rrsp_limit(self, year: int):
         annual_income = self.get_annual_income(year)
@@ -177,7 +298,7 @@ class MILPParameters:
         return self.user_finances.financial_profile.starting_tfsa_contribution_limit
 
     def get_has_guaranteed_investment_matured(
-        self, instrument_id: UUID, decision_period_index: int
+        self, instrument_id: int, decision_period_index: int
     ):
         instrument = self._get_instrument(instrument_id)
         if isinstance(instrument, GuaranteedInvestment):
@@ -210,29 +331,21 @@ class MILPParameters:
             )
 
     def get_is_rrsp_investment(self, instrument_id):
-        instrument = self._get_instrument(instrument_id)
-        return (
-            isinstance(instrument, NonGuaranteedInvestment)
-            and instrument.account_type == InvestmentAccountType.RRSP
-        )
+        return bool(self.is_rrsp_investment[instrument_id])
 
     def get_is_retired(self, decision_period_index: int):
         return decision_period_index >= self.get_retirement_decision_period_index()
 
     def get_retirement_decision_period_index(self):
-        return min(self.sets.retirement_periods_as_set)
+        return self.retirement_decision_period_index
 
-    def get_max_monthly_payment(self, instrument_id, decision_period_index):
-        months = self.sets.get_months_in_decision_period(decision_period_index)
-        instrument = self.user_finances.portfolio.instruments[instrument_id]
-        return min(
-            (
-                instrument.get_maximum_monthly_payment(month)
-                for month in months
-                if instrument.get_maximum_monthly_payment(month) is not None
-            ),
-            default=None,
-        )
+    def get_max_monthly_payment(
+        self, instrument_id, decision_period_index
+    ) -> Optional[float]:
+        max_payment = self.maximum_monthly_payments[
+            instrument_id, decision_period_index
+        ]
+        return None if np.isnan(max_payment) else float(max_payment)
 
     def get_goal_amount(self, g, t):
         return self.user_finances.goals[g].amount
@@ -261,18 +374,13 @@ class MILPParameters:
     def get_starting_debt(self):
         return sum(self.get_starting_balance(l) for l in self.sets.loans)
 
-    def get_is_tfsa_investment(self, investment_id: UUID):
-        instrument = self._get_instrument(investment_id)
-        return (
-            isinstance(instrument, NonGuaranteedInvestment)
-            and instrument.account_type == InvestmentAccountType.TFSA
-        )
+    def get_is_tfsa_investment(self, investment_id: int):
+        return bool(self.is_tfsa_investment[investment_id])
 
     def get_annual_pre_tax_income(self, year: int):
         decision_periods = self.sets.decision_periods.grouped_by_years[year]
-        return sum(
-            self.get_before_tax_monthly_income(dp.index) for dp in decision_periods
-        )
+        indices = [dp.index for dp in decision_periods]
+        return float(sum(self.before_tax_monthly_incomes[indices]))
 
     def get_is_guaranteed_and_matured_investment(self, i, t):
         if not self.get_is_guaranteed_investment(i):
@@ -280,22 +388,18 @@ class MILPParameters:
         else:
             return self.get_has_guaranteed_investment_matured(i, t)
 
-    def get_is_before_loan_due_date(self, loan_id: UUID, decision_period: int):
+    def get_is_before_loan_due_date(self, loan_id: int, decision_period: int):
         return (
             decision_period < self.get_instrument_due_decision_period(loan_id).index - 1
         )
 
-    def get_is_after_loan_due_date(self, loan_id: UUID, decision_period: int):
+    def get_is_after_loan_due_date(self, loan_id: int, decision_period: int):
         return (
             decision_period > self.get_instrument_due_decision_period(loan_id).index - 1
         )
 
     def get_goal_decision_period(self, goal_id: UUID):
-        month = self.get_goal_due_month(goal_id)
-        decision_period = self.sets.decision_periods.get_corresponding_period_or_closest(
-            month
-        ).index
-        return decision_period
+        return self.goal_decision_periods[goal_id]
 
     def has_rrsp_investments(self):
         return len(self.sets.rrsp_investments) > 0
@@ -317,14 +421,13 @@ class MILPParameters:
         return len(self.sets.tfsa_investments) > 0
 
     def get_investment(self, investment_id):
-        return self.user_finances.portfolio.get_investment(investment_id)
+        return self.sets.get_instrument(investment_id)
 
     def get_is_purchase_goal_due(self, decision_period: int):
-        for g in self.sets.purchase_goals:
-            goal_decision_period = self.get_goal_decision_period(g)
-            if goal_decision_period == decision_period:
-                return True
-        return False
+        return any(
+            self.goal_decision_periods[g] == decision_period
+            for g in self.sets.purchase_goals
+        )
 
     def get_instrument_upper_bound_factor(self):
         return self.model_parameters.instrument_upper_bound_factor
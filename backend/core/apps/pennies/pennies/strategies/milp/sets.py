@@ -21,6 +21,73 @@ from pennies.model.taxes import IncomeTaxBrackets
 from pennies.model.user_personal_finances import UserPersonalFinances
 
 
+@dataclass(frozen=True)
+class InstrumentIndexSets:
+    """
+    Every instrument is indexed by its position in the portfolio so that the MILP is indexed by integers
+    instead of UUIDs. The type partitions are computed once.
+    """
+
+    instrument_ids: Tuple[UUID, ...]
+    instruments: Tuple[int, ...]
+    loans: Tuple[int, ...]
+    mortgages: Tuple[int, ...]
+    investments: Tuple[int, ...]
+    non_guaranteed_investments: Tuple[int, ...]
+    guaranteed_investments: Tuple[int, ...]
+    registered_investments: Tuple[int, ...]
+    rrsp_investments: Tuple[int, ...]
+    tfsa_investments: Tuple[int, ...]
+    non_tfsa_investments: Tuple[int, ...]
+    non_cash_investments: Tuple[int, ...]
+    non_cash_non_guaranteed_investments: Tuple[int, ...]
+
+    @classmethod
+    def create(cls, instruments: List[Instrument]) -> "InstrumentIndexSets":
+        def select(is_type) -> Tuple[int, ...]:
+            return tuple(index for index, i in enumerate(instruments) if is_type(i))
+
+        def is_account_type(i, account_type) -> bool:
+            return isinstance(i, BaseInvestment) and i.account_type == account_type
+
+        return cls(
+            instrument_ids=tuple(i.id_ for i in instruments),
+            instruments=tuple(range(len(instruments))),
+            loans=select(lambda i: isinstance(i, Loan)),
+            mortgages=select(lambda i: isinstance(i, Mortgage)),
+            investments=select(
+                lambda i: isinstance(i, (NonGuaranteedInvestment, GuaranteedInvestment))
+            ),
+            non_guaranteed_investments=select(
+                lambda i: isinstance(i, NonGuaranteedInvestment)
+            ),
+            guaranteed_investments=select(
+                lambda i: isinstance(i, GuaranteedInvestment)
+            ),
+            registered_investments=select(
+                lambda i: isinstance(i, BaseInvestment)
+                and i.account_type != InvestmentAccountType.NON_REGISTERED
+            ),
+            rrsp_investments=select(
+                lambda i: is_account_type(i, InvestmentAccountType.RRSP)
+            ),
+            tfsa_investments=select(
+                lambda i: is_account_type(i, InvestmentAccountType.TFSA)
+            ),
+            non_tfsa_investments=select(
+                lambda i: isinstance(i, BaseInvestment)
+                and i.account_type != InvestmentAccountType.TFSA
+            ),
+            non_cash_investments=select(
+                lambda i: isinstance(i, BaseInvestment) and not isinstance(i, Cash)
+            ),
+            non_cash_non_guaranteed_investments=select(
+                lambda i: isinstance(i, NonGuaranteedInvestment)
+                and not isinstance(i, Cash)
+            ),
+        )
+
+
 @dataclass
 class MILPSets:
     _instruments: List[Instrument]
@@ -28,17 +95,38 @@ class MILPSets:
     income_tax_brackets: Dict[str, IncomeTaxBrackets]
     _user_finances: UserPersonalFinances
 
+    index_sets: InstrumentIndexSets = None
+    _instrument_indices: Dict[UUID, int] = None
+    _working_periods: Tuple[int, ...] = None
+    _retirement_periods: Tuple[int, ...] = None
+    _all_decision_periods: Tuple[int, ...] = None
+
+    def __post_init__(self):
+        self.index_sets = InstrumentIndexSets.create(self._instruments)
+        self._instrument_indices = {
+            id_: index for index, id_ in enumerate(self.index_sets.instrument_ids)
+        }
+        self._working_periods = tuple(
+            wp.index for wp in self.decision_periods.working_periods
+        )
+        self._retirement_periods = tuple(
+            rp.index for rp in self.decision_periods.retirement_periods
+        )
+        self._all_decision_periods = tuple(
+            dp.index for dp in self.decision_periods.all_periods
+        )
+
     @property
     def working_periods_as_set(self) -> Set[int]:
-        return set(wp.index for wp in self.decision_periods.working_periods)
+        return set(self._working_periods)
 
     @property
     def retirement_periods_as_set(self) -> Set[int]:
-        return set(rp.index for rp in self.decision_periods.retirement_periods)
+        return set(self._retirement_periods)
 
     @property
     def all_decision_periods_as_set(self) -> Set[int]:
-        return set(dp.index for dp in self.decision_periods.all_periods)
+        return set(self._all_decision_periods)
 
     @property
     def taxing_entities(self):
@@ -47,23 +135,31 @@ class MILPSets:
     def get_tax_brackets_as_set(self, taxing_entity: str) -> Set[int]:
         return set(range(self.income_tax_brackets[taxing_entity].num_brackets))
 
+    def get_instrument(self, index: int) -> Instrument:
+        return self._instruments[index]
+
+    def get_instrument_id(self, index: int) -> UUID:
+        """the MILP is indexed by integers - the solution is translated back to the instrument ids"""
+        return self.index_sets.instrument_ids[index]
+
+    def get_instrument_index(self, id_: UUID) -> int:
+        return self._instrument_indices[id_]
+
     @property
-    def instruments(self):
-        return list(i.id_ for i in self._instruments)
+    def instruments(self) -> Tuple[int, ...]:
+        return self.index_sets.instruments
 
     @property
-    def loans(self):
-        return list(i.id_ for i in self._instruments if isinstance(i, Loan))
+    def loans(self) -> Tuple[int, ...]:
+        return self.index_sets.loans
 
     @property
-    def mortgages(self):
-        return list(i.id_ for i in self._instruments if isinstance(i, Mortgage))
+    def mortgages(self) -> Tuple[int, ...]:
+        return self.index_sets.mortgages
 
     @property
-    def non_guaranteed_investments(self):
-        return list(
-            i.id_ for i in self._instruments if isinstance(i, NonGuaranteedInvestment)
-        )
+    def non_guaranteed_investments(self) -> Tuple[int, ...]:
+        return self.index_sets.non_guaranteed_investments
 
     @property
     def taxing_entities_and_brackets(self):
@@ -74,72 +170,36 @@ class MILPSets:
         )
 
     @property
-    def investments(self):
-        return list(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, (NonGuaranteedInvestment, GuaranteedInvestment))
-        )
+    def investments(self) -> Tuple[int, ...]:
+        return self.index_sets.investments
 
     @property
-    def registered_investments(self):
-        def is_registered(i):
-            return i.account_type != InvestmentAccountType.NON_REGISTERED
-
-        return list(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, BaseInvestment) and is_registered(i)
-        )
+    def registered_investments(self) -> Tuple[int, ...]:
+        return self.index_sets.registered_investments
 
     @property
-    def rrsp_investments(self):
-        return list(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, BaseInvestment)
-            and i.account_type == InvestmentAccountType.RRSP
-        )
+    def rrsp_investments(self) -> Tuple[int, ...]:
+        return self.index_sets.rrsp_investments
 
     @property
-    def tfsa_investments(self):
-        return list(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, BaseInvestment)
-            and i.account_type == InvestmentAccountType.TFSA
-        )
+    def tfsa_investments(self) -> Tuple[int, ...]:
+        return self.index_sets.tfsa_investments
 
     @property
-    def non_tfsa_investments(self):
-        return list(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, BaseInvestment)
-            and i.account_type != InvestmentAccountType.TFSA
-        )
+    def non_tfsa_investments(self) -> Tuple[int, ...]:
+        return self.index_sets.non_tfsa_investments
 
     @property
-    def guaranteed_investments(self):
-        return list(
-            i.id_ for i in self._instruments if isinstance(i, GuaranteedInvestment)
-        )
+    def guaranteed_investments(self) -> Tuple[int, ...]:
+        return self.index_sets.guaranteed_investments
 
     @property
-    def non_cash_investments(self) -> Set[str]:
-        return set(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, BaseInvestment) and not isinstance(i, Cash)
-        )
+    def non_cash_investments(self) -> Set[int]:
+        return set(self.index_sets.non_cash_investments)
 
     @property
-    def non_cash_non_guaranteed_investments(self) -> Set[UUID]:
-        return set(
-            i.id_
-            for i in self._instruments
-            if isinstance(i, NonGuaranteedInvestment) and not isinstance(i, Cash)
-        )
+    def non_cash_non_guaranteed_investments(self) -> Set[int]:
+        return set(self.index_sets.non_cash_non_guaranteed_investments)
 
     def get_months_in_decision_period(self, order: int) -> List[int]:
         return self.decision_periods.data[order].months
@@ -162,7 +222,7 @@ class MILPSets:
         investments = self._user_finances.portfolio.get_investments_of_types(
             goal.get_allowed_accounts()
         )
-        return list(i.id_ for i in investments)
+        return list(self.get_instrument_index(i.id_) for i in investments)
 
     def get_goals_and_decision_periods(self, goals) -> List[Tuple[UUID, int]]:
         return list(
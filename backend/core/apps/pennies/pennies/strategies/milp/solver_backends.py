@@ -0,0 +1,323 @@
+import os
+import re
+from abc import ABC
+from tempfile import TemporaryDirectory
+from typing import Optional
+
+import numpy as np
+import pyomo.environ as pe
+from pyomo.core import ConcreteModel
+from pyomo.opt import SolverResults
+
+from pennies.model.parameters import Parameters
+from pennies.strategies.milp.matrix import (
+    MILPMatrices,
+    extract_objective,
+    get_column_indices,
+)
+
+try:
+    import highspy
+except ImportError:  # highspy is optional - the cbc backend is always available
+    highspy = None
+
+
+class SolverBackend(ABC):
+    """Solves a pyomo model and reports the pyomo solver status and termination condition"""
+
+    accepts_matrices = False
+    # backends that accept matrices can solve models whose constraints were assembled as a matrix
+
+    def __init__(
+        self, pyomodel: ConcreteModel, matrices: Optional[MILPMatrices] = None
+    ):
+        self.pyomodel = pyomodel
+        self.matrices = matrices
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def solve(self, parameters: Parameters, warmstart: bool = False) -> SolverResults:
+        raise NotImplementedError()
+
+    def solve_with_fixed_integers(self, parameters: Parameters) -> SolverResults:
+        """solves the continuous variables for the current values of the integer variables"""
+        raise NotImplementedError()
+
+
+def is_integer_variable(v) -> bool:
+    return v.is_integer() or v.is_binary()
+
+
+class CBCSolverBackend(SolverBackend):
+    """
+    Writes an LP file and solves it with a cbc subprocess.
+    pyomo keeps the files of shell solvers on the context stack of a global TempfileManager, so concurrent solves on
+    the thread executor would clean up each other's files. Every solve writes its problem, warm start and log files to
+    a directory of its own instead and hands cbc the problem file - the solution is loaded with the symbol map of the
+    written problem
+    """
+
+    SUMMARY_LINE = re.compile(
+        r"^(Objective value|Upper bound|Lower bound|Enumerated nodes):\s+(\S+)",
+        re.MULTILINE,
+    )
+
+    def create_solver(self, parameters: Parameters):
+        solver = pe.SolverFactory("cbc")
+        solver.options["ratio"] = parameters.optimality_gap
+        solver.options["seconds"] = parameters.max_milp_seconds
+        solver.options["maxNodes"] = parameters.max_milp_nodes
+        return solver
+
+    def solve(self, parameters: Parameters, warmstart: bool = False) -> SolverResults:
+        solver = self.create_solver(parameters)
+        with TemporaryDirectory(prefix="pennies-cbc-") as solve_dir:
+            problem_file, symbol_map_id = self.pyomodel.write(
+                os.path.join(solve_dir, "problem.lp"),
+                io_options={"symbolic_solver_labels": False},
+            )
+            try:
+                warm_start_file = None
+                if warmstart:
+                    warm_start_file = os.path.join(solve_dir, "warm_start.soln")
+                    self._write_warm_start(warm_start_file, symbol_map_id)
+                log_file = os.path.join(solve_dir, "cbc.log")
+                results = solver.solve(
+                    problem_file,
+                    tee=parameters.is_log_milp,
+                    warmstart=warmstart,
+                    warmstart_file=warm_start_file,
+                    logfile=log_file,
+                )
+                with open(log_file) as log:
+                    self._read_summary(results, log.read())
+                self._load_solution(results, symbol_map_id)
+            finally:
+                self.pyomodel.solutions.delete_symbol_map(symbol_map_id)
+        return results
+
+    def solve_with_fixed_integers(self, parameters: Parameters) -> SolverResults:
+        """the fixed variables are written to the problem file as constants so cbc only solves the LP"""
+        integer_variables = [
+            v
+            for v in self.pyomodel.component_data_objects(pe.Var)
+            if is_integer_variable(v) and not v.fixed and v.value is not None
+        ]
+        for v in integer_variables:
+            v.fix(round(v.value))
+        try:
+            return self.solve(parameters)
+        finally:
+            for v in integer_variables:
+                v.unfix()
+
+    def _write_warm_start(self, filename: str, symbol_map_id: int):
+        """the non-zero integer variables in the solution format that cbc reads its starting solution from"""
+        names = self.pyomodel.solutions.symbol_map[symbol_map_id].byObject
+        with open(filename, "w") as warm_start:
+            for index, v in enumerate(
+                v
+                for v in self.pyomodel.component_data_objects(pe.Var)
+                if v.value and is_integer_variable(v) and id(v) in names
+            ):
+                warm_start.write(f"{index} {names[id(v)]} {v.value}\n")
+
+    def _load_solution(self, results: SolverResults, symbol_map_id: int):
+        if len(results.solution) == 0:
+            return
+        solutions = self.pyomodel.solutions
+        solutions.clear(clear_symbol_maps=False)
+        solutions.add_solution(
+            results.solution(0), symbol_map_id, delete_symbol_map=False
+        )
+        solutions.select(0)
+        results.solution.clear()
+
+    def _read_summary(self, results: SolverResults, log: str):
+        """pyomo mixes up the bounds of maximized objectives so they are read from the cbc summary instead"""
+        summary = dict(self.SUMMARY_LINE.findall(log))
+        if "Enumerated nodes" in summary:
+            results.solver.statistics.branch_and_bound.number_of_created_subproblems = int(
+                summary["Enumerated nodes"]
+            )
+        if "Objective value" not in summary:
+            return
+        objective = float(summary["Objective value"])
+        best_bound = float(
+            summary.get("Upper bound", summary.get("Lower bound", objective))
+        )
+        if self.pyomodel.obj.sense == pe.maximize:
+            results.problem.lower_bound = objective
+            results.problem.upper_bound = best_bound
+        else:
+            results.problem.lower_bound = best_bound
+            results.problem.upper_bound = objective
+
+
+class HiGHSSolverBackend(SolverBackend):
+    """
+    Keeps the model loaded in an in-memory HiGHS instance.
+    The constraints come from the assembled matrices or are extracted from the pyomo model.
+    The constraints are only loaded once - every solve only re-reads the objective so that a model
+    can be re-solved after its objective weights change.
+    """
+
+    accepts_matrices = True
+    FEASIBLE_SOLUTION = 2
+    LIMIT_STATUSES = {
+        "kTimeLimit": pe.TerminationCondition.maxTimeLimit,
+        "kIterationLimit": pe.TerminationCondition.maxIterations,
+        "kSolutionLimit": pe.TerminationCondition.maxEvaluations,
+        "kInterrupt": pe.TerminationCondition.userInterrupt,
+        "kHighsInterrupt": pe.TerminationCondition.userInterrupt,
+    }
+
+    def __init__(
+        self, pyomodel: ConcreteModel, matrices: Optional[MILPMatrices] = None
+    ):
+        super().__init__(pyomodel, matrices)
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.is_assembled = matrices is not None
+        if not self.is_assembled:
+            self.matrices = MILPMatrices.from_pyomodel(pyomodel)
+        self.variables = self.matrices.variables
+        self.variable_indices = get_column_indices(self.variables)
+        self._load_model()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return highspy is not None
+
+    def _load_model(self):
+        matrices = self.matrices
+        lp = highspy.HighsLp()
+        lp.num_col_ = matrices.num_columns
+        lp.num_row_ = matrices.num_rows
+        lp.col_cost_ = np.zeros(matrices.num_columns)
+        lp.col_lower_ = matrices.col_lower
+        lp.col_upper_ = matrices.col_upper
+        lp.row_lower_ = matrices.row_lower
+        lp.row_upper_ = matrices.row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.start_ = matrices.a_matrix.indptr
+        lp.a_matrix_.index_ = matrices.a_matrix.indices
+        lp.a_matrix_.value_ = matrices.a_matrix.data
+        lp.integrality_ = [
+            highspy.HighsVarType.kInteger
+            if is_integer
+            else highspy.HighsVarType.kContinuous
+            for is_integer in matrices.integrality
+        ]
+        self.highs.passModel(lp)
+
+    def _update_objective(self):
+        """assembled matrices are kept up to date by the MILP - otherwise re-read the pyomo objective"""
+        matrices = self.matrices
+        if not self.is_assembled:
+            (
+                matrices.c,
+                matrices.objective_offset,
+                matrices.is_maximize,
+            ) = extract_objective(self.pyomodel, self.variable_indices)
+        self.highs.changeColsCost(
+            matrices.num_columns, np.arange(matrices.num_columns), matrices.c
+        )
+        self.highs.changeObjectiveOffset(matrices.objective_offset)
+        if matrices.is_maximize:
+            self.highs.changeObjectiveSense(highspy.ObjSense.kMaximize)
+        else:
+            self.highs.changeObjectiveSense(highspy.ObjSense.kMinimize)
+
+    def _set_options(self, parameters: Parameters):
+        self.highs.setOptionValue("output_flag", parameters.is_log_milp)
+        self.highs.setOptionValue("mip_rel_gap", float(parameters.optimality_gap))
+        self.highs.setOptionValue("time_limit", float(parameters.max_milp_seconds))
+        self.highs.setOptionValue("mip_max_nodes", int(parameters.max_milp_nodes))
+
+    def _set_starting_solution(self):
+        solution = highspy.HighsSolution()
+        solution.col_value = [0 if v.value is None else v.value for v in self.variables]
+        self.highs.setSolution(solution)
+
+    def _load_solution(self):
+        col_values = self.highs.getSolution().col_value
+        for v, x in zip(self.variables, col_values):
+            v.value = round(x) if is_integer_variable(v) else x
+
+    def _has_solution(self) -> bool:
+        return self.highs.getInfo().primal_solution_status == self.FEASIBLE_SOLUTION
+
+    def _create_results(self) -> SolverResults:
+        model_status = self.highs.getModelStatus()
+        status_name = model_status.name
+        has_solution = self._has_solution()
+        info = self.highs.getInfo()
+        results = SolverResults()
+        results.solver.message = self.highs.modelStatusToString(model_status)
+        results.solver.statistics.branch_and_bound.number_of_created_subproblems = (
+            info.mip_node_count
+        )
+        if has_solution:
+            # same as cbc - the upper bound of a maximized objective is the best bound
+            if self.matrices.is_maximize:
+                results.problem.lower_bound = info.objective_function_value
+                results.problem.upper_bound = info.mip_dual_bound
+            else:
+                results.problem.lower_bound = info.mip_dual_bound
+                results.problem.upper_bound = info.objective_function_value
+        if status_name == "kOptimal":
+            results.solver.status = pe.SolverStatus.ok
+            results.solver.termination_condition = pe.TerminationCondition.optimal
+        elif status_name in self.LIMIT_STATUSES and has_solution:
+            results.solver.status = pe.SolverStatus.aborted
+            results.solver.termination_condition = self.LIMIT_STATUSES[status_name]
+        elif status_name == "kInfeasible":
+            results.solver.status = pe.SolverStatus.warning
+            results.solver.termination_condition = pe.TerminationCondition.infeasible
+        elif status_name in ("kUnbounded", "kUnboundedOrInfeasible"):
+            results.solver.status = pe.SolverStatus.warning
+            results.solver.termination_condition = pe.TerminationCondition.unbounded
+        elif status_name in self.LIMIT_STATUSES:
+            results.solver.status = pe.SolverStatus.warning
+            results.solver.termination_condition = pe.TerminationCondition.noSolution
+        else:
+            results.solver.status = pe.SolverStatus.error
+            results.solver.termination_condition = pe.TerminationCondition.error
+        return results
+
+    def solve(self, parameters: Parameters, warmstart: bool = False) -> SolverResults:
+        self._set_options(parameters)
+        self._update_objective()
+        if warmstart:
+            self._set_starting_solution()
+        self.highs.run()
+        results = self._create_results()
+        if self._has_solution():
+            self._load_solution()
+        return results
+
+    def solve_with_fixed_integers(self, parameters: Parameters) -> SolverResults:
+        """the bounds of the integer columns are set to their current values and restored after the solve"""
+        matrices = self.matrices
+        columns = np.array(
+            [
+                index
+                for index, v in enumerate(self.variables)
+                if matrices.integrality[index] and v.value is not None
+            ],
+            dtype=int,
+        )
+        values = np.array([round(self.variables[index].value) for index in columns])
+        self.highs.changeColsBounds(len(columns), columns, values, values)
+        try:
+            return self.solve(parameters)
+        finally:
+            self.highs.changeColsBounds(
+                len(columns),
+                columns,
+                matrices.col_lower[columns],
+                matrices.col_upper[columns],
+            )
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import List, Optional
 
 import pyutilib
@@ -9,9 +10,10 @@ from pennies.model.solution import FinancialPlan
 from pennies.model.user_personal_finances import UserPersonalFinances
 from pennies.strategies.allocation_strategy import PlanningStrategy
 from pennies.strategies.milp.components import MILPComponents
-from pennies.strategies.milp.milp import MILP
+from pennies.strategies.milp.milp import MILP, is_matrix_milp
 from pennies.strategies.milp.milp_solution import MILPSolution
-from pennies.strategies.milp.utilities import ConcreteModelBuilder
+from pennies.strategies.milp.warm_start import HeuristicWarmStart
+from pennies.utilities.metrics import timed_phase
 
 pyutilib.subprocess.GlobalData.DEFINE_SIGNAL_HANDLERS_DEFAULT = False
 
@@ -26,36 +28,60 @@ class MILPStrategy(PlanningStrategy):
         self, user_finances: UserPersonalFinances, parameters: Parameters
     ) -> Optional[FinancialPlan]:
         parameters = self.overwrite_parameters(parameters)
+        milp = self.create_milp(user_finances, parameters)
+        return self.create_plan_from_milp(milp)
+
+    def resolve_plan(self, milp: MILP) -> Optional[FinancialPlan]:
+        """re-solve a MILP built by another MILP strategy with this strategy's objective weights"""
+        parameters = self.overwrite_parameters(milp.problem_parameters)
+        milp.update_objective_weights(parameters)
+        return self.create_plan_from_milp(milp, warmstart=True)
+
+    def create_milp(
+        self, user_finances: UserPersonalFinances, parameters: Parameters
+    ) -> MILP:
         milp_components = MILPComponents.create(
-            user_finances=user_finances, parameters=parameters
+            user_finances=user_finances,
+            parameters=parameters,
+            is_matrix_milp=is_matrix_milp(parameters),
         )
-        builder = ConcreteModelBuilder()
-        pyomo_model = builder.build(
+        return MILP.build(
+            user_finances,
+            parameters,
+            milp_components,
             constraints=self.get_active_constraints(milp_components),
             variables=self.get_active_variables(milp_components),
-            objective=milp_components.objective.obj,
-        )
-        milp = MILP(
-            user_finances=user_finances,
-            problem_parameters=parameters,
-            pyomodel=pyomo_model,
-            components=milp_components,
         )
-        is_success = milp.solve()
+
+    def create_plan_from_milp(
+        self, milp: MILP, warmstart: bool = False
+    ) -> Optional[FinancialPlan]:
+        heuristic_name = milp.problem_parameters.warm_start_heuristic
+        if not warmstart and heuristic_name is not None:
+            with timed_phase("warm_start"):
+                HeuristicWarmStart.create(milp, heuristic_name).load()
+            warmstart = True
+        is_success = milp.solve(warmstart=warmstart)
         if not is_success:
             return None
-        solution = MILPSolution(milp=milp)
-        solution.print_objective_components_breakdown()
-        return FinancialPlanFactory.create(
-            solution.get_monthly_payments(),
-            user_finances,
-            parameters,
-            solution.get_monthly_withdrawals(),
-        )
+        with timed_phase("solution_extraction"):
+            solution = MILPSolution(milp=milp)
+            solution.print_objective_components_breakdown()
+            monthly_payments = solution.get_monthly_payments()
+            monthly_withdrawals = solution.get_monthly_withdrawals()
+        with timed_phase("simulation"):
+            return FinancialPlanFactory.create(
+                monthly_payments,
+                milp.user_finances,
+                milp.problem_parameters,
+                monthly_withdrawals,
+            )
 
     def get_active_constraints(
         self, milp_components: MILPComponents
     ) -> List[pe.Constraint]:
+        if milp_components.constraints is None:
+            return []
         return milp_components.constraints.as_list
 
     def get_active_variables(self, milp_components: MILPComponents) -> List[pe.Var]:
@@ -85,3 +111,23 @@ class GoalMILPStrategy(MILPStrategy):
 
     DEBT_UTILITY_COST = 0
     GOAL_VIOLATION_COST = 0.7
+
+
+@dataclass
+class SharedMILP:
+    """
+    Builds the MILP once and re-solves it for every MILP strategy.
+    The strategies only differ in their objective weights so the sets, variables and constraints are shared
+    and every solve after the first one is warm started from the previous solution.
+    """
+
+    user_finances: UserPersonalFinances
+    parameters: Parameters
+    milp: Optional[MILP] = None
+
+    def create_plan(self, strategy: MILPStrategy) -> Optional[FinancialPlan]:
+        if self.milp is None:
+            parameters = strategy.overwrite_parameters(self.parameters)
+            self.milp = strategy.create_milp(self.user_finances, parameters)
+            return strategy.create_plan_from_milp(self.milp)
+        return strategy.resolve_plan(self.milp)
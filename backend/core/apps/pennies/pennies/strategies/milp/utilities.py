@@ -33,10 +33,11 @@ class AttributeUtility:
             self.sets.get_months_in_decision_period(decision_period)
         )
         starting_month = self.sets.decision_periods.min_month
-        months = list(range(starting_month, final_withdrawal_month))
         investment = self.pars.get_investment(investment_id)
         withdrawal = self.vars.get_withdrawal(investment_id, decision_period)
-        return estimate_taxable_withdrawal(investment, withdrawal, months)
+        return estimate_taxable_withdrawal(
+            investment, withdrawal, starting_month, final_withdrawal_month
+        )
 
     def get_total_taxable_withdrawals(self, decision_period: int):
         return sum(
@@ -196,6 +197,7 @@ class AttributeUtility:
 class ConcreteModelBuilder:
     def __init__(self):
         self.var_id = 0
+        self.param_id = 0
         self.constraint_id = 0
         self.m = pe.ConcreteModel()
 
@@ -207,6 +209,14 @@ class ConcreteModelBuilder:
         setattr(self.m, f"v{self.var_id}", v)
         self.var_id += 1
 
+    def add_parameter(self, p: pe.Param):
+        setattr(self.m, f"p{self.param_id}", p)
+        self.param_id += 1
+
+    def add_parameters(self, parameters: List[pe.Param]):
+        for p in parameters:
+            self.add_parameter(p)
+
     def add_constraints(self, constraints: List[pe.Constraint]):
         for c in constraints:
             self.add_constraint(c)
@@ -220,7 +230,9 @@ class ConcreteModelBuilder:
         constraints: List[pe.Constraint],
         variables: List[pe.Var],
         objective: pe.Objective,
+        parameters: List[pe.Param] = None,
     ) -> pe.ConcreteModel:
+        self.add_parameters(parameters or [])
         self.add_variables(variables)
         self.add_constraints(constraints)
         self.m.obj = objective
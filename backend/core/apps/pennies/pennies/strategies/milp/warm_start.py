@@ -0,0 +1,190 @@
+import itertools
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Tuple, Type
+
+import pyomo.environ as pe
+
+from pennies.model.portfolio_manager import PortfolioManager
+from pennies.strategies.greedy import (
+    GreedyHeuristicStrategy,
+    SnowballStrategy,
+    AvalancheStrategy,
+    AvalancheBallStrategy,
+)
+from pennies.strategies.milp.milp import MILP
+from pennies.strategies.milp.utilities import AttributeUtility
+from pennies.utilities.finance import calculate_instrument_balance
+
+
+class WarmStartHeuristicName(Enum):
+    SNOWBALL = "snowball"
+    AVALANCHE = "avalanche"
+    AVALANCHE_BALL = "avalanche_ball"
+
+
+_WARM_START_HEURISTICS: Dict[str, Type[GreedyHeuristicStrategy]] = {
+    WarmStartHeuristicName.SNOWBALL.value: SnowballStrategy,
+    WarmStartHeuristicName.AVALANCHE.value: AvalancheStrategy,
+    WarmStartHeuristicName.AVALANCHE_BALL.value: AvalancheBallStrategy,
+}
+
+PAID_OFF_TOLERANCE = 0.01
+
+# values of the MILP variables indexed by (instrument, decision period)
+InstrumentValues = Dict[Tuple[int, int], float]
+
+
+def get_warm_start_heuristic(name: str) -> GreedyHeuristicStrategy:
+    heuristic = _WARM_START_HEURISTICS.get(name)
+    if heuristic is None:
+        raise ValueError(f"{name} is not a warm start heuristic")
+    return heuristic()
+
+
+@dataclass
+class HeuristicWarmStart:
+    """
+    Runs a greedy heuristic over the working periods of the MILP and loads its plan into the MILP variables.
+    The integer variables are derived from the heuristic balances and the continuous variables are then solved with
+    the integer variables fixed - the heuristic plan alone does not satisfy the constraints that it has no notion of,
+    e.g. the retirement spending, the deduction limits and the goal violations.
+    """
+
+    milp: MILP
+    heuristic: GreedyHeuristicStrategy
+
+    @classmethod
+    def create(cls, milp: MILP, heuristic_name: str) -> "HeuristicWarmStart":
+        return cls(milp=milp, heuristic=get_warm_start_heuristic(heuristic_name))
+
+    def create_heuristic_plan(self) -> Tuple[InstrumentValues, InstrumentValues]:
+        """the monthly payments and withdrawals of the heuristic averaged over every working period"""
+        sets = self.milp.sets
+        user_finances = self.milp.user_finances
+        portfolio = user_finances.portfolio.copy(deep=True)
+        total_goal_contributions = {goal_id: 0.0 for goal_id in user_finances.goals}
+        allocations = defaultdict(float)
+        withdrawals = defaultdict(float)
+        for working_period in sets.decision_periods.working_periods:
+            (
+                monthly_allocations,
+                goal_contributions,
+                monthly_withdrawals,
+            ) = self.heuristic.create_allocation_for_working_period(
+                portfolio,
+                user_finances.goals,
+                total_goal_contributions,
+                user_finances.financial_profile,
+                working_period=working_period,
+            )
+            num_months = len(working_period.months)
+            for month, allocation, withdrawal in zip(
+                working_period.months, monthly_allocations, monthly_withdrawals
+            ):
+                for id_, payment in allocation.payments.items():
+                    i = sets.get_instrument_index(id_)
+                    allocations[i, working_period.index] += payment / num_months
+                for id_, amount in withdrawal.items():
+                    i = sets.get_instrument_index(id_)
+                    withdrawals[i, working_period.index] += amount / num_months
+                PortfolioManager.forward_on_month(
+                    portfolio,
+                    payments=allocation.payments,
+                    month=month,
+                    withdrawals=withdrawal,
+                )
+                for goal_id, contribution in goal_contributions.items():
+                    total_goal_contributions[goal_id] += contribution
+        return allocations, withdrawals
+
+    def load(self):
+        allocations, withdrawals = self.create_heuristic_plan()
+        self._load_allocations(allocations, withdrawals)
+        self._load_balances()
+        self._load_taxes()
+        if not self.milp.solve_with_fixed_integers():
+            logging.warning(
+                "The integer variables of the heuristic plan are infeasible;"
+                " the solver is warm started from the heuristic plan as is"
+            )
+        self._load_unused_variables()
+
+    def _load_allocations(
+        self, allocations: InstrumentValues, withdrawals: InstrumentValues
+    ):
+        sets = self.milp.sets
+        vars_ = self.milp.variables
+        for i, t in itertools.product(
+            sets.instruments, sets.all_decision_periods_as_set
+        ):
+            vars_.get_allocation(i, t).value = allocations.get((i, t), 0)
+        for i, t in itertools.product(
+            sets.investments, sets.all_decision_periods_as_set
+        ):
+            vars_.get_withdrawal(i, t).value = withdrawals.get((i, t), 0)
+
+    def _load_balances(self):
+        """the balances follow the account balance constraints of the MILP"""
+        sets = self.milp.sets
+        pars = self.milp.milp_parameters
+        vars_ = self.milp.variables
+        for i in sets.instruments:
+            balance = pars.get_starting_balance(i)
+            for t in sorted(sets.all_decision_periods_as_set):
+                withdrawal = (
+                    vars_.get_withdrawal(i, t).value if pars.get_is_investment(i) else 0
+                )
+                balance = calculate_instrument_balance(
+                    balance,
+                    sets.get_num_months_in_decision_period(t),
+                    pars.get_average_interest_rate(i, t),
+                    withdrawal,
+                    vars_.get_allocation(i, t).value,
+                )
+                vars_.get_balance(i, t).value = balance
+        for l, t in itertools.product(sets.loans, sets.all_decision_periods_as_set):
+            balance = vars_.get_balance(l, t).value
+            is_paid_off = math.isclose(balance, 0, abs_tol=PAID_OFF_TOLERANCE)
+            vars_.get_is_unpaid(l, t).value = 0 if is_paid_off else 1
+
+    def _load_taxes(self):
+        """the bracket indicators follow the taxable income of the heuristic plan"""
+        sets = self.milp.sets
+        pars = self.milp.milp_parameters
+        vars_ = self.milp.variables
+        attribute_utility = AttributeUtility(sets=sets, pars=pars, vars=vars_)
+        for t in sets.all_decision_periods_as_set:
+            taxable_income = (
+                pars.get_before_tax_monthly_income(t)
+                + pe.value(attribute_utility.get_total_taxable_withdrawals(t))
+                - pe.value(attribute_utility.get_rrsp_allocations(t))
+            )
+            vars_.get_taxable_monthly_income(t).value = taxable_income
+            for e, b in sets.taxing_entities_and_brackets:
+                income_surplus = (
+                    taxable_income - pars.get_previous_bracket_cumulative_income(e, b)
+                )
+                bracket_marginal_income = pars.get_bracket_marginal_income(e, b)
+                is_surplus_greater_than_band = income_surplus > bracket_marginal_income
+                taxable_income_in_bracket = min(income_surplus, bracket_marginal_income)
+                vars_.get_income_surplus_greater_than_bracket_band(t, e, b).value = int(
+                    is_surplus_greater_than_band
+                )
+                vars_.get_taxable_income_in_bracket(
+                    t, e, b
+                ).value = taxable_income_in_bracket
+                vars_.get_taxes_accrued_in_bracket(t, e, b).value = max(
+                    0,
+                    taxable_income_in_bracket
+                    * pars.get_bracket_marginal_tax_rate(e, b),
+                )
+
+    def _load_unused_variables(self):
+        """variables that are in none of the constraints are not passed to the solver and keep their initial value"""
+        for v in self.milp.pyomodel.component_data_objects(pe.Var):
+            if v.value is None:
+                v.value = 0 if v.lb is None else v.lb
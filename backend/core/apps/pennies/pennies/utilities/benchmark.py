@@ -0,0 +1,181 @@
+import json
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+
+from pennies.dao.json_dao import JsonDao
+from pennies.main import solve_request
+from pennies.model.request import PenniesRequest
+from pennies.model.status import PenniesStatus
+from pennies.utilities.examples import synthetic_request, all_strategies
+from pennies.utilities.metrics import RequestMetrics
+
+# every synthetic dimension is scaled while the others stay at their defaults
+SYNTHETIC_SIZES = {
+    "num_loans": [1, 4, 8, 16],
+    "num_investments": [1, 4, 8, 16],
+    "num_goals": [0, 2, 4, 8],
+    "years_to_death": [45, 65, 85],
+}
+MAX_TIME_RATIO = 1.2
+MAX_OBJECTIVE_CHANGE = 0.01
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    request: PenniesRequest
+
+
+@dataclass
+class BenchmarkResult:
+    case: str
+    strategy: str
+    is_success: bool
+    p50_seconds: float
+    p95_seconds: float
+    peak_rss_mb: float
+    num_variables: Optional[int] = None
+    num_binary_variables: Optional[int] = None
+    num_constraints: Optional[int] = None
+    objective: Optional[float] = None
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.case, self.strategy
+
+
+@dataclass
+class BenchmarkComparison:
+    current: BenchmarkResult
+    baseline: BenchmarkResult
+
+    @property
+    def time_ratio(self) -> float:
+        return self.current.p50_seconds / max(self.baseline.p50_seconds, 1e-9)
+
+    @property
+    def objective_change(self) -> Optional[float]:
+        if self.current.objective is None or self.baseline.objective is None:
+            return None
+        scale = max(abs(self.baseline.objective), 1)
+        return abs(self.current.objective - self.baseline.objective) / scale
+
+    @property
+    def is_regression(self) -> bool:
+        objective_change = self.objective_change
+        return (
+            self.time_ratio > MAX_TIME_RATIO
+            or (self.baseline.is_success and not self.current.is_success)
+            or (
+                objective_change is not None and objective_change > MAX_OBJECTIVE_CHANGE
+            )
+        )
+
+
+def get_stored_cases(data_dir: Path) -> List[BenchmarkCase]:
+    json_dao = JsonDao(data_dir=data_dir)
+    return [
+        BenchmarkCase(name=Path(f).stem, request=json_dao.read_request(f))
+        for f in sorted(os.listdir(data_dir))
+        if f.endswith(".json")
+    ]
+
+
+def get_synthetic_cases() -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase(
+            name=f"synthetic_{dimension}_{size}",
+            request=synthetic_request(**{dimension: size}),
+        )
+        for dimension, sizes in SYNTHETIC_SIZES.items()
+        for size in sizes
+    ]
+
+
+def get_peak_rss_mb() -> float:
+    """the peak resident memory of the process - linux reports it in kilobytes"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_strategy(case: BenchmarkCase, strategy: str, repeats: int) -> BenchmarkResult:
+    request = case.request.copy(update={"strategies": [strategy]}).dict()
+    seconds = []
+    is_success = True
+    metrics = RequestMetrics()
+    for _ in range(repeats):
+        metrics = RequestMetrics()
+        start = time.perf_counter()
+        response = solve_request(request, metrics)
+        seconds.append(time.perf_counter() - start)
+        is_success = is_success and response["status"] == PenniesStatus.SUCCESS
+    result = BenchmarkResult(
+        case=case.name,
+        strategy=strategy,
+        is_success=is_success,
+        p50_seconds=float(np.percentile(seconds, 50)),
+        p95_seconds=float(np.percentile(seconds, 95)),
+        peak_rss_mb=get_peak_rss_mb(),
+    )
+    strategy_metrics = metrics.strategies.get(strategy)
+    if strategy_metrics is not None and strategy_metrics.model_size is not None:
+        result.num_variables = strategy_metrics.model_size.num_variables
+        result.num_binary_variables = strategy_metrics.model_size.num_binary_variables
+        result.num_constraints = strategy_metrics.model_size.num_constraints
+    if strategy_metrics is not None and strategy_metrics.solver_statistics is not None:
+        result.objective = strategy_metrics.solver_statistics.objective
+    return result
+
+
+def run_case(
+    case: BenchmarkCase, strategies: Optional[List[str]], repeats: int
+) -> List[BenchmarkResult]:
+    strategies = strategies or case.request.strategies or all_strategies()
+    return [run_strategy(case, strategy, repeats) for strategy in strategies]
+
+
+def run_benchmark(
+    cases: List[BenchmarkCase],
+    strategies: Optional[List[str]] = None,
+    repeats: int = 3,
+    is_isolated: bool = True,
+) -> List[BenchmarkResult]:
+    """isolated cases run in their own process so that the peak memory is measured per case"""
+    results = []
+    for case in cases:
+        if is_isolated:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                results += executor.submit(run_case, case, strategies, repeats).result()
+        else:
+            results += run_case(case, strategies, repeats)
+    return results
+
+
+def write_results(results: List[BenchmarkResult], path: Path):
+    with open(str(path), "w") as f:
+        json.dump([asdict(result) for result in results], f, indent=4)
+
+
+def read_results(path: Path) -> List[BenchmarkResult]:
+    with open(str(path)) as f:
+        return [BenchmarkResult(**result) for result in json.load(f)]
+
+
+def compare_results(
+    results: List[BenchmarkResult], baseline: List[BenchmarkResult]
+) -> List[BenchmarkComparison]:
+    """only the cases and strategies that are in both the results and the baseline are compared"""
+    baseline_by_key: Dict[Tuple[str, str], BenchmarkResult] = {
+        result.key: result for result in baseline
+    }
+    return [
+        BenchmarkComparison(current=result, baseline=baseline_by_key[result.key])
+        for result in results
+        if result.key in baseline_by_key
+    ]
@@ -229,6 +229,57 @@ def only_investments_request() -> PenniesRequest:
     )
 
 
+def large_request(
+    num_instruments: int = 20, years_to_death: int = 60
+) -> PenniesRequest:
+    """a synthetic request with many instruments and a long planning horizon - used for benchmarks"""
+    instruments = []
+    while len(instruments) < num_instruments:
+        instruments += simple_request_loans() + simple_investments()
+    instruments = instruments[:num_instruments]
+    profile = financial_profile()
+    profile.years_to_death = years_to_death
+    return PenniesRequest(
+        financial_profile=profile,
+        loans=[i for i in instruments if isinstance(i, Loan)],
+        investments=[i for i in instruments if not isinstance(i, Loan)],
+        strategies=all_strategies(),
+        goals=simple_goals(),
+    )
+
+
+def synthetic_request(
+    num_loans: int = 3,
+    num_investments: int = 3,
+    num_goals: int = 3,
+    years_to_death: int = 65,
+) -> PenniesRequest:
+    """a request that scales along every dimension of the problem - used for benchmarks"""
+    loans = []
+    while len(loans) < num_loans:
+        loans += simple_request_loans()
+    investments = []
+    while len(investments) < num_investments:
+        investments += simple_investments()
+    goals = [
+        NestEgg(name=f"nest egg {g}", amount=15_000, due_month=12 * (g + 1))
+        if g % 2 == 0
+        else BigPurchase(
+            name=f"big purchase {g}", amount=15_000, due_month=12 * (g + 1)
+        )
+        for g in range(num_goals)
+    ]
+    profile = financial_profile()
+    profile.years_to_death = years_to_death
+    return PenniesRequest(
+        financial_profile=profile,
+        loans=loans[:num_loans],
+        investments=investments[:num_investments],
+        strategies=all_strategies(),
+        goals=goals,
+    )
+
+
 def simple_user_finances() -> UserPersonalFinances:
     return ProblemInputFactory.from_request(simple_request()).user_finances
 
@@ -1,6 +1,9 @@
 import math
+from functools import lru_cache
 from typing import List
 
+import numpy as np
+
 from pennies.model import taxes
 from pennies.model.constants import Province, InvestmentAccountType
 from pennies.model.instrument import Instrument
@@ -41,9 +44,7 @@ def calculate_loan_ending_payment(current_balance, interest_rate, num_months) ->
 
 
 def calculate_average_monthly_interest_rate(instrument: Instrument, months: List[int]):
-    return sum(instrument.monthly_interest_rate(month) for month in months) / len(
-        months
-    )
+    return sum(instrument.get_monthly_interest_rates(months).tolist()) / len(months)
 
 
 def calculate_balance_after_fixed_monthly_payments(
@@ -87,6 +88,27 @@ def calculate_monthly_income_tax_from_brackets(
     raise ValueError(f"Could not calculate income taxes for {income} using {brackets}")
 
 
+def calculate_monthly_income_tax_array_from_brackets(
+    incomes: np.ndarray, brackets: IncomeTaxBrackets
+) -> np.ndarray:
+    """
+    calculate_monthly_income_tax_from_brackets for every income at once
+    the brackets are still applied one after the other so that the taxes are exactly the same
+    """
+    upper_bounds, tax_rates = brackets.get_monthly_bracket_arrays()
+    rem_incomes = np.array(incomes, dtype=float)
+    taxes = np.zeros_like(rem_incomes)
+    for upper_bound, tax_rate in zip(upper_bounds, tax_rates):
+        taxable_incomes_in_bracket = np.minimum(rem_incomes, upper_bound)
+        taxes += taxable_incomes_in_bracket * tax_rate
+        rem_incomes -= taxable_incomes_in_bracket
+    if np.any(rem_incomes != 0):
+        raise ValueError(
+            f"Could not calculate income taxes for {np.asarray(incomes)[rem_incomes != 0]} using {brackets}"
+        )
+    return taxes
+
+
 def calculate_annual_income_tax(income: float, province: Province):
     prov_tax = calculate_annual_income_tax_from_brackets(
         income, PROVINCIAL_TAX_MAP[province]
@@ -95,6 +117,7 @@ def calculate_annual_income_tax(income: float, province: Province):
     return prov_tax + fed_tax
 
 
+@lru_cache(maxsize=4096)
 def calculate_monthly_income_tax(income: float, province: Province):
     prov_tax = calculate_monthly_income_tax_from_brackets(
         income, PROVINCIAL_TAX_MAP[province]
@@ -103,6 +126,16 @@ def calculate_monthly_income_tax(income: float, province: Province):
     return prov_tax + fed_tax
 
 
+def calculate_monthly_income_tax_array(
+    incomes: np.ndarray, province: Province
+) -> np.ndarray:
+    prov_taxes = calculate_monthly_income_tax_array_from_brackets(
+        incomes, PROVINCIAL_TAX_MAP[province]
+    )
+    fed_taxes = calculate_monthly_income_tax_array_from_brackets(incomes, taxes.FEDERAL)
+    return prov_taxes + fed_taxes
+
+
 def calculate_instrument_balance(
     cur_balance, num_months, growth_rate, withdrawal, allocation
 ):
@@ -126,7 +159,7 @@ def calculate_instrument_balance(
 
 
 def estimate_taxable_withdrawal(
-    investment: BaseInvestment, withdrawal, months: List[int]
+    investment: BaseInvestment, withdrawal, starting_month: int, final_month: int
 ):
     """
     This isn't the correct way to calculate capital gains but it's an okay estimation based on the investment lifetime
@@ -135,6 +168,8 @@ def estimate_taxable_withdrawal(
     For RRSPs and TFSAs, this is correct
     But for Non-registered the ACB (adjusted cost base) is needed - introducing ACB makes the calculation non-linear
     and not suitable for MILPs
+
+    The investment grows from the start of the starting month until the start of the final month
     """
     if investment.account_type == InvestmentAccountType.RRSP:
         # RRSP withdrawals are fully taxed
@@ -144,9 +179,9 @@ def estimate_taxable_withdrawal(
     else:  # non-registered investment
         # estimate based on average interest rate and decision period
         # can't actually calculate this because of non-linear nature of capital gains calculation
-        estimated_total_return_rate = 1
-        for month in months:
-            estimated_total_return_rate *= 1 + investment.monthly_interest_rate(month)
+        estimated_total_return_rate = investment.get_growth_factor(
+            starting_month, final_month
+        )
         if estimated_total_return_rate <= 0:
             # TODO: there could be tax write-offs for investments that lose money
             # but hard to estimate
@@ -0,0 +1,115 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class ModelSize:
+    num_variables: int
+    num_binary_variables: int
+    num_constraints: int
+
+
+@dataclass
+class SolverStatistics:
+    status: str
+    termination_condition: str
+    num_nodes: Optional[int] = None
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+
+    @property
+    def gap(self) -> Optional[float]:
+        if self.objective is None or self.best_bound is None or self.objective == 0:
+            return None
+        return abs(self.best_bound - self.objective) / abs(self.objective)
+
+
+@dataclass
+class StrategyMetrics:
+    """The wall time of every phase of a strategy and the size of its MILP"""
+
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    model_size: Optional[ModelSize] = None
+    solver_statistics: Optional[SolverStatistics] = None
+
+    def add_phase_seconds(self, phase: str, seconds: float):
+        """phases that happen more than once (e.g. a greedy plan that also solves a MILP) are added up"""
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0) + seconds
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phase_seconds.values())
+
+
+@dataclass
+class RequestMetrics:
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    strategies: Dict[str, StrategyMetrics] = field(default_factory=dict)
+
+    @contextmanager
+    def time_phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[phase] = time.perf_counter() - start
+
+    def log(self):
+        for phase, seconds in self.phase_seconds.items():
+            logging.info(f"{phase}: {seconds:.3f}s")
+        for strategy, metrics in self.strategies.items():
+            for phase, seconds in metrics.phase_seconds.items():
+                logging.info(f"{strategy} - {phase}: {seconds:.3f}s")
+            if metrics.model_size is not None:
+                size = metrics.model_size
+                logging.info(
+                    f"{strategy} - model size: {size.num_variables} variables,"
+                    f" {size.num_binary_variables} binary variables,"
+                    f" {size.num_constraints} constraints"
+                )
+            if metrics.solver_statistics is not None:
+                statistics = metrics.solver_statistics
+                logging.info(
+                    f"{strategy} - solver: {statistics.termination_condition},"
+                    f" nodes: {statistics.num_nodes}, gap: {statistics.gap}"
+                )
+
+
+_STRATEGY_METRICS: ContextVar[Optional[StrategyMetrics]] = ContextVar(
+    "strategy_metrics", default=None
+)
+
+
+def get_strategy_metrics() -> Optional[StrategyMetrics]:
+    """the metrics of the strategy that is being planned - none if no one asked for metrics"""
+    return _STRATEGY_METRICS.get()
+
+
+@contextmanager
+def record_strategy_metrics(metrics: Optional[RequestMetrics], strategy: str):
+    if metrics is None:
+        yield None
+        return
+    strategy_metrics = metrics.strategies.setdefault(strategy, StrategyMetrics())
+    token = _STRATEGY_METRICS.set(strategy_metrics)
+    try:
+        yield strategy_metrics
+    finally:
+        _STRATEGY_METRICS.reset(token)
+
+
+@contextmanager
+def timed_phase(phase: str):
+    strategy_metrics = get_strategy_metrics()
+    if strategy_metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        strategy_metrics.add_phase_seconds(phase, time.perf_counter() - start)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pennies.main import solve_request
+from pennies.model.status import PenniesStatus
+
+FINGERPRINT_VERSION = 1
+# bump when the plans change for the same request so that the cached plans are not reused
+DEFAULT_TTL_SECONDS = 60 * 60
+DEFAULT_MAX_ENTRIES = 256
+_IGNORED_KEYS = {"id_"}
+# generated for every request so they do not change the plan
+
+
+def _canonicalize(value: Any) -> Any:
+    """drops the generated ids and sorts every list so that the order of the loans, investments, etc. is ignored"""
+    if isinstance(value, dict):
+        return {
+            str(key): _canonicalize(item)
+            for key, item in value.items()
+            if key not in _IGNORED_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        items = [_canonicalize(item) for item in value]
+        return sorted(items, key=_to_json)
+    return value
+
+
+def _to_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def get_request_fingerprint(request: Dict, today: Optional[date] = None) -> str:
+    """
+    a hash of the request that is the same for requests with the same plans - the current month is included because
+    the plans are relative to it
+    """
+    today = date.today() if today is None else today
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "month": today.strftime("%Y-%m"),
+        "request": _canonicalize(request),
+    }
+    return hashlib.sha256(_to_json(payload).encode()).hexdigest()
+
+
+class PlanCacheBackend(ABC):
+    def get(self, key: str) -> Optional[Dict]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: Dict, ttl_seconds: float):
+        raise NotImplementedError()
+
+
+@dataclass
+class LRUPlanCacheBackend(PlanCacheBackend):
+    """An in-process cache that drops the least recently used plans once it has max_entries plans"""
+
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    clock: Callable[[], float] = time.monotonic
+    _entries: "OrderedDict[str, Tuple[float, Dict]]" = field(
+        default_factory=OrderedDict
+    )
+    # key -> (expiry time, response)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@dataclass
+class PlanCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    # backend failures - the plan is solved as if it was a miss
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return None
+        return self.hits / lookups
+
+
+@dataclass
+class PlanCache:
+    """
+    Caches the successful responses of the solver by the fingerprint of the request
+    failed responses are not cached so that they are retried
+    the in-process backend hands out the same response to every hit so the responses must not be changed
+    """
+
+    backend: PlanCacheBackend = field(default_factory=LRUPlanCacheBackend)
+    solver: Callable[[Dict], Dict] = solve_request
+    ttl_seconds: float = DEFAULT_TTL_SECONDS
+    metrics: PlanCacheMetrics = field(default_factory=PlanCacheMetrics)
+
+    def solve(self, request: Dict) -> Dict:
+        key = get_request_fingerprint(request)
+        response = self._get(key)
+        if response is not None:
+            self.metrics.hits += 1
+            return response
+        self.metrics.misses += 1
+        response = self.solver(request)
+        if response["status"] == PenniesStatus.SUCCESS:
+            self._set(key, response)
+        return response
+
+    def _get(self, key: str) -> Optional[Dict]:
+        try:
+            return self.backend.get(key)
+        except Exception:
+            self.metrics.errors += 1
+            logging.exception("Could not read a plan from the plan cache")
+            return None
+
+    def _set(self, key: str, response: Dict):
+        try:
+            self.backend.set(key, response, self.ttl_seconds)
+        except Exception:
+            self.metrics.errors += 1
+            logging.exception("Could not write a plan to the plan cache")
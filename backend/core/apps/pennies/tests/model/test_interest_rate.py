@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from pennies.model.interest_rate import (
+    FixedInvestmentInterestRate,
+    FixedLoanInterestRate,
+    GuaranteedInvestmentReturnRate,
+    InvestmentReturnRate,
+    MortgageInterestRate,
+    VariableInvestmentInterestRate,
+    VariableLoanInterestRate,
+    ZeroGrowthRate,
+)
+from pennies.model.prime import FUTURE_PRIME_START_YEAR
+from pennies.utilities.datetime import MONTHS_IN_YEAR
+
+NUM_MONTHS = 80 * MONTHS_IN_YEAR
+
+
+@pytest.mark.parametrize(
+    "rate",
+    [
+        ZeroGrowthRate(),
+        FixedLoanInterestRate(apr=4.5),
+        VariableLoanInterestRate(prime_modifier=1.3),
+        FixedInvestmentInterestRate(roi=2.1),
+        VariableInvestmentInterestRate(prime_modifier=-0.5),
+        InvestmentReturnRate(roi=6.7, volatility=12),
+        GuaranteedInvestmentReturnRate(
+            interest_rate=VariableInvestmentInterestRate(prime_modifier=0.2),
+            final_month=FUTURE_PRIME_START_YEAR * MONTHS_IN_YEAR + 5,
+        ),
+        MortgageInterestRate(
+            interest_rate=FixedLoanInterestRate(apr=2.3),
+            current_term_end_month=FUTURE_PRIME_START_YEAR * MONTHS_IN_YEAR - 7,
+            default_interest_rate=VariableLoanInterestRate(prime_modifier=0.9),
+        ),
+    ],
+)
+def test_curve_equals_monthly_interest_rates(rate):
+    months = list(range(NUM_MONTHS))
+    expected = [rate.get_monthly_interest_rate(month) for month in months]
+    assert rate.get_monthly_interest_rates(months).tolist() == expected
+    assert [rate.get_curve_interest_rate(month) for month in months] == expected
+    assert rate.get_interest_rate_curve() is rate.get_interest_rate_curve(NUM_MONTHS)
+    assert not rate.get_interest_rate_curve().flags.writeable
+
+
+def test_curve_grows_past_the_horizon():
+    rate = VariableLoanInterestRate(prime_modifier=1)
+    num_months = len(rate.get_interest_rate_curve()) + 10
+    curve = rate.get_interest_rate_curve(num_months)
+    assert len(curve) == num_months
+    assert curve[-1] == rate.get_monthly_interest_rate(num_months - 1)
+    assert np.array_equal(
+        rate.get_monthly_interest_rates([-1, 0]),
+        [rate.get_monthly_interest_rate(-1), rate.get_monthly_interest_rate(0)],
+    )
+
+
+@pytest.mark.parametrize("starting_month", [0, 7, 40])
+def test_growth_factor_equals_product_of_monthly_rates(starting_month: int):
+    rate = GuaranteedInvestmentReturnRate(
+        interest_rate=VariableInvestmentInterestRate(prime_modifier=0.2),
+        final_month=FUTURE_PRIME_START_YEAR * MONTHS_IN_YEAR + 5,
+    )
+    for final_month in range(starting_month, NUM_MONTHS, 13):
+        expected = 1
+        for month in range(starting_month, final_month):
+            expected *= 1 + rate.get_monthly_interest_rate(month)
+        assert rate.get_growth_factor(starting_month, final_month) == expected
+    assert rate.get_growth_factor(starting_month, starting_month - 1) == 1
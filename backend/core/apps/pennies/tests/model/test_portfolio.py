@@ -143,3 +143,55 @@ def test_forward_on_guaranteed_investment():
     assert p.instruments[gi.id_].current_balance == nb
     PortfolioManager.forward_on_month(portfolio=p, payments=dict(), month=3)
     assert p.instruments[gi.id_].current_balance == nb
+
+
+def test_type_index_follows_instrument_changes():
+    user_finances = make_user_finances()
+    portfolio = user_finances.portfolio
+    loans = portfolio.loans
+    assert portfolio.loans is loans  # the index is reused until the instruments change
+    assert len(loans) == 3 and len(portfolio.non_guaranteed_investments()) == 1
+
+    copied = portfolio.copy(deep=True)
+    assert all(
+        loan is copied.instruments[loan.id_] for loan in copied.loans
+    )  # not the instruments of the original portfolio
+
+    paid_off_loan = loans[0]
+    paid_off_loan.current_balance = 0
+    PortfolioManager.forward_on_month(portfolio, payments=dict(), month=TEST_MONTH)
+    assert paid_off_loan.id_ not in portfolio.loans_by_id
+    assert len(portfolio.loans) == 2
+
+    portfolio.add_instrument(paid_off_loan)
+    assert paid_off_loan.id_ in portfolio.loans_by_id
+
+    portfolio.instruments = {paid_off_loan.id_: paid_off_loan}
+    assert portfolio.loans == (paid_off_loan,)
+
+
+def test_type_index_follows_instruments_replaced_in_place():
+    portfolio = make_user_finances().portfolio
+    loan = portfolio.loans[0]
+    investment = portfolio.investments[0]
+    assert loan.id_ in portfolio.loans_by_id
+
+    portfolio.instruments[loan.id_] = investment
+    assert loan.id_ not in portfolio.loans_by_id
+    assert len(portfolio.loans) == 2
+
+    with pytest.raises(TypeError):
+        portfolio.loans_by_id[loan.id_] = loan
+
+
+def test_type_index_is_kept_when_nothing_is_removed():
+    portfolio = make_user_finances().portfolio
+    loans = portfolio.loans
+    loan = loans[0]
+
+    assert portfolio.instruments.pop(UUID(int=0), None) is None
+    assert portfolio.instruments.setdefault(loan.id_) is loan
+    assert portfolio.loans is loans
+
+    portfolio.instruments.pop(loan.id_)
+    assert loan.id_ not in portfolio.loans_by_id
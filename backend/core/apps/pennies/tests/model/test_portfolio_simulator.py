@@ -0,0 +1,52 @@
+import math
+
+import pytest
+
+from pennies.model.factories.financial_plan import FinancialPlanFactory
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.model.solution import FinancialPlan
+from pennies.strategies.greedy import AvalancheStrategy
+from pennies.strategies.milp.strategy import MILPStrategy
+from pennies.utilities.examples import all_requests
+
+
+def _assert_plans_agree(plan: FinancialPlan, reference: FinancialPlan):
+    assert len(plan.monthly_solutions) == len(reference.monthly_solutions)
+    for ms, reference_ms in zip(plan.monthly_solutions, reference.monthly_solutions):
+        assert ms.month == reference_ms.month
+        assert (
+            ms.portfolio.instruments.keys() == reference_ms.portfolio.instruments.keys()
+        )
+        for id_, instrument in reference_ms.portfolio.instruments.items():
+            assert math.isclose(
+                ms.portfolio.instruments[id_].current_balance,
+                instrument.current_balance,
+                abs_tol=1e-6,
+            )
+        for attribute in ["taxes_paid", "gross_income", "taxable_income"]:
+            assert math.isclose(
+                getattr(ms, attribute), getattr(reference_ms, attribute), abs_tol=1e-6
+            )
+        assert math.isclose(
+            ms.allocation.leftover, reference_ms.allocation.leftover, abs_tol=1e-6
+        )
+
+
+@pytest.mark.parametrize("strategy", [MILPStrategy(), AvalancheStrategy()])
+@pytest.mark.parametrize("request_", all_requests())
+def test_simulator_agrees_with_portfolio_manager(strategy, request_: PenniesRequest):
+    problem_input = ProblemInputFactory.from_request(request_)
+    user_finances = problem_input.user_finances
+    parameters = problem_input.parameters
+    plan = strategy.create_plan(user_finances, parameters)
+    monthly_payments = [ms.allocation.payments for ms in plan.monthly_solutions]
+    monthly_withdrawals = [ms.withdrawals for ms in plan.monthly_solutions]
+
+    simulated_plan = FinancialPlanFactory.create(
+        monthly_payments, user_finances, parameters, monthly_withdrawals
+    )
+    reference_plan = FinancialPlanFactory.create_with_portfolio_manager(
+        monthly_payments, user_finances, parameters, monthly_withdrawals
+    )
+    _assert_plans_agree(simulated_plan, reference_plan)
@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.model.solution import FinancialPlan, MonthlySolutionColumns
+from pennies.strategies.greedy import AvalancheStrategy
+from pennies.utilities.examples import all_requests
+
+
+def _create_plan(request: PenniesRequest) -> FinancialPlan:
+    problem_input = ProblemInputFactory.from_request(request)
+    return AvalancheStrategy().create_plan(
+        problem_input.user_finances, problem_input.parameters
+    )
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_columns_round_trip(request_: PenniesRequest):
+    plan = _create_plan(request_)
+    monthly_solutions = list(plan.monthly_solutions)
+    round_trip = FinancialPlan(monthly_solutions=monthly_solutions)
+    assert len(round_trip.monthly_solutions) == len(monthly_solutions)
+    for ms, round_trip_ms in zip(monthly_solutions, round_trip.monthly_solutions):
+        assert ms.month == round_trip_ms.month
+        assert ms.allocation.payments == round_trip_ms.allocation.payments
+        assert ms.withdrawals == round_trip_ms.withdrawals
+        assert ms.portfolio.instruments == round_trip_ms.portfolio.instruments
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_plan_reductions_match_monthly_solutions(request_: PenniesRequest):
+    plan = _create_plan(request_)
+    monthly_solutions = list(plan.monthly_solutions)
+
+    assert math.isclose(
+        plan.get_total_interest_paid_on_loans(),
+        sum(ms.get_total_loans_interest(ms.month) for ms in monthly_solutions),
+        abs_tol=1e-6,
+    )
+    assert math.isclose(
+        plan.get_total_interest(),
+        sum(ms.get_total_interest(ms.month) for ms in monthly_solutions),
+        abs_tol=1e-6,
+    )
+    assert math.isclose(
+        plan.get_net_worth_at(len(monthly_solutions) // 2),
+        monthly_solutions[len(monthly_solutions) // 2 - 1].get_value(),
+        abs_tol=1e-6,
+    )
+    for loan in monthly_solutions[0].portfolio.loans:
+        assert math.isclose(
+            plan.get_interest_paid_on_loan(loan.id_),
+            sum(
+                abs(ms.get_loan_interest_incurred(loan.id_)) for ms in monthly_solutions
+            ),
+            abs_tol=1e-6,
+        )
+
+    debt_free_month = next(
+        (
+            month + 1
+            for month, ms in enumerate(monthly_solutions)
+            if ms.portfolio.get_debt() < 1
+        ),
+        None,
+    )
+    assert plan.debt_free_month == debt_free_month
+    first_positive_net_worth_month = next(
+        (
+            month + 1
+            for month, ms in enumerate(monthly_solutions)
+            if ms.portfolio.net_worth > -1
+        ),
+        None,
+    )
+    assert plan.first_positive_net_worth_month == first_positive_net_worth_month
+
+
+def test_concatenate_aligns_instruments():
+    plan = _create_plan(all_requests()[0])
+    columns = plan.columns
+    first_half = FinancialPlan(monthly_solutions=plan.monthly_solutions[:100]).columns
+    second_half = FinancialPlan(monthly_solutions=plan.monthly_solutions[100:]).columns
+    concatenated = MonthlySolutionColumns.concatenate([first_half, second_half])
+    assert len(concatenated) == len(columns)
+    for instrument in concatenated.instruments:
+        i = concatenated.instrument_indices[instrument.id_]
+        j = columns.instrument_indices[instrument.id_]
+        assert (concatenated.is_active[i] == columns.is_active[j]).all()
+        assert (concatenated.active_balances[i] == columns.active_balances[j]).all()
@@ -1,8 +1,15 @@
 from math import isclose
 
+import numpy as np
+import pytest
+
+from pennies.model.constants import Province
 from pennies.model.taxes import TaxBracket, IncomeTaxBrackets
 from pennies.utilities.finance import (
     calculate_annual_income_tax_from_brackets,
+    calculate_monthly_income_tax,
+    calculate_monthly_income_tax_array,
+    calculate_monthly_income_tax_array_from_brackets,
     calculate_monthly_income_tax_from_brackets,
 )
 
@@ -50,3 +57,18 @@ def test_cumulative_incomes():
     test_brackets = make_simple_brackets()
     assert test_brackets.get_bracket_cumulative_income(0) == 50
     assert test_brackets.get_bracket_cumulative_income(1) == 150
+
+
+@pytest.mark.parametrize("province", list(Province))
+def test_vectorized_monthly_income_tax(province: Province):
+    incomes = np.array([-1_000, 0, 0.01, 2_500, 4_085.25, 9_999.99])
+    expected = [calculate_monthly_income_tax(income, province) for income in incomes]
+    assert calculate_monthly_income_tax_array(incomes, province).tolist() == expected
+
+
+def test_vectorized_monthly_income_tax_above_top_bracket():
+    test_brackets = make_simple_brackets()
+    with pytest.raises(ValueError):
+        calculate_monthly_income_tax_array_from_brackets(
+            np.array([1, 200 / 12]), test_brackets
+        )
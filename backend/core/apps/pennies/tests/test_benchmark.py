@@ -0,0 +1,42 @@
+import dataclasses
+from pathlib import Path
+
+from pennies.strategies import StrategyName
+from pennies.utilities.benchmark import (
+    BenchmarkCase,
+    compare_results,
+    read_results,
+    run_benchmark,
+    write_results,
+)
+from pennies.utilities.examples import synthetic_request
+
+
+def test_benchmark_results_round_trip_and_compare(tmp_path: Path):
+    case = BenchmarkCase(
+        name="small", request=synthetic_request(num_loans=1, num_goals=0)
+    )
+    results = run_benchmark(
+        [case],
+        strategies=[StrategyName.two_cents_milp.value],
+        repeats=2,
+        is_isolated=False,
+    )
+    assert len(results) == 1
+    result = results[0]
+    assert result.is_success
+    assert 0 < result.p50_seconds <= result.p95_seconds
+    assert result.num_variables > 0
+    assert result.objective is not None
+
+    path = Path(tmp_path, "results.json")
+    write_results(results, path)
+    baseline = read_results(path)
+    assert baseline == results
+
+    comparisons = compare_results(results, baseline)
+    assert len(comparisons) == 1
+    assert not comparisons[0].is_regression
+
+    slower = dataclasses.replace(result, p50_seconds=2 * result.p50_seconds)
+    assert compare_results([slower], baseline)[0].is_regression
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pennies.main
+from pennies.main import (
+    create_pooled_plan,
+    create_processed_plans_concurrently,
+    create_processed_solution,
+)
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.parameters import PlanExecutor
+from pennies.strategies import StrategyName
+from pennies.strategies.milp.milp import MILP
+from pennies.utilities.examples import simple_request
+from pennies.utilities.metrics import RequestMetrics
+
+INVESTMENT = StrategyName.investment_milp.value
+GOAL = StrategyName.goal_milp.value
+
+
+def _make_problem_input(strategies=None):
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    problem_input.strategies = strategies
+    problem_input.parameters.plan_executor = PlanExecutor.THREAD
+    return problem_input
+
+
+def _fake_create_processed_plan(seconds_by_strategy, has_failed_goal=False):
+    def create(problem_input, strategy_name, shared_milp=None, metrics=None):
+        time.sleep(seconds_by_strategy.get(strategy_name, 0))
+        return SimpleNamespace(name=strategy_name, has_failed_goal=has_failed_goal)
+
+    return create
+
+
+def test_concurrent_solution_has_same_plans_as_sequential_solution():
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    problem_input.strategies = None
+    sequential_solution = create_processed_solution(problem_input.copy(deep=True))
+
+    problem_input.parameters.plan_executor = PlanExecutor.PROCESS
+    concurrent_solution = create_processed_solution(problem_input)
+
+    assert set(concurrent_solution.keys()) == set(sequential_solution.keys())
+
+
+def test_concurrent_plans_match_sequential_objectives():
+    problem_input = _make_problem_input(strategies=[INVESTMENT, GOAL])
+    problem_input.parameters.plan_executor = None
+    sequential_metrics = RequestMetrics()
+    create_processed_solution(problem_input.copy(deep=True), sequential_metrics)
+
+    problem_input.parameters.plan_executor = PlanExecutor.THREAD
+    concurrent_metrics = RequestMetrics()
+    create_processed_solution(problem_input, concurrent_metrics)
+
+    gap = problem_input.parameters.optimality_gap
+    for strategy in problem_input.strategies:
+        sequential = sequential_metrics.strategies[strategy].solver_statistics
+        concurrent = concurrent_metrics.strategies[strategy].solver_statistics
+        assert abs(concurrent.objective - sequential.objective) <= 2 * gap * abs(
+            sequential.objective
+        )
+
+
+def test_plan_past_its_deadline_is_dropped(monkeypatch):
+    monkeypatch.setattr(
+        pennies.main, "create_processed_plan", _fake_create_processed_plan({GOAL: 2}),
+    )
+    problem_input = _make_problem_input(strategies=[INVESTMENT, GOAL])
+    problem_input.parameters.plan_deadline_seconds = 0.5
+    start = time.perf_counter()
+    plans = create_processed_plans_concurrently(problem_input)
+    assert time.perf_counter() - start < 2
+    assert set(plans.keys()) == {INVESTMENT}
+
+
+def test_goal_plan_is_discarded_when_investment_plan_meets_every_goal(monkeypatch):
+    monkeypatch.setattr(
+        pennies.main,
+        "create_processed_plan",
+        _fake_create_processed_plan({GOAL: 0.2}, has_failed_goal=False),
+    )
+    plans = create_processed_plans_concurrently(_make_problem_input())
+    assert INVESTMENT in plans
+    assert GOAL not in plans
+
+
+def test_goal_plan_is_kept_when_investment_plan_fails_a_goal(monkeypatch):
+    monkeypatch.setattr(
+        pennies.main,
+        "create_processed_plan",
+        _fake_create_processed_plan({GOAL: 0.2}, has_failed_goal=True),
+    )
+    plans = create_processed_plans_concurrently(_make_problem_input())
+    assert {INVESTMENT, GOAL} <= set(plans.keys())
+
+
+def test_pooled_plan_is_capped_to_its_deadline(monkeypatch):
+    solved = list()
+
+    def create(problem_input, strategy_name, shared_milp=None, metrics=None):
+        solved.append(problem_input.parameters.max_milp_seconds)
+
+    monkeypatch.setattr(pennies.main, "create_processed_plan", create)
+    problem_input = _make_problem_input()
+    problem_input.parameters.max_milp_seconds = 30
+
+    assert create_pooled_plan(problem_input, INVESTMENT, time.time() - 1) is None
+    assert solved == []
+    create_pooled_plan(problem_input, INVESTMENT, time.time() + 5.5)
+    assert solved == [5]
+
+
+def _get_cbc_solve_dirs():
+    return {
+        name
+        for name in os.listdir(tempfile.gettempdir())
+        if name.startswith("pennies-cbc-")
+    }
+
+
+def test_concurrent_cbc_solves_keep_their_own_files(capfd):
+    is_solved = dict()
+
+    def solve(index):
+        problem_input = ProblemInputFactory.from_request(simple_request())
+        milp = MILP.create(problem_input.user_finances, problem_input.parameters)
+        is_solved[index] = milp.solve()
+
+    solve_dirs = _get_cbc_solve_dirs()
+    threads = [threading.Thread(target=solve, args=(index,)) for index in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert is_solved == {0: True, 1: True, 2: True}
+    assert _get_cbc_solve_dirs() == solve_dirs
+    assert "Solver log file" not in capfd.readouterr().out
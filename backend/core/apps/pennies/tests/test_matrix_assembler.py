@@ -0,0 +1,87 @@
+import dataclasses
+
+import numpy as np
+import pytest
+import pyomo.environ as pe
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.strategies.milp.constraints import MILPConstraints
+from pennies.strategies.milp.matrix import MILPMatrices
+from pennies.strategies.milp.milp import MILP
+from pennies.strategies.milp.solver_backends import HiGHSSolverBackend
+from pennies.utilities.examples import all_requests, simple_request
+
+# the model builder names the constraints c0, c1, ... in the order of the MILPConstraints fields
+CONSTRAINT_NAMES = {
+    f"c{i}": field.name for i, field in enumerate(dataclasses.fields(MILPConstraints))
+}
+
+
+def _get_rows(matrices: MILPMatrices):
+    rows = dict()
+    a_matrix = matrices.a_matrix
+    for row, (name, index) in enumerate(matrices.row_labels):
+        row_slice = slice(a_matrix.indptr[row], a_matrix.indptr[row + 1])
+        order = np.argsort(a_matrix.indices[row_slice])
+        rows[CONSTRAINT_NAMES.get(name, name), index] = (
+            a_matrix.indices[row_slice][order],
+            a_matrix.data[row_slice][order],
+            matrices.row_lower[row],
+            matrices.row_upper[row],
+        )
+    return rows
+
+
+def _is_same_row(expected, actual) -> bool:
+    """pyomo may move all the terms of a constraint to the other side"""
+    columns, coefficients, lower, upper = expected
+    actual_columns, actual_coefficients, actual_lower, actual_upper = actual
+    if not np.array_equal(columns, actual_columns):
+        return False
+    is_same = np.allclose(coefficients, actual_coefficients) and np.allclose(
+        [lower, upper], [actual_lower, actual_upper]
+    )
+    is_negated = np.allclose(coefficients, -actual_coefficients) and np.allclose(
+        [lower, upper], [-actual_upper, -actual_lower]
+    )
+    return is_same or is_negated
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_assembled_matrices_match_rule_based_model(request_: PenniesRequest):
+    problem_input = ProblemInputFactory.from_request(request_)
+    milp = MILP.create(problem_input.user_finances, problem_input.parameters)
+    expected = MILPMatrices.from_pyomodel(milp.pyomodel)
+    actual = milp.get_matrix_assembler().assemble()
+
+    expected_rows = _get_rows(expected)
+    actual_rows = _get_rows(actual)
+    assert expected_rows.keys() == actual_rows.keys()
+    for label, row in expected_rows.items():
+        assert _is_same_row(row, actual_rows[label]), label
+
+    assert np.allclose(expected.c, actual.c)
+    assert np.array_equal(expected.col_lower, actual.col_lower)
+    assert np.array_equal(expected.col_upper, actual.col_upper)
+    assert np.array_equal(expected.integrality, actual.integrality)
+
+
+@pytest.mark.skipif(
+    not HiGHSSolverBackend.is_available(), reason="highspy is not installed"
+)
+def test_matrix_milp_matches_rule_based_milp():
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    parameters = problem_input.parameters
+    parameters.solver_backend = "highs"
+    rule_based_milp = MILP.create(problem_input.user_finances, parameters.copy())
+    assert rule_based_milp.solve()
+
+    parameters.is_matrix_milp = True
+    matrix_milp = MILP.create(problem_input.user_finances, parameters)
+    assert matrix_milp.constraints is None
+    assert matrix_milp.solve()
+
+    expected = pe.value(rule_based_milp.pyomodel.obj)
+    actual = pe.value(matrix_milp.pyomodel.obj)
+    assert abs(expected - actual) <= 2 * parameters.optimality_gap * abs(expected)
@@ -0,0 +1,57 @@
+from pennies.main import create_processed_solution, solve_request_with_metrics
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.parameters import PlanExecutor
+from pennies.model.status import PenniesStatus
+from pennies.strategies import StrategyName
+from pennies.utilities.examples import simple_request
+from pennies.utilities.metrics import RequestMetrics
+
+MILP_PHASES = {
+    "sets",
+    "milp_parameters",
+    "variables",
+    "constraints",
+    "objective",
+    "model_build",
+    "solve",
+    "solution_extraction",
+    "simulation",
+    "net_worth_forecast",
+    "summaries",
+    "milestones",
+    "action_plan",
+    "failures",
+}
+
+
+def test_request_metrics_cover_every_phase():
+    request = simple_request()
+    request.strategies = [StrategyName.two_cents_milp.value]
+    response, metrics = solve_request_with_metrics(request.dict())
+    assert response["status"] == PenniesStatus.SUCCESS
+    assert {"request_parsing", "solution"} <= metrics.phase_seconds.keys()
+
+    strategy_metrics = metrics.strategies[StrategyName.two_cents_milp.value]
+    assert MILP_PHASES <= strategy_metrics.phase_seconds.keys()
+    assert all(seconds >= 0 for seconds in strategy_metrics.phase_seconds.values())
+    model_size = strategy_metrics.model_size
+    assert 0 < model_size.num_binary_variables < model_size.num_variables
+    assert model_size.num_constraints > 0
+    statistics = strategy_metrics.solver_statistics
+    assert statistics.termination_condition == "optimal"
+    assert statistics.objective is not None
+
+
+def test_concurrent_plans_return_their_metrics():
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    problem_input.strategies = [
+        StrategyName.two_cents_milp.value,
+        StrategyName.avalanche.value,
+    ]
+    problem_input.parameters.plan_executor = PlanExecutor.THREAD
+    metrics = RequestMetrics()
+    create_processed_solution(problem_input, metrics)
+    assert set(metrics.strategies.keys()) == set(problem_input.strategies)
+    assert (
+        "simulation" in metrics.strategies[StrategyName.avalanche.value].phase_seconds
+    )
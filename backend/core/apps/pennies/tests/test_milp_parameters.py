@@ -0,0 +1,58 @@
+import itertools
+import math
+
+import pytest
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.investment import BaseInvestment
+from pennies.model.request import PenniesRequest
+from pennies.strategies.milp.parameters import MILPParameters
+from pennies.strategies.milp.sets import MILPSets
+from pennies.utilities.examples import all_requests
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_parameter_tables_match_instruments(request_: PenniesRequest):
+    problem_input = ProblemInputFactory.from_request(request_)
+    user_finances = problem_input.user_finances
+    parameters = problem_input.parameters
+    sets = MILPSets.create(
+        user_finances,
+        parameters.max_months_in_payment_horizon,
+        parameters.max_months_in_retirement_period,
+        parameters.starting_month,
+    )
+    pars = MILPParameters(user_finances, sets, parameters)
+
+    for i, t in itertools.product(sets.instruments, sets.all_decision_periods_as_set):
+        instrument = sets.get_instrument(i)
+        months = sets.get_months_in_decision_period(t)
+        average_interest_rate = sum(
+            instrument.monthly_interest_rate(m) for m in months
+        ) / len(months)
+        assert math.isclose(
+            pars.get_average_interest_rate(i, t), average_interest_rate, abs_tol=1e-12
+        )
+        assert pars.get_minimum_monthly_payment(i, t) == max(
+            instrument.get_minimum_monthly_payment(m) for m in months
+        )
+        assert pars.get_is_investment(i) == isinstance(instrument, BaseInvestment)
+
+    for t in sets.all_decision_periods_as_set:
+        months = sets.get_months_in_decision_period(t)
+        income = sum(
+            user_finances.financial_profile.get_pre_tax_monthly_income(m)
+            for m in months
+        ) / len(months)
+        assert pars.get_before_tax_monthly_income(t) == income
+
+    for year in sets.years:
+        decision_periods = sets.decision_periods.get_decision_period_instances_in_year(
+            year
+        )
+        assert math.isclose(
+            pars.get_annual_income(year),
+            sum(
+                pars.get_before_tax_monthly_income(dp.index) for dp in decision_periods
+            ),
+        )
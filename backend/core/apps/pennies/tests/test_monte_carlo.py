@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.plan_processing.monte_carlo import (
+    NET_WORTH_PERCENTILES,
+    MonteCarloForecastFactory,
+    MonteCarloSimulator,
+)
+from pennies.plan_processing.net_worth_forecast import SAMPLE_RATE
+from pennies.plan_processing.solution_processor import SolutionProcessor
+from pennies.strategies.greedy import AvalancheStrategy
+from pennies.utilities.examples import all_requests
+
+
+def _create_plan(request: PenniesRequest):
+    problem_input = ProblemInputFactory.from_request(request)
+    plan = AvalancheStrategy().create_plan(
+        problem_input.user_finances, problem_input.parameters
+    )
+    return plan, problem_input
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_paths_without_volatility_follow_the_plan(request_: PenniesRequest):
+    plan, _ = _create_plan(request_)
+    simulator = MonteCarloSimulator.create(plan)
+    assert len(simulator.volatile_instruments) > 0
+    simulator.monthly_volatilities[:] = 0
+    simulation = simulator.simulate(num_paths=2)
+    for net_worths in simulation.net_worths:
+        assert np.allclose(net_worths[:-1], plan.net_worths, rtol=1e-9, atol=1e-6)
+
+
+def test_paths_are_antithetic_pairs():
+    plan, _ = _create_plan(all_requests()[1])
+    columns = plan.columns
+    simulation = MonteCarloSimulator.create(plan).simulate(
+        num_paths=5, rng=np.random.default_rng(0)
+    )
+    assert simulation.net_worths.shape == (5, len(columns) + 1)
+    for i, balances in simulation.investment_balances.items():
+        assert balances.shape == simulation.net_worths.shape
+        # the paths 0 and 3 and the paths 1 and 4 grow by the mean return plus and minus the same random return
+        expected = 2 * (
+            columns.balances[i, 0] * (1 + columns.interest_rates[i, 0])
+            + columns.payments[i, 0]
+            - columns.withdrawals[i, 0]
+        )
+        assert np.isclose(balances[0, 1] + balances[3, 1], expected)
+        assert np.isclose(balances[1, 1] + balances[4, 1], expected)
+
+
+def test_forecast_bands_and_probabilities():
+    plan, problem_input = _create_plan(all_requests()[1])
+    forecast = MonteCarloForecastFactory.create(
+        plan, problem_input, num_paths=1_000, rng=np.random.default_rng(0)
+    )
+    bands = np.array([band.data for band in forecast.net_worth_bands])
+    assert bands.shape == (len(NET_WORTH_PERCENTILES), len(forecast.labels))
+    assert (np.diff(bands, axis=0) >= 0).all()
+    assert len(forecast.goal_success_probabilities) == len(
+        problem_input.user_finances.goals
+    )
+    for goal in forecast.goal_success_probabilities:
+        assert 0 <= goal.probability <= 1
+    assert 0 <= forecast.retirement_shortfall_probability <= 1
+
+    reference = MonteCarloForecastFactory.create(
+        plan, problem_input, num_paths=1_000, rng=np.random.default_rng(0)
+    )
+    assert forecast == reference
+
+
+def test_forecast_without_volatility_is_the_plan(monkeypatch):
+    create_simulator = MonteCarloSimulator.create.__func__
+
+    def create_simulator_without_volatility(cls, plan):
+        simulator = create_simulator(cls, plan)
+        simulator.monthly_volatilities[:] = 0
+        return simulator
+
+    monkeypatch.setattr(
+        MonteCarloSimulator, "create", classmethod(create_simulator_without_volatility)
+    )
+    plan, problem_input = _create_plan(all_requests()[1])
+    forecast = MonteCarloForecastFactory.create(
+        plan, problem_input, num_paths=10, rng=np.random.default_rng(0)
+    )
+    expected = [round(value) for value in plan.net_worths[::SAMPLE_RATE]]
+    for band in forecast.net_worth_bands:
+        assert np.allclose(band.data, expected, atol=1)
+    for goal in forecast.goal_success_probabilities:
+        assert goal.probability in (0, 1)
+    assert forecast.retirement_shortfall_probability in (0, 1)
+
+
+def test_forecast_is_opt_in():
+    plan, problem_input = _create_plan(all_requests()[0])
+    assert SolutionProcessor.process_plan(plan, problem_input).monte_carlo is None
+    problem_input.parameters.monte_carlo_paths = 100
+    processed_plan = SolutionProcessor.process_plan(plan, problem_input)
+    assert processed_plan.monte_carlo.num_paths == 100
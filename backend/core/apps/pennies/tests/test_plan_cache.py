@@ -0,0 +1,68 @@
+from datetime import date
+from uuid import uuid4
+
+from pennies.model.status import PenniesStatus
+from pennies.utilities.examples import simple_request
+from pennies.utilities.plan_cache import (
+    LRUPlanCacheBackend,
+    PlanCache,
+    get_request_fingerprint,
+)
+
+
+def _make_request() -> dict:
+    request = simple_request().dict()
+    for instrument in request["loans"] + request["investments"] + request["goals"]:
+        instrument["id_"] = str(uuid4())
+    return request
+
+
+def test_fingerprint_ignores_ids_and_order():
+    today = date(2021, 5, 17)
+    request = _make_request()
+    shuffled_request = _make_request()
+    shuffled_request["loans"].reverse()
+    shuffled_request["investments"].reverse()
+    assert get_request_fingerprint(request, today) == get_request_fingerprint(
+        shuffled_request, today
+    )
+    assert get_request_fingerprint(request, today) == get_request_fingerprint(
+        request, date(2021, 5, 31)
+    )
+    assert get_request_fingerprint(request, today) != get_request_fingerprint(
+        request, date(2021, 6, 1)
+    )
+    shuffled_request["loans"][0]["current_balance"] += 1
+    assert get_request_fingerprint(request, today) != get_request_fingerprint(
+        shuffled_request, today
+    )
+
+
+def test_lru_backend_bounds_and_expiry():
+    now = [0.0]
+    backend = LRUPlanCacheBackend(max_entries=2, clock=lambda: now[0])
+    backend.set("a", {"plan": "a"}, ttl_seconds=10)
+    backend.set("b", {"plan": "b"}, ttl_seconds=10)
+    assert backend.get("a") == {"plan": "a"}
+    backend.set("c", {"plan": "c"}, ttl_seconds=10)
+    assert len(backend) == 2
+    assert backend.get("b") is None
+    now[0] = 10
+    assert backend.get("a") is None
+    assert backend.get("c") is None
+
+
+def test_plan_cache_solves_a_request_once():
+    responses = iter(
+        [
+            {"status": PenniesStatus.FAILURE, "result": "failed"},
+            {"status": PenniesStatus.SUCCESS, "result": "plan"},
+        ]
+    )
+    cache = PlanCache(solver=lambda request: next(responses))
+    request = _make_request()
+    assert cache.solve(request)["status"] == PenniesStatus.FAILURE
+    assert cache.solve(request)["result"] == "plan"
+    assert cache.solve(_make_request())["result"] == "plan"
+    assert (cache.metrics.hits, cache.metrics.misses) == (1, 2)
+    assert cache.metrics.hit_rate == 1 / 3
@@ -0,0 +1,47 @@
+import pytest
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.model.solution import FinancialPlan
+from pennies.plan_processing.scan import PlanScan
+from pennies.strategies.greedy import AvalancheStrategy
+from pennies.utilities.examples import all_requests
+
+
+def _get_pay_off_month(plan: FinancialPlan, id_) -> int:
+    for month, ms in enumerate(plan.monthly_solutions):
+        instrument = ms.portfolio.get_instrument_or_none(id_)
+        if instrument is None or instrument.current_balance >= -1:
+            return month + 1
+
+
+def _get_missed_payment_months(plan: FinancialPlan, id_):
+    missed_payment_months = []
+    for ms in plan.monthly_solutions:
+        instrument = ms.portfolio.get_instrument_or_none(id_)
+        if instrument is None or instrument.current_balance > -1:
+            break
+        expected_payment = instrument.get_minimum_monthly_payment(ms.month)
+        if expected_payment < 10:
+            continue
+        if expected_payment - 2 > ms.allocation.payments.get(id_, 0):
+            missed_payment_months.append(ms.month)
+    return missed_payment_months
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_scan_matches_walk_over_monthly_solutions(request_: PenniesRequest):
+    problem_input = ProblemInputFactory.from_request(request_)
+    user_finances = problem_input.user_finances
+    plan = AvalancheStrategy().create_plan(user_finances, problem_input.parameters)
+    scan = PlanScan.create(plan, user_finances.goals, sample_rate=6)
+
+    assert len(scan.first_solution.portfolio.instruments) > 0
+    for instrument in user_finances.portfolio.instruments.values():
+        assert scan.pay_off_months[instrument.id_] == _get_pay_off_month(
+            plan, instrument.id_
+        )
+        assert scan.missed_payment_months[instrument.id_] == _get_missed_payment_months(
+            plan, instrument.id_
+        )
+    assert scan.sampled_balances.shape[1] == len(range(0, len(plan.columns), 6))
@@ -0,0 +1,47 @@
+import pyomo.environ as pe
+import pytest
+
+from pennies.main import create_shared_milp
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.strategies.milp.strategy import (
+    InvestmentMILPStrategy,
+    LoanMILPStrategy,
+    GoalMILPStrategy,
+    SharedMILP,
+)
+from pennies.utilities.examples import simple_request, all_requests
+
+
+def test_shared_milp_is_opt_in():
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    assert create_shared_milp(problem_input) is None
+
+    problem_input.parameters.is_shared_milp = True
+    assert isinstance(create_shared_milp(problem_input), SharedMILP)
+
+
+@pytest.mark.parametrize("request_", all_requests())
+def test_shared_milp_matches_rebuilt_milps(request_: PenniesRequest):
+    problem_input = ProblemInputFactory.from_request(request_)
+    parameters = problem_input.parameters.copy()
+    parameters.is_shared_milp = True
+    shared_milp = create_shared_milp(
+        problem_input.copy(update={"parameters": parameters})
+    )
+    gap = problem_input.parameters.optimality_gap
+    for strategy in [InvestmentMILPStrategy(), LoanMILPStrategy(), GoalMILPStrategy()]:
+        shared_plan = shared_milp.create_plan(strategy)
+        shared_objective = pe.value(shared_milp.milp.pyomodel.obj)
+        assert shared_plan is not None
+
+        parameters = strategy.overwrite_parameters(problem_input.parameters.copy())
+        milp = strategy.create_milp(problem_input.user_finances, parameters)
+        plan = strategy.create_plan_from_milp(milp)
+        objective = pe.value(milp.pyomodel.obj)
+        assert plan is not None
+
+        # both solutions are within the optimality gap of the same optimum
+        assert abs(shared_objective - objective) <= gap * max(
+            abs(shared_objective), abs(objective)
+        )
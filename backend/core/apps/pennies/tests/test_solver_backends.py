@@ -0,0 +1,43 @@
+import pytest
+import pyomo.environ as pe
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.strategies.milp.milp import MILP, get_solver_backend
+from pennies.strategies.milp.solver_backends import (
+    CBCSolverBackend,
+    HiGHSSolverBackend,
+)
+from pennies.utilities.examples import simple_request
+
+
+def _solve_objective(solver_backend: str) -> float:
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    problem_input.parameters.solver_backend = solver_backend
+    milp = MILP.create(problem_input.user_finances, problem_input.parameters)
+    assert milp.solve()
+    assert milp.solve(warmstart=True)
+    return pe.value(milp.pyomodel.obj)
+
+
+requires_highs = pytest.mark.skipif(
+    not HiGHSSolverBackend.is_available(), reason="highspy is not installed"
+)
+
+
+@requires_highs
+def test_highs_backend_matches_cbc_backend():
+    cbc_objective = _solve_objective("cbc")
+    highs_objective = _solve_objective("highs")
+    gap = ProblemInputFactory.from_request(simple_request()).parameters.optimality_gap
+    assert abs(highs_objective - cbc_objective) <= 2 * gap * abs(cbc_objective)
+
+
+def test_get_solver_backend():
+    assert get_solver_backend("cbc") == CBCSolverBackend
+    with pytest.raises(ValueError):
+        get_solver_backend("not a solver")
+
+
+@requires_highs
+def test_get_highs_solver_backend():
+    assert get_solver_backend("highs") == HiGHSSolverBackend
@@ -0,0 +1,58 @@
+import pyomo.environ as pe
+import pytest
+from pyomo.core.expr.current import identify_variables
+
+from pennies.model.factories.problem_input import ProblemInputFactory
+from pennies.model.request import PenniesRequest
+from pennies.strategies.milp.milp import MILP
+from pennies.strategies.milp.solver_backends import HiGHSSolverBackend
+from pennies.strategies.milp.strategy import InvestmentMILPStrategy
+from pennies.strategies.milp.warm_start import HeuristicWarmStart
+from pennies.utilities.examples import all_requests, simple_request
+
+
+def _is_satisfied(constraint_data, tolerance=1e-6) -> bool:
+    """the tolerance is relative to the largest variable since cbc writes its solution with 8 significant digits"""
+    tolerance *= max(
+        [1] + [abs(v.value) for v in identify_variables(constraint_data.body)]
+    )
+    body = pe.value(constraint_data.body)
+    lower = pe.value(constraint_data.lower)
+    upper = pe.value(constraint_data.upper)
+    return (lower is None or body >= lower - tolerance) and (
+        upper is None or body <= upper + tolerance
+    )
+
+
+@pytest.mark.parametrize("solver_backend", ["cbc", "highs"])
+@pytest.mark.parametrize("request_", all_requests())
+def test_warm_start_is_feasible(request_: PenniesRequest, solver_backend: str):
+    if solver_backend == "highs" and not HiGHSSolverBackend.is_available():
+        pytest.skip("highspy is not installed")
+    problem_input = ProblemInputFactory.from_request(request_)
+    problem_input.parameters.solver_backend = solver_backend
+    milp = MILP.create(problem_input.user_finances, problem_input.parameters)
+    HeuristicWarmStart.create(milp, "avalanche").load()
+
+    pyomodel = milp.pyomodel
+    assert all(v.value is not None for v in pyomodel.component_data_objects(pe.Var))
+    for constraint_data in pyomodel.component_data_objects(pe.Constraint, active=True):
+        assert _is_satisfied(constraint_data), constraint_data.name
+
+
+def test_warm_start_heuristic_must_exist():
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    milp = MILP.create(problem_input.user_finances, problem_input.parameters)
+    with pytest.raises(ValueError):
+        HeuristicWarmStart.create(milp, "unknown")
+
+
+def test_warm_start_is_opt_in():
+    problem_input = ProblemInputFactory.from_request(simple_request())
+    assert problem_input.parameters.warm_start_heuristic is None
+
+    problem_input.parameters.warm_start_heuristic = "avalanche"
+    plan = InvestmentMILPStrategy().create_plan(
+        problem_input.user_finances, problem_input.parameters
+    )
+    assert plan is not None
@@ -1 +1,5 @@
-# Register your models here.
+from django.contrib import admin
+
+from core.apps.plan.models import PlanJob
+
+admin.site.register(PlanJob)
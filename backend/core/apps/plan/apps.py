@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class PlanConfig(AppConfig):
-    name = "plan"
+    name = "core.apps.plan"
+    label = "plan"
+
+    def ready(self):
+        from core.apps.plan import signals  # noqa: F401
@@ -0,0 +1,48 @@
+from typing import Dict, Optional
+
+from django.core.cache import caches
+
+from core.apps.pennies.pennies.main import solve_request
+from core.config.settings import (
+    PLAN_CACHE_BACKEND,
+    PLAN_CACHE_MAX_ENTRIES,
+    PLAN_CACHE_TTL_SECONDS,
+)
+from pennies.utilities.plan_cache import (
+    LRUPlanCacheBackend,
+    PlanCache,
+    PlanCacheBackend,
+)
+
+PLAN_CACHE_KEY_PREFIX = "pennies-plan"
+
+
+class DjangoPlanCacheBackend(PlanCacheBackend):
+    """Keeps the plans in a django cache (redis in production) so that they are shared by every worker"""
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+
+    def get(self, key: str) -> Optional[Dict]:
+        return caches[self.alias].get(f"{PLAN_CACHE_KEY_PREFIX}:{key}")
+
+    def set(self, key: str, value: Dict, ttl_seconds: float):
+        caches[self.alias].set(
+            f"{PLAN_CACHE_KEY_PREFIX}:{key}", value, timeout=ttl_seconds
+        )
+
+
+def make_plan_cache_backend(name: str) -> PlanCacheBackend:
+    if name == "django":
+        return DjangoPlanCacheBackend()
+    elif name == "memory":
+        return LRUPlanCacheBackend(max_entries=PLAN_CACHE_MAX_ENTRIES)
+    else:
+        raise ValueError(f"Unknown plan cache backend: {name}")
+
+
+PLAN_CACHE = PlanCache(
+    backend=make_plan_cache_backend(PLAN_CACHE_BACKEND),
+    solver=solve_request,
+    ttl_seconds=PLAN_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,326 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from core.apps.finances.models.financial_data import FinancialData
+from core.apps.plan.models import (
+    FINISHED_PLAN_JOB_STATUSES,
+    PlanJob,
+    PlanJobStatus,
+    get_plan_job_lease_start,
+)
+from core.apps.plan.services import make_pennies_request_and_run
+from core.apps.users.models import User
+from core.config.settings import (
+    PLAN_JOB_CLAIM_TIMEOUT_SECONDS,
+    PLAN_JOB_POLL_SECONDS,
+    PLAN_JOB_WEB_WORKERS,
+    PLAN_RECOMPUTE_DEBOUNCE_SECONDS,
+)
+
+_PLAN_JOB_EVENTS = threading.Condition()
+# wakes the workers when a job is submitted and the waiters when a job finishes - only within this process, the
+# other processes find out by polling the database
+
+
+plan_job_succeeded = Signal()
+# sent with the `job` once its plan is stored - by the worker that ran it
+
+
+def _notify_plan_job_events():
+    with _PLAN_JOB_EVENTS:
+        _PLAN_JOB_EVENTS.notify_all()
+
+
+def submit_plan_job(
+    financial_data: FinancialData, user: Optional[User] = None
+) -> PlanJob:
+    """
+    queues a plan for the financial data to run now
+    the pending job or the job that is already running on the current finances is returned if there is one
+    """
+    version = _get_financial_data_version(financial_data.pk)
+    job = PlanJob.objects.filter(
+        financial_data=financial_data,
+        status=PlanJobStatus.RUNNING,
+        financial_data_version=version,
+        started_at__gte=get_plan_job_lease_start(),
+    ).first()
+    if job is not None:
+        return job
+    return _queue_plan_job(
+        financial_data.pk, None if user is None else user.pk, timezone.now()
+    )
+
+
+def schedule_plan_recompute(financial_data_id: int) -> Optional[PlanJob]:
+    """
+    queues a plan for finances that changed - every change pushes the job back so that a burst of edits is only
+    solved once the user stops editing
+    """
+    user_id = (
+        FinancialData.objects.filter(pk=financial_data_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id is None:
+        # the finances were deleted or are not a user's (onboarding and published plans)
+        return None
+    run_after = timezone.now() + timedelta(seconds=PLAN_RECOMPUTE_DEBOUNCE_SECONDS)
+    return _queue_plan_job(financial_data_id, user_id, run_after, is_push_back=True)
+
+
+def _queue_plan_job(
+    financial_data_id: int,
+    user_id: Optional[int],
+    run_after: datetime,
+    is_push_back: bool = False,
+) -> PlanJob:
+    """
+    a pending job of the finances is reused - it is only pushed back for the debounce, so that a job that is already
+    due keeps the time it has been waiting for a worker
+    """
+    pending_jobs = PlanJob.objects.filter(
+        financial_data_id=financial_data_id, status=PlanJobStatus.PENDING
+    )
+    try:
+        with transaction.atomic():
+            job = pending_jobs.select_for_update().first()
+            if job is None:
+                job = PlanJob.objects.create(
+                    financial_data_id=financial_data_id,
+                    user_id=user_id,
+                    run_after=run_after,
+                )
+            else:
+                if is_push_back or run_after < job.run_after:
+                    job.run_after = run_after
+                job.user_id = job.user_id or user_id
+                job.save(update_fields=["run_after", "user_id"])
+    except IntegrityError:
+        # another request queued the same finances between the lookup and the insert
+        job = pending_jobs.get()
+    transaction.on_commit(_notify_plan_job_events)
+    PLAN_JOB_WORKER_POOL.start()
+    return job
+
+
+def _get_financial_data_version(financial_data_id: int) -> int:
+    return FinancialData.objects.values_list("version", flat=True).get(
+        pk=financial_data_id
+    )
+
+
+def get_latest_plan_job(financial_data: FinancialData) -> Optional[PlanJob]:
+    return (
+        PlanJob.objects.filter(
+            financial_data=financial_data, status=PlanJobStatus.SUCCEEDED
+        )
+        .order_by("-finished_at")
+        .first()
+    )
+
+
+def store_plan(
+    financial_data: FinancialData,
+    financial_data_version: int,
+    result: Dict,
+    user: Optional[User] = None,
+) -> PlanJob:
+    """records a plan that was solved outside of the workers so that the next request can reuse it"""
+    now = timezone.now()
+    job = PlanJob.objects.create(
+        financial_data=financial_data,
+        user=user,
+        status=PlanJobStatus.SUCCEEDED,
+        result=result,
+        financial_data_version=financial_data_version,
+        run_after=now,
+        started_at=now,
+        finished_at=now,
+    )
+    _delete_older_plan_jobs(job)
+    return job
+
+
+def _delete_older_plan_jobs(job: PlanJob):
+    """only the latest plan of the finances is kept - the jobs that it replaces can no longer be retrieved"""
+    PlanJob.objects.filter(
+        financial_data_id=job.financial_data_id,
+        status__in=FINISHED_PLAN_JOB_STATUSES,
+        finished_at__lt=job.finished_at,
+    ).delete()
+
+
+def fail_expired_plan_jobs() -> int:
+    """fails the running jobs whose worker was stopped so that they are not waited on or attached to forever"""
+    num_expired = PlanJob.objects.filter(
+        status=PlanJobStatus.RUNNING, started_at__lt=get_plan_job_lease_start()
+    ).update(status=PlanJobStatus.FAILED, finished_at=timezone.now())
+    if num_expired > 0:
+        logging.warning(f"Failed {num_expired} plan jobs that ran past their timeout")
+        _notify_plan_job_events()
+    return num_expired
+
+
+def claim_next_plan_job() -> Optional[PlanJob]:
+    """marks the oldest due job as running - the locked rows are skipped so that every worker claims its own job"""
+    fail_expired_plan_jobs()
+    with transaction.atomic():
+        job = (
+            PlanJob.objects.select_for_update(skip_locked=True)
+            .filter(status=PlanJobStatus.PENDING, run_after__lte=timezone.now())
+            .order_by("run_after")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = PlanJobStatus.RUNNING
+        job.started_at = timezone.now()
+        job.financial_data_version = _get_financial_data_version(job.financial_data_id)
+        job.save(update_fields=["status", "started_at", "financial_data_version"])
+    return job
+
+
+def get_unclaimed_plan_job(financial_data: FinancialData) -> Optional[PlanJob]:
+    """the pending job of the finances if it has been due for too long - no worker is taking the jobs"""
+    claim_deadline = timezone.now() - timedelta(seconds=PLAN_JOB_CLAIM_TIMEOUT_SECONDS)
+    return PlanJob.objects.filter(
+        financial_data=financial_data,
+        status=PlanJobStatus.PENDING,
+        run_after__lt=claim_deadline,
+    ).first()
+
+
+def claim_plan_job(job: PlanJob) -> Optional[PlanJob]:
+    """marks the pending job as running - None if a worker claimed it first"""
+    num_claimed = PlanJob.objects.filter(
+        pk=job.pk, status=PlanJobStatus.PENDING
+    ).update(
+        status=PlanJobStatus.RUNNING,
+        started_at=timezone.now(),
+        financial_data_version=_get_financial_data_version(job.financial_data_id),
+    )
+    if num_claimed == 0:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def run_unclaimed_plan_job(financial_data: FinancialData) -> Optional[PlanJob]:
+    """runs the job of the finances in this process if no plan worker has taken it in time"""
+    job = get_unclaimed_plan_job(financial_data)
+    if job is None:
+        return None
+    job = claim_plan_job(job)
+    if job is None:
+        # a worker took it after all
+        return None
+    logging.warning(f"No plan worker took plan job {job.id} - building it in the request")
+    return run_plan_job(job)
+
+
+def run_plan_job(job: PlanJob) -> PlanJob:
+    email = job.user.email if job.user is not None else "unknown"
+    try:
+        result = make_pennies_request_and_run(job.financial_data, email)
+    except Exception:
+        logging.exception(f"Plan job {job.id} failed")
+        result = None
+    job.result = result
+    job.status = PlanJobStatus.FAILED if result is None else PlanJobStatus.SUCCEEDED
+    job.finished_at = timezone.now()
+    job.save(update_fields=["result", "status", "finished_at"])
+    if job.status == PlanJobStatus.SUCCEEDED:
+        _delete_older_plan_jobs(job)
+        plan_job_succeeded.send(sender=PlanJob, job=job)
+    _notify_plan_job_events()
+    return job
+
+
+def run_next_plan_job() -> Optional[PlanJob]:
+    job = claim_next_plan_job()
+    if job is None:
+        return None
+    return run_plan_job(job)
+
+
+def wait_for_plan_job(
+    job_id: UUID, timeout_seconds: float, user: Optional[User] = None
+) -> PlanJob:
+    """long polls the job until it is finished or the timeout runs out"""
+    jobs = PlanJob.objects.all() if user is None else PlanJob.objects.filter(user=user)
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        job = jobs.get(pk=job_id)
+        if job.is_expired:
+            fail_expired_plan_jobs()
+            job = jobs.get(pk=job_id)
+        remaining = deadline - time.monotonic()
+        if job.is_finished or remaining <= 0:
+            return job
+        with _PLAN_JOB_EVENTS:
+            _PLAN_JOB_EVENTS.wait(min(remaining, PLAN_JOB_POLL_SECONDS))
+
+
+class PlanJobWorkerPool:
+    """Threads that drain the plan job queue - every thread uses its own database connection"""
+
+    def __init__(self, num_workers: int, poll_seconds: float):
+        self.num_workers = num_workers
+        self.poll_seconds = poll_seconds
+        self._threads: List[threading.Thread] = list()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads or self.num_workers <= 0:
+                return
+            self._stopped.clear()
+            for index in range(self.num_workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"plan-job-worker-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            _notify_plan_job_events()
+            for thread in self._threads:
+                thread.join()
+            self._threads = list()
+
+    def join(self):
+        for thread in list(self._threads):
+            thread.join()
+
+    def _work(self):
+        try:
+            while not self._stopped.is_set():
+                close_old_connections()
+                try:
+                    job = run_next_plan_job()
+                except Exception:
+                    logging.exception("Could not run the next plan job")
+                    job = None
+                if job is None:
+                    with _PLAN_JOB_EVENTS:
+                        _PLAN_JOB_EVENTS.wait(self.poll_seconds)
+        finally:
+            connection.close()
+
+
+PLAN_JOB_WORKER_POOL = PlanJobWorkerPool(
+    num_workers=PLAN_JOB_WEB_WORKERS, poll_seconds=PLAN_JOB_POLL_SECONDS
+)
+# started lazily by the first queued job - only has workers when they are opted into with PLAN_JOB_WEB_WORKERS
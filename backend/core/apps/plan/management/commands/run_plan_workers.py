@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.apps.plan.jobs import PlanJobWorkerPool
+from core.config.settings import PLAN_JOB_POLL_SECONDS, PLAN_JOB_WORKERS
+
+
+class Command(BaseCommand):
+    help = "Builds the queued plans until the process is stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=PLAN_JOB_WORKERS)
+
+    def handle(self, *args, **options):
+        pool = PlanJobWorkerPool(
+            num_workers=options["workers"], poll_seconds=PLAN_JOB_POLL_SECONDS
+        )
+        pool.start()
+        self.stdout.write(f"Started {options['workers']} plan job workers")
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            pool.stop()
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.2 on 2026-10-18 13:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plan", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="planjob", name="unique_active_plan_job",
+        ),
+        migrations.AddField(
+            model_name="planjob",
+            name="financial_data_version",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="planjob",
+            name="run_after",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="planjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(status="pending"),
+                fields=("financial_data",),
+                name="unique_pending_plan_job",
+            ),
+        ),
+    ]
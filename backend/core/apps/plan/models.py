@@ -1 +1,89 @@
-# Create your models here.
+import uuid
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from core.apps.finances.models.financial_data import FinancialData
+from core.apps.users.models import User as AuthUser
+from core.config.settings import PLAN_JOB_TIMEOUT_SECONDS
+
+
+class PlanJobStatus(models.TextChoices):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+FINISHED_PLAN_JOB_STATUSES = [PlanJobStatus.SUCCEEDED, PlanJobStatus.FAILED]
+
+
+def get_plan_job_lease_start() -> datetime:
+    """the jobs that started running before this are no longer running - their worker was stopped"""
+    return timezone.now() - timedelta(seconds=PLAN_JOB_TIMEOUT_SECONDS)
+
+
+class PlanJob(models.Model):
+    """A plan that is computed by the plan workers - the table is also the queue that the workers drain"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        AuthUser,
+        on_delete=models.CASCADE,
+        related_name="plan_jobs",
+        null=True,
+        blank=True,
+        default=None,
+    )
+    financial_data = models.ForeignKey(
+        FinancialData, on_delete=models.CASCADE, related_name="plan_jobs"
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=PlanJobStatus.choices,
+        default=PlanJobStatus.PENDING,
+        db_index=True,
+    )
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    financial_data_version = models.PositiveIntegerField(null=True, blank=True)
+    # the version of the finances when the job started - the plan is stale once the finances move past it
+    created_at = models.DateTimeField(auto_now_add=True)
+    run_after = models.DateTimeField(default=timezone.now, db_index=True)
+    # the recomputes are debounced by pushing this back on every change to the finances
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        constraints = [
+            # a second request for the same finances attaches to the job that is already pending
+            models.UniqueConstraint(
+                fields=["financial_data"],
+                condition=Q(status=PlanJobStatus.PENDING),
+                name="unique_pending_plan_job",
+            )
+        ]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_PLAN_JOB_STATUSES
+
+    @property
+    def is_expired(self) -> bool:
+        return (
+            self.status == PlanJobStatus.RUNNING
+            and self.started_at < get_plan_job_lease_start()
+        )
+
+    def is_fresh(self, financial_data_version: int) -> bool:
+        """the plans are relative to the current month so a plan from an earlier month is stale too"""
+        if self.status != PlanJobStatus.SUCCEEDED:
+            return False
+        now = timezone.now()
+        return self.financial_data_version == financial_data_version and (
+            self.finished_at.year,
+            self.finished_at.month,
+        ) == (now.year, now.month)
@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from core.apps.plan.models import PlanJob
+
+
+class PlanJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlanJob
+        fields = (
+            "id",
+            "status",
+            "result",
+            "financial_data_version",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.dispatch import receiver
+
+from core.apps.finances.signals import financial_data_changed
+from core.apps.plan.jobs import schedule_plan_recompute
+
+
+@receiver(financial_data_changed)
+def on_financial_data_changed(sender, financial_data_id: int, **kwargs):
+    # the job is queued once the change is committed so that the workers solve the new finances
+    transaction.on_commit(lambda: schedule_plan_recompute(financial_data_id))
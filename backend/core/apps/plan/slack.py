@@ -1,8 +1,6 @@
 import json
 
-import requests
-
-from core.config.settings import SLACK_WEBHOOK_URL
+from core.apps.utilities.slack import enqueue_slack_message
 
 
 def _make_data(data):
@@ -26,16 +24,7 @@ def _make_data(data):
 
 
 def send_failed_request_data_to_slack(pennies_request):
-    response = requests.post(
-        SLACK_WEBHOOK_URL,
-        data=json.dumps(_make_data(pennies_request.data), indent=4),
-        headers={"Content-Type": "application/json"},
-    )
-    if response.status_code != 200:
-        raise ValueError(
-            "Request to slack returned an error %s, the response is:\n%s"
-            % (response.status_code, response.text)
-        )
+    enqueue_slack_message(_make_data(pennies_request.data))
 
 
 def send_failed_request_message():
@@ -50,13 +39,4 @@ def send_failed_request_message():
             }
         ]
     }
-    response = requests.post(
-        SLACK_WEBHOOK_URL,
-        data=json.dumps(error_block, indent=4),
-        headers={"Content-Type": "application/json"},
-    )
-    if response.status_code != 200:
-        raise ValueError(
-            "Request to slack returned an error %s, the response is:\n%s"
-            % (response.status_code, response.text)
-        )
+    enqueue_slack_message(error_block)
@@ -1,15 +1,88 @@
+from django.core.exceptions import ValidationError
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 
+from core.apps.plan.jobs import (
+    get_latest_plan_job,
+    run_unclaimed_plan_job,
+    store_plan,
+    submit_plan_job,
+    wait_for_plan_job,
+)
+from core.apps.plan.models import PlanJob, PlanJobStatus
+from core.apps.plan.serializers import PlanJobSerializer
 from core.apps.plan.services import make_pennies_request_and_run
+from core.config.settings import PLAN_JOB_MAX_WAIT_SECONDS
 
 
 class UserPlanViewSet(viewsets.GenericViewSet):
+    """
+    Serves the latest stored plan of the user - a stale plan is served while it is recomputed and the
+    `X-Plan-Is-Fresh` header tells the clients to check back (the body stays the plans by strategy)
+    the plan is built in the request when no worker has taken its job in time
+    """
+
     def list(self, request, format=None):
-        data = make_pennies_request_and_run(
-            request.user.financial_data, request.user.email
-        )
+        financial_data = request.user.financial_data
+        financial_data.refresh_from_db(fields=["version"])
+        version = financial_data.version
+        job = get_latest_plan_job(financial_data)
+        if job is not None and job.is_fresh(version):
+            return self.get_plan_response(job.result, version, is_fresh=True)
+        if job is not None:
+            fresh_job = run_unclaimed_plan_job(financial_data)
+            if fresh_job is not None and fresh_job.status == PlanJobStatus.SUCCEEDED:
+                return self.get_plan_response(
+                    fresh_job.result,
+                    version,
+                    is_fresh=fresh_job.is_fresh(version),
+                )
+            submit_plan_job(financial_data, request.user)
+            return self.get_plan_response(job.result, version, is_fresh=False)
+        data = make_pennies_request_and_run(financial_data, request.user.email)
         if data is None:
             return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        else:
-            return Response(data=data, status=status.HTTP_200_OK)
+        store_plan(financial_data, version, data, request.user)
+        return self.get_plan_response(data, version, is_fresh=True)
+
+    @staticmethod
+    def get_plan_response(data, version: int, is_fresh: bool) -> Response:
+        return Response(
+            data=data,
+            status=status.HTTP_200_OK,
+            headers={
+                "X-Plan-Is-Fresh": str(is_fresh).lower(),
+                "X-Financial-Data-Version": str(version),
+            },
+        )
+
+
+class PlanJobViewSet(viewsets.GenericViewSet):
+    """
+    Builds the plan in the background - create queues a job and retrieve returns it
+    retrieve waits up to `wait` seconds for the job to finish so the clients can long poll
+    """
+
+    serializer_class = PlanJobSerializer
+
+    def create(self, request, format=None):
+        if request.user.is_anonymous:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        job = submit_plan_job(request.user.financial_data, request.user)
+        serializer = self.get_serializer(job)
+        return Response(data=serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    def retrieve(self, request, pk, format=None):
+        if request.user.is_anonymous:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        try:
+            wait_seconds = float(request.query_params.get("wait", 0))
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        wait_seconds = min(max(wait_seconds, 0), PLAN_JOB_MAX_WAIT_SECONDS)
+        try:
+            job = wait_for_plan_job(pk, wait_seconds, user=request.user)
+        except (PlanJob.DoesNotExist, ValidationError):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        serializer = self.get_serializer(job)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
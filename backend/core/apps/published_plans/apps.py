@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class PublishedPlansConfig(AppConfig):
-    name = "published_plans"
+    name = "core.apps.published_plans"
+    label = "published_plans"
+
+    def ready(self):
+        from core.apps.published_plans import signals  # noqa: F401
@@ -0,0 +1,28 @@
+# Generated by Django 3.1.2 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("published_plans", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publishedplan",
+            name="refreshing_since",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="publishedplan",
+            name="snapshot",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="publishedplan",
+            name="snapshot_month",
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -1,7 +1,39 @@
+import gzip
+import json
+from datetime import date
+from typing import Dict, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 from core.apps.finances.models.financial_data import FinancialData
 
 
 class PublishedPlan(models.Model):
     financial_data = models.OneToOneField(FinancialData, on_delete=models.CASCADE)
+    snapshot = models.BinaryField(null=True, blank=True, editable=False)
+    # the gzipped json of the published plan (id, financial data and plans) that is served to the visitors
+    snapshot_month = models.DateField(null=True, blank=True)
+    # the first day of the month that the plans were solved in - the plans are relative to it
+    refreshing_since = models.DateTimeField(null=True, blank=True)
+    # set while a refresh of the snapshot is running so that only one refresh runs at a time
+
+    def set_snapshot(self, data: Dict):
+        self.snapshot = gzip.compress(
+            json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+        )
+        self.snapshot_month = get_current_month()
+
+    def get_snapshot(self) -> Optional[Dict]:
+        if self.snapshot is None:
+            return None
+        return json.loads(gzip.decompress(self.snapshot))
+
+    @property
+    def is_snapshot_stale(self) -> bool:
+        return self.snapshot_month != get_current_month()
+
+
+def get_current_month() -> date:
+    return timezone.now().date().replace(day=1)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from typing import Dict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.apps.plan.jobs import run_unclaimed_plan_job, submit_plan_job
+from core.apps.plan.services import make_pennies_request_and_run
+from core.apps.published_plans.models import PublishedPlan, get_current_month
+from core.apps.published_plans.serializers import PublishedPlanSerializer
+
+REFRESH_TIMEOUT = timedelta(minutes=10)
+# a refresh that has not finished by then is assumed to have died and can be claimed again - a refresh whose solve
+# failed keeps its claim so that it is only retried once this has passed
+
+
+def store_published_plan_snapshot(published_plan: PublishedPlan, plans: Dict):
+    """stores the plans with the financial data of the published plan as its snapshot"""
+    data = dict(PublishedPlanSerializer(published_plan).data)
+    data["plans"] = plans
+    published_plan.set_snapshot(data)
+    published_plan.refreshing_since = None
+    published_plan.save(
+        update_fields=["snapshot", "snapshot_month", "refreshing_since"]
+    )
+
+
+def materialize_published_plan(published_plan: PublishedPlan) -> bool:
+    """solves the plans when the plan is published so that its link works right away - a failed solve is queued"""
+    plans = make_pennies_request_and_run(published_plan.financial_data)
+    if plans is None:
+        queue_missing_published_plan(published_plan)
+        return False
+    store_published_plan_snapshot(published_plan, plans)
+    return True
+
+
+def _claim_refresh(published_plan_id: int, snapshots: Q) -> bool:
+    """claims the refresh in the database so that only one refresh is queued however many visitors open the plan"""
+    now = timezone.now()
+    return bool(
+        PublishedPlan.objects.filter(pk=published_plan_id)
+        .filter(snapshots)
+        .filter(
+            Q(refreshing_since__isnull=True)
+            | Q(refreshing_since__lt=now - REFRESH_TIMEOUT)
+        )
+        .update(refreshing_since=now)
+    )
+
+
+def refresh_published_plan_if_stale(published_plan: PublishedPlan) -> bool:
+    """queues a refresh of a snapshot from an earlier month - the plan workers store the new snapshot"""
+    if not published_plan.is_snapshot_stale:
+        return False
+    is_claimed = _claim_refresh(
+        published_plan.pk, ~Q(snapshot_month=get_current_month())
+    )
+    if is_claimed:
+        submit_plan_job(published_plan.financial_data)
+    return is_claimed
+
+
+def queue_missing_published_plan(published_plan: PublishedPlan) -> bool:
+    """
+    queues the solve of a published plan without a snapshot (just published, published before the snapshots or its
+    solve failed) - false if it is already queued or its last solve failed
+    """
+    is_claimed = _claim_refresh(published_plan.pk, Q(snapshot__isnull=True))
+    if is_claimed:
+        submit_plan_job(published_plan.financial_data)
+    return is_claimed
+
+
+def run_unclaimed_published_plan_job(published_plan: PublishedPlan):
+    """builds the queued snapshot in the request when no plan worker has taken its job in time"""
+    if run_unclaimed_plan_job(published_plan.financial_data) is not None:
+        published_plan.refresh_from_db()
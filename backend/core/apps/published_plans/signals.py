@@ -0,0 +1,16 @@
+from django.dispatch import receiver
+
+from core.apps.plan.jobs import plan_job_succeeded
+from core.apps.plan.models import PlanJob
+from core.apps.published_plans.models import PublishedPlan
+from core.apps.published_plans.services import store_published_plan_snapshot
+
+
+@receiver(plan_job_succeeded)
+def on_plan_job_succeeded(sender, job: PlanJob, **kwargs):
+    # the refreshes of the published plans are queued as plan jobs of their finances
+    published_plan = PublishedPlan.objects.filter(
+        financial_data_id=job.financial_data_id
+    ).first()
+    if published_plan is not None:
+        store_published_plan_snapshot(published_plan, job.result)
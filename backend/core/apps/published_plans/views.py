@@ -1,13 +1,49 @@
+import gzip
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 
 from core.apps.finances.utilities import copy_financial_data
-from core.apps.plan.services import make_pennies_request_and_run
 from core.apps.published_plans.models import PublishedPlan
 from core.apps.published_plans.serializers import PublishedPlanSerializer
+from core.apps.published_plans.services import (
+    materialize_published_plan,
+    queue_missing_published_plan,
+    refresh_published_plan_if_stale,
+    run_unclaimed_published_plan_job,
+)
+
+MISSING_SNAPSHOT_RETRY_SECONDS = 10
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """honours the q-values of the codings - `gzip;q=0` refuses gzip and `*` stands for the codings not listed"""
+    qvalues = dict()
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        if not name:
+            continue
+        qvalue = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[name.lower()] = qvalue
+    return qvalues.get("gzip", qvalues.get("*", 0.0)) > 0
 
 
 class PublishedPlansViewset(viewsets.GenericViewSet):
+    """
+    The plans are solved once when they are published and served from the snapshot - a snapshot from an earlier
+    month is still served while the plan workers refresh it, and a snapshot whose job no worker has taken in time is
+    built in the request
+    """
 
     serializer_class = PublishedPlanSerializer
 
@@ -20,22 +56,38 @@ class PublishedPlansViewset(viewsets.GenericViewSet):
     def retrieve(self, request, pk, format=None):
         try:
             published_plan = self.get_object()
-            serializer = self.get_serializer(published_plan)
-            pennies_data = make_pennies_request_and_run(published_plan.financial_data)
-            if pennies_data is None:
-                return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            # NB: could maybe have written a method in the `PublishedPlanSerializer` to run pennies but i wanted it
-            # to be more explicit
-            data = dict(serializer.data)
-            data["plans"] = pennies_data
-            return Response(data=data)
         except PublishedPlan.DoesNotExist:
-            print(self.kwargs)
             return Response(status=status.HTTP_404_NOT_FOUND)
+        if published_plan.snapshot is None:
+            queue_missing_published_plan(published_plan)
+        else:
+            refresh_published_plan_if_stale(published_plan)
+        run_unclaimed_published_plan_job(published_plan)
+        if published_plan.snapshot is None:
+            return Response(
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(MISSING_SNAPSHOT_RETRY_SECONDS)},
+            )
+        return self.get_snapshot_response(request, published_plan)
+
+    @staticmethod
+    def get_snapshot_response(request, published_plan: PublishedPlan) -> HttpResponse:
+        snapshot = bytes(published_plan.snapshot)
+        if accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            response = HttpResponse(snapshot, content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                gzip.decompress(snapshot), content_type="application/json"
+            )
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
 
     def create(self, request, format=None):
         if request.user.is_anonymous:
             return Response(status=status.HTTP_403_FORBIDDEN)
-        financial_data = copy_financial_data(request.user.financial_data)
-        published_plan = PublishedPlan.objects.create(financial_data=financial_data)
+        with transaction.atomic():
+            financial_data = copy_financial_data(request.user.financial_data)
+            published_plan = PublishedPlan.objects.create(financial_data=financial_data)
+        materialize_published_plan(published_plan)
         return Response(status=status.HTTP_200_OK, data={"id": published_plan.id})
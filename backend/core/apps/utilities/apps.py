@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class UtilitiesConfig(AppConfig):
+    name = "core.apps.utilities"
+    label = "utilities"
+
+    def ready(self):
+        # registers the outbox handlers so that this process can send the messages that other processes saved
+        from core.apps.email import mailchimp  # noqa: F401
+        from core.apps.utilities import slack  # noqa: F401
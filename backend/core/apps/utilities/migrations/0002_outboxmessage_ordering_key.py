@@ -0,0 +1,26 @@
+# Generated by Django 3.1.2 on 2026-10-18 14:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utilities", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="ordering_key",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=254
+            ),
+        ),
+        migrations.AlterField(
+            model_name="outboxmessage",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """A notification that could not be kept in memory - either the in-process queue was full or sending it failed"""
+
+    kind = models.CharField(max_length=50)
+    # the outbox handler that sends it - e.g. "slack" or "mailchimp"
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    ordering_key = models.CharField(
+        max_length=254, blank=True, default="", db_index=True
+    )
+    # the messages with the same key are sent in the order they were queued
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    # when the message was queued - it was kept in memory before it was saved
+
+    class Meta:
+        ordering = ["next_attempt_at"]
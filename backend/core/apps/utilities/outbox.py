@@ -0,0 +1,317 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from core.apps.utilities.models import OutboxMessage
+from core.config.settings import (
+    OUTBOX_AUTOSTART,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_QUEUE_SIZE,
+    OUTBOX_POLL_SECONDS,
+    OUTBOX_RETRY_BACKOFF_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+# the slack log handler skips this logger so that a failing webhook does not queue more messages for itself
+
+DATABASE_POLL_SECONDS = 30
+DATABASE_LEASE = timedelta(minutes=5)
+# a claimed message is hidden from the other processes for this long while it is sent
+
+
+class PartialBatchError(Exception):
+    """raised by a handler that sent the first `num_sent` messages of its batch before it failed"""
+
+    def __init__(self, num_sent: int, error: Exception):
+        super().__init__(num_sent, error)
+        self.num_sent = num_sent
+        self.error = error
+
+
+@dataclass
+class OutboxItem:
+    kind: str
+    payload: Dict
+    ordering_key: str = ""
+    # the messages with the same key are sent in the order they were queued - e.g. the operations on one email
+    created_at: datetime = field(default_factory=timezone.now)
+    attempts: int = 0
+    message_id: Optional[int] = None
+    # the row of a message that was loaded from the database
+
+
+@dataclass
+class OutboxHandler:
+    send_batch: Callable[[List[Dict]], None]
+    # raises to retry the whole batch or a `PartialBatchError` to retry the messages that were not sent
+    max_batch_size: int = 1
+    min_interval_seconds: float = 0
+    # the rate limit - the least time between two batches
+    last_sent_at: float = float("-inf")
+
+
+class Outbox:
+    """
+    Sends notifications to third parties in the background so that no request waits on them
+
+    The messages are kept in a bounded in-process queue and the messages that do not fit or fail are written to the
+    `OutboxMessage` table, which the sender of every process polls - failed messages are retried with an
+    exponential backoff until they run out of attempts
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = OUTBOX_MAX_QUEUE_SIZE,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        backoff_seconds: float = OUTBOX_RETRY_BACKOFF_SECONDS,
+        poll_seconds: float = OUTBOX_POLL_SECONDS,
+        autostart: bool = True,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_seconds = poll_seconds
+        self.autostart = autostart
+        self._queue: "queue.Queue[OutboxItem]" = queue.Queue(maxsize=max_queue_size)
+        self._handlers: Dict[str, OutboxHandler] = dict()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._enqueuing = threading.local()
+        self._last_database_poll = float("-inf")
+
+    def register(
+        self,
+        kind: str,
+        send_batch: Callable[[List[Dict]], None],
+        max_batch_size: int = 1,
+        min_interval_seconds: float = 0,
+    ):
+        self._handlers[kind] = OutboxHandler(
+            send_batch=send_batch,
+            max_batch_size=max_batch_size,
+            min_interval_seconds=min_interval_seconds,
+        )
+
+    def enqueue(self, kind: str, payload: Dict, ordering_key: str = ""):
+        """never blocks on the third party and never raises"""
+        if getattr(self._enqueuing, "value", False):
+            # logging the failure below queued a slack message for it
+            return
+        self._enqueuing.value = True
+        try:
+            if self.autostart:
+                self.start()
+            item = OutboxItem(kind=kind, payload=payload, ordering_key=ordering_key)
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._persist([item])
+        finally:
+            self._enqueuing.value = False
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="outbox-sender", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """stops the sender and writes the messages that are still in memory to the database"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stopped.set()
+        if thread is not None:
+            thread.join(timeout=self.poll_seconds * 2)
+        self._persist(self._take_from_queue(self._queue.qsize(), block=False))
+
+    def run_once(self, block: bool = False, poll_database: bool = True) -> int:
+        """sends a batch of the queued and due messages and returns how many were sent"""
+        items = self._take_from_queue(self._get_max_batch_size(), block=block)
+        now = time.monotonic()
+        if poll_database and now - self._last_database_poll >= DATABASE_POLL_SECONDS:
+            self._last_database_poll = now
+            items += self._claim_due_messages(self._get_max_batch_size())
+        return self._send(items)
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                close_old_connections()
+                try:
+                    self.run_once(block=True)
+                except Exception:
+                    logger.exception("The outbox sender failed")
+                    self._stopped.wait(self.poll_seconds)
+        finally:
+            connection.close()
+
+    def _get_max_batch_size(self) -> int:
+        return max((h.max_batch_size for h in self._handlers.values()), default=1)
+
+    def _take_from_queue(self, limit: int, block: bool) -> List[OutboxItem]:
+        items = list()
+        try:
+            if block:
+                items.append(self._queue.get(timeout=self.poll_seconds))
+            while len(items) < limit:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return items
+
+    def _claim_due_messages(self, limit: int) -> List[OutboxItem]:
+        """
+        only the messages this outbox has a handler for are claimed, and only the oldest message of an ordering key -
+        the later ones wait until it is sent or dropped
+        """
+        now = timezone.now()
+        earlier_messages = OutboxMessage.objects.filter(
+            ordering_key=OuterRef("ordering_key"), created_at__lt=OuterRef("created_at")
+        )
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(kind__in=list(self._handlers), next_attempt_at__lte=now)
+                .annotate(is_waiting=Exists(earlier_messages))
+                .filter(Q(ordering_key="") | Q(is_waiting=False))[:limit]
+            )
+            OutboxMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+                next_attempt_at=now + DATABASE_LEASE
+            )
+        return [
+            OutboxItem(
+                kind=m.kind,
+                payload=m.payload,
+                ordering_key=m.ordering_key,
+                created_at=m.created_at,
+                attempts=m.attempts,
+                message_id=m.pk,
+            )
+            for m in messages
+        ]
+
+    def _is_held_back(self, item: OutboxItem, blocked_keys: Set[str]) -> bool:
+        """whether an earlier message with the same ordering key has not been sent yet"""
+        if not item.ordering_key:
+            return False
+        if item.ordering_key in blocked_keys:
+            return True
+        return (
+            OutboxMessage.objects.filter(
+                ordering_key=item.ordering_key, created_at__lt=item.created_at
+            )
+            .exclude(pk=item.message_id)
+            .exists()
+        )
+
+    def _send(self, items: List[OutboxItem]) -> int:
+        num_sent = 0
+        blocked_keys = set()
+        # the ordering keys of the messages that failed or were held back in this batch
+        for kind in dict.fromkeys(item.kind for item in items):
+            kind_items = [item for item in items if item.kind == kind]
+            handler = self._handlers.get(kind)
+            if handler is None:
+                # the module of the handler was not imported by this process - not counted as an attempt
+                self._persist(kind_items, f"No outbox handler for {kind}")
+                continue
+            for start in range(0, len(kind_items), handler.max_batch_size):
+                batch = kind_items[start : start + handler.max_batch_size]
+                is_held_back = [self._is_held_back(i, blocked_keys) for i in batch]
+                held_back = [i for i, held in zip(batch, is_held_back) if held]
+                batch = [i for i, held in zip(batch, is_held_back) if not held]
+                if held_back:
+                    # saved with their attempts so they are claimed once the earlier message is sent or dropped
+                    blocked_keys.update(item.ordering_key for item in held_back)
+                    self._persist(held_back, "Waiting for an earlier message")
+                if not batch:
+                    continue
+                wait_seconds = (
+                    handler.last_sent_at
+                    + handler.min_interval_seconds
+                    - time.monotonic()
+                )
+                if wait_seconds > 0:
+                    time.sleep(wait_seconds)
+                handler.last_sent_at = time.monotonic()
+                try:
+                    handler.send_batch([item.payload for item in batch])
+                except Exception as error:
+                    num_batch_sent = 0
+                    if isinstance(error, PartialBatchError):
+                        num_batch_sent, error = error.num_sent, error.error
+                    failed = batch[num_batch_sent:]
+                    blocked_keys.update(
+                        item.ordering_key for item in failed if item.ordering_key
+                    )
+                    self._retry(failed, repr(error))
+                    batch = batch[:num_batch_sent]
+                num_sent += len(batch)
+                OutboxMessage.objects.filter(
+                    pk__in=[i.message_id for i in batch if i.message_id is not None]
+                ).delete()
+        return num_sent
+
+    def _retry(self, items: List[OutboxItem], error: str):
+        retries = list()
+        for item in items:
+            item.attempts += 1
+            if item.attempts >= self.max_attempts:
+                logger.warning(
+                    f"Dropping a {item.kind} outbox message after {item.attempts} attempts: {error}"
+                )
+                if item.message_id is not None:
+                    OutboxMessage.objects.filter(pk=item.message_id).delete()
+            else:
+                retries.append(item)
+        self._persist(retries, error)
+
+    def _persist(self, items: List[OutboxItem], error: str = ""):
+        if not items:
+            return
+        now = timezone.now()
+        try:
+            new_messages = list()
+            for item in items:
+                next_attempt_at = now
+                if item.attempts > 0:
+                    next_attempt_at += timedelta(
+                        seconds=self.backoff_seconds * 2 ** (item.attempts - 1)
+                    )
+                if item.message_id is None:
+                    new_messages.append(
+                        OutboxMessage(
+                            kind=item.kind,
+                            payload=item.payload,
+                            ordering_key=item.ordering_key,
+                            created_at=item.created_at,
+                            attempts=item.attempts,
+                            next_attempt_at=next_attempt_at,
+                            last_error=error,
+                        )
+                    )
+                else:
+                    OutboxMessage.objects.filter(pk=item.message_id).update(
+                        attempts=item.attempts,
+                        next_attempt_at=next_attempt_at,
+                        last_error=error,
+                    )
+            OutboxMessage.objects.bulk_create(new_messages)
+        except Exception:
+            logger.exception(f"Could not save {len(items)} outbox messages")
+
+
+OUTBOX = Outbox(autostart=OUTBOX_AUTOSTART)
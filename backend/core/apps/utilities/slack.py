@@ -0,0 +1,71 @@
+from typing import Dict, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.apps.utilities.outbox import OUTBOX, PartialBatchError
+from core.config.settings import SLACK_WEBHOOK_URL
+
+SLACK_OUTBOX_KIND = "slack"
+SLACK_TIMEOUT_SECONDS = 10
+SLACK_MAX_BATCH_SIZE = 10
+SLACK_MAX_BLOCKS = 50
+# slack rejects messages with more blocks than this
+SLACK_MIN_INTERVAL_SECONDS = 1
+# incoming webhooks are limited to about one message per second
+
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+# keeps the connection to slack open between messages
+
+
+def enqueue_slack_message(message: Dict):
+    """`message` is the json body of the webhook - it is sent in the background"""
+    OUTBOX.enqueue(SLACK_OUTBOX_KIND, message)
+
+
+def merge_slack_messages(messages: List[Dict]) -> List[Tuple[Dict, int]]:
+    """
+    the messages that only have blocks are posted together as long as the blocks fit in one message - every merged
+    message comes with the number of messages in it
+    """
+    merged = list()
+    for message in messages:
+        previous, num_messages = merged[-1] if merged else (None, 0)
+        if (
+            set(message) == {"blocks"}
+            and previous is not None
+            and set(previous) == {"blocks"}
+            and len(previous["blocks"]) + len(message["blocks"]) <= SLACK_MAX_BLOCKS
+        ):
+            previous["blocks"] = previous["blocks"] + message["blocks"]
+            merged[-1] = (previous, num_messages + 1)
+        else:
+            merged.append((dict(message), 1))
+    return merged
+
+
+def send_slack_messages(messages: List[Dict]):
+    num_sent = 0
+    for message, num_messages in merge_slack_messages(messages):
+        try:
+            response = _SESSION.post(
+                SLACK_WEBHOOK_URL, json=message, timeout=SLACK_TIMEOUT_SECONDS
+            )
+            if response.status_code != 200:
+                raise ValueError(
+                    "Request to slack returned an error %s, the response is:\n%s"
+                    % (response.status_code, response.text)
+                )
+        except Exception as error:
+            # the messages that were already posted are not retried
+            raise PartialBatchError(num_sent, error) from error
+        num_sent += num_messages
+
+
+OUTBOX.register(
+    SLACK_OUTBOX_KIND,
+    send_slack_messages,
+    max_batch_size=SLACK_MAX_BATCH_SIZE,
+    min_interval_seconds=SLACK_MIN_INTERVAL_SECONDS,
+)
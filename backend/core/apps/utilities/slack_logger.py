@@ -1,4 +1,3 @@
-import requests
 import json
 import time
 from copy import copy
@@ -7,6 +6,8 @@ from django.utils.log import AdminEmailHandler
 from django.utils import timezone
 from django.views.debug import ExceptionReporter
 
+OUTBOX_LOGGER_NAME = "core.apps.utilities.outbox"
+
 
 class SlackExceptionHandler(AdminEmailHandler):
     def __init__(self, include_html=False, email_backend=None, reporter_class=None):
@@ -29,6 +30,9 @@ class SlackExceptionHandler(AdminEmailHandler):
         return color
 
     def emit(self, record, *args, **kwargs):
+        if record.name.startswith(OUTBOX_LOGGER_NAME):
+            # the failures of the outbox would queue more slack messages for themselves
+            return
         try:
             request = record.request
             subject = "%s (%s IP): %s" % (
@@ -131,12 +135,12 @@ class SlackExceptionHandler(AdminEmailHandler):
             "%A, %d %b %Y %H:%M:%S +0000", time.gmtime()
         )
 
-        data = {
-            "payload": json.dumps({"main_text": main_text, "attachments": attachments}),
-        }
+        data = {"main_text": main_text, "attachments": attachments}
 
         if record.levelname in self.SLACK_ERROR_LEVEL or (
             self.SLACK_ERROR_LEVEL == "*" or self.SLACK_ERROR_LEVEL == ["*"]
         ):
-            webhook_url = settings.SLACK_WEBHOOK_URL
-            requests.post(webhook_url, data=data)
+            # imported here because the logging is configured before the apps are loaded
+            from core.apps.utilities.slack import enqueue_slack_message
+
+            enqueue_slack_message(data)
@@ -14,7 +14,7 @@ from core.apps.payments.views import (
     PaymentPlanIntentViewset,
     PromotionCodeViewset,
 )
-from core.apps.plan.views import UserPlanViewSet
+from core.apps.plan.views import PlanJobViewSet, UserPlanViewSet
 from core.apps.published_plans.views import PublishedPlansViewset
 from core.apps.users.views import AccountViewSet
 
@@ -31,6 +31,7 @@ api.register(r"my/finances/loans", LoanViewset)
 api.register(r"my/finances/investments", InvestmentViewset)
 api.register(r"my/finances/goals", FinancialGoalViewset)
 api.register(r"my/finances/profile", FinancialProfileView, basename="financial-profile")
+api.register(r"my/plan/jobs", PlanJobViewSet, basename="plan-job")
 api.register(r"my/plan", UserPlanViewSet, basename="financial-plan")
 api.register(r"finances/enums", FinancesEnumsViewset, basename="financial-enums")
 api.register(
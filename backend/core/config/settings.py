@@ -40,6 +40,7 @@ LOCAL_APPS = [
     "core.apps.payments",
     "core.apps.utilities",
     "core.apps.published_plans",
+    "core.apps.plan",
 ]
 
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -110,6 +111,71 @@ DATABASES = {
     },
 }
 
+# CACHE CONFIGURATION
+# ------------------------------------------------------------------------------
+# See: https://docs.djangoproject.com/en/dev/ref/settings/#caches
+REDIS_URL = env.str("REDIS_URL", default="")
+PLAN_CACHE_MAX_ENTRIES = env.int("PLAN_CACHE_MAX_ENTRIES", default=256)
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": PLAN_CACHE_MAX_ENTRIES},
+        }
+    }
+
+# plans are cached by a fingerprint of the pennies request - "django" uses CACHES and "memory" an in-process LRU
+PLAN_CACHE_BACKEND = env.str("PLAN_CACHE_BACKEND", default="django")
+PLAN_CACHE_TTL_SECONDS = env.int("PLAN_CACHE_TTL_SECONDS", default=60 * 60)
+
+# FIREBASE CONFIGURATION
+# ------------------------------------------------------------------------------
+# verified id tokens are cached until they expire - the firebase user is fetched at most this often to catch revoked
+# tokens and disabled users
+FIREBASE_REVOCATION_CHECK_SECONDS = env.int(
+    "FIREBASE_REVOCATION_CHECK_SECONDS", default=5 * 60
+)
+
+# PLAN JOB CONFIGURATION
+# ------------------------------------------------------------------------------
+# plan jobs are queued in the database and built by the worker threads of `manage.py run_plan_workers`, which runs
+# as its own process so that the solves never block the web workers - scripts/gunicorn.sh starts it next to gunicorn
+# and docker-compose runs it as the plan_workers service. The web processes only start worker threads of their own
+# when PLAN_JOB_WEB_WORKERS is set
+PLAN_JOB_WORKERS = env.int("PLAN_JOB_WORKERS", default=2)
+PLAN_JOB_WEB_WORKERS = env.int("PLAN_JOB_WEB_WORKERS", default=0)
+# a job that is still running after this long lost its worker to a restart, deploy or crash and is failed
+PLAN_JOB_TIMEOUT_SECONDS = env.float("PLAN_JOB_TIMEOUT_SECONDS", default=10 * 60)
+PLAN_JOB_POLL_SECONDS = env.float("PLAN_JOB_POLL_SECONDS", default=1)
+PLAN_JOB_MAX_WAIT_SECONDS = env.float("PLAN_JOB_MAX_WAIT_SECONDS", default=25)
+# a stale plan whose job has been due for this long without a worker taking it is built in the request instead
+PLAN_JOB_CLAIM_TIMEOUT_SECONDS = env.float(
+    "PLAN_JOB_CLAIM_TIMEOUT_SECONDS", default=60
+)
+# the plans are recomputed once the finances have not changed for this long
+PLAN_RECOMPUTE_DEBOUNCE_SECONDS = env.float(
+    "PLAN_RECOMPUTE_DEBOUNCE_SECONDS", default=5
+)
+
+# OUTBOX CONFIGURATION
+# ------------------------------------------------------------------------------
+# slack and mailchimp are called from a background sender - the messages that do not fit in the in-process queue or
+# fail are kept in the database and retried with an exponential backoff
+OUTBOX_MAX_QUEUE_SIZE = env.int("OUTBOX_MAX_QUEUE_SIZE", default=1000)
+OUTBOX_MAX_ATTEMPTS = env.int("OUTBOX_MAX_ATTEMPTS", default=6)
+OUTBOX_RETRY_BACKOFF_SECONDS = env.float("OUTBOX_RETRY_BACKOFF_SECONDS", default=30)
+OUTBOX_POLL_SECONDS = env.float("OUTBOX_POLL_SECONDS", default=1)
+# the sender writes to the database over its own connection, outside of the transactions of the tests
+OUTBOX_AUTOSTART = env.bool("OUTBOX_AUTOSTART", default=not TESTING)
+
 # GENERAL CONFIGURATION
 # ------------------------------------------------------------------------------
 # Local time zone for this installation. Choices can be found here:
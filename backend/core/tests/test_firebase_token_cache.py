@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from firebase_admin.auth import ExpiredIdTokenError, RevokedIdTokenError
+
+from core.apps.firebase.token_cache import FirebaseTokenCache
+
+ISSUED_AT = 1_000_000
+EXPIRES_AT = ISSUED_AT + 60 * 60
+
+
+class FakeFirebase:
+    def __init__(self):
+        self.now = ISSUED_AT
+        self.verify_calls = 0
+        self.get_user_calls = 0
+        self.tokens_valid_after_timestamp = 0
+        self.disabled = False
+
+    def verify_id_token(self, id_token):
+        self.verify_calls += 1
+        if self.now >= EXPIRES_AT:
+            raise ExpiredIdTokenError("Token expired", cause=None)
+        return {
+            "uid": f"uid-{id_token}",
+            "email": "user@email.ca",
+            "iat": ISSUED_AT,
+            "exp": EXPIRES_AT,
+        }
+
+    def get_user(self, uid):
+        self.get_user_calls += 1
+        return SimpleNamespace(
+            uid=uid,
+            email="user@email.ca",
+            disabled=self.disabled,
+            tokens_valid_after_timestamp=self.tokens_valid_after_timestamp,
+        )
+
+
+class FirebaseTokenCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.firebase = FakeFirebase()
+        self.cache = FirebaseTokenCache(
+            verify_id_token=self.firebase.verify_id_token,
+            get_user=self.firebase.get_user,
+            clock=lambda: self.firebase.now,
+            max_tokens=2,
+            revocation_check_seconds=60,
+        )
+
+    def test_token_is_verified_once(self):
+        for _ in range(10):
+            token, firebase_user = self.cache.verify("token")
+            assert token.email == "user@email.ca"
+            self.firebase.now += 1
+        assert self.firebase.verify_calls == 1
+        assert self.firebase.get_user_calls == 1
+
+    def test_expired_token_is_rejected(self):
+        self.cache.verify("token")
+        self.firebase.now = EXPIRES_AT
+        with self.assertRaises(ExpiredIdTokenError):
+            self.cache.verify("token")
+
+    def test_revoked_token_is_rejected_after_the_revocation_check(self):
+        self.cache.verify("token")
+        self.firebase.tokens_valid_after_timestamp = (ISSUED_AT + 1) * 1000
+        self.cache.verify("token")
+        self.firebase.now += 60
+        with self.assertRaises(RevokedIdTokenError):
+            self.cache.verify("token")
+        assert self.firebase.get_user_calls == 2
+
+    def test_disabled_user_is_rejected(self):
+        self.firebase.disabled = True
+        with self.assertRaises(RevokedIdTokenError):
+            self.cache.verify("token")
+
+    def test_users_are_bounded_like_the_tokens(self):
+        for id_token in ["first", "second", "third"]:
+            self.cache.verify(id_token)
+        assert list(self.cache._users) == ["uid-second", "uid-third"]
+        self.cache.verify("first")
+        assert self.firebase.get_user_calls == 4
@@ -1,5 +1,11 @@
+import gzip
+import json
+from datetime import date, timedelta
+from unittest import mock
+
 from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, force_authenticate
 
@@ -7,9 +13,12 @@ from core.apps.onboarding.views import (
     SurveyOnboardingAPIView,
     PublishedPlanOnboardingAPIView,
 )
+from core.apps.plan.jobs import run_next_plan_job
+from core.apps.plan.models import PlanJob, PlanJobStatus
 from core.apps.published_plans.models import PublishedPlan
-from core.apps.published_plans.views import PublishedPlansViewset
+from core.apps.published_plans.views import PublishedPlansViewset, accepts_gzip
 from core.apps.users.models import User
+from core.config.settings import PLAN_JOB_CLAIM_TIMEOUT_SECONDS
 from core.tests._utilities import delete_firebase_user_if_exists
 
 
@@ -17,6 +26,7 @@ class FakeAdmin:
     is_anonymous = False
 
 
+@mock.patch("core.apps.plan.jobs.PLAN_JOB_WORKER_POOL.num_workers", 0)
 class OnboardingTestCase(TestCase):
     def setUp(self) -> None:
         self.admin_email = "onboard_django_test@email.com"
@@ -88,6 +98,9 @@ class OnboardingTestCase(TestCase):
         assert plan_id is not None
         plan = PublishedPlan.objects.get(pk=plan_id)
         assert isinstance(plan, PublishedPlan)
+        # the plans are solved when the plan is published
+        assert plan.snapshot is not None
+        assert run_next_plan_job() is None
         return plan
 
     def onboard_from_published_plan(self, published_plan: PublishedPlan):
@@ -129,3 +142,102 @@ class OnboardingTestCase(TestCase):
             admin = getattr(admin_user.financial_profile, attr)
             new = getattr(new_user.financial_profile, attr)
             assert admin == new, (attr, new, admin)
+
+    def get_published_plan_response(
+        self, published_plan: PublishedPlan, accept_encoding: str = ""
+    ):
+        factory = APIRequestFactory()
+        request = factory.get(
+            f"api/published-plan/{published_plan.pk}",
+            HTTP_ACCEPT_ENCODING=accept_encoding,
+        )
+        view = PublishedPlansViewset.as_view({"get": "retrieve"})
+        return view(request, pk=published_plan.pk)
+
+    def retrieve_published_plan(self, published_plan: PublishedPlan):
+        response = self.get_published_plan_response(published_plan)
+        assert response.status_code == status.HTTP_200_OK
+        return json.loads(response.content)
+
+    def test_retrieve_published_plan(self):
+        admin_user = self.onboard_admin_with_survey()
+        published_plan = self.create_published_plan(admin_user)
+        assert published_plan.snapshot is not None
+        data = self.retrieve_published_plan(published_plan)
+        assert data["id"] == published_plan.pk
+        assert len(data["plans"]) > 0
+
+        # a snapshot from an earlier month is served while it is refreshed once by the plan workers
+        PublishedPlan.objects.filter(pk=published_plan.pk).update(
+            snapshot_month=date(2000, 1, 1)
+        )
+        assert self.retrieve_published_plan(published_plan) == data
+        assert self.retrieve_published_plan(published_plan) == data
+        assert run_next_plan_job().status == PlanJobStatus.SUCCEEDED
+        assert run_next_plan_job() is None
+        published_plan.refresh_from_db()
+        assert not published_plan.is_snapshot_stale
+        assert published_plan.refreshing_since is None
+
+        # a plan without a snapshot is only queued once and a failed solve is not retried right away
+        PublishedPlan.objects.filter(pk=published_plan.pk).update(
+            snapshot=None, snapshot_month=None, refreshing_since=None
+        )
+        for _ in range(2):
+            response = self.get_published_plan_response(published_plan)
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert "Retry-After" in response
+        with mock.patch(
+            "core.apps.plan.jobs.make_pennies_request_and_run", return_value=None
+        ):
+            assert run_next_plan_job().status == PlanJobStatus.FAILED
+        assert run_next_plan_job() is None
+        response = self.get_published_plan_response(published_plan)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert run_next_plan_job() is None
+
+        PublishedPlan.objects.filter(pk=published_plan.pk).update(refreshing_since=None)
+        self.get_published_plan_response(published_plan)
+        assert run_next_plan_job().status == PlanJobStatus.SUCCEEDED
+        assert len(self.retrieve_published_plan(published_plan)["plans"]) > 0
+
+    def test_snapshot_is_built_when_no_worker_takes_the_job(self):
+        admin_user = self.onboard_admin_with_survey()
+        published_plan = self.create_published_plan(admin_user)
+        PublishedPlan.objects.filter(pk=published_plan.pk).update(
+            snapshot=None, snapshot_month=None, refreshing_since=None
+        )
+        response = self.get_published_plan_response(published_plan)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+        PlanJob.objects.filter(status=PlanJobStatus.PENDING).update(
+            run_after=timezone.now()
+            - timedelta(seconds=PLAN_JOB_CLAIM_TIMEOUT_SECONDS + 1)
+        )
+        assert len(self.retrieve_published_plan(published_plan)["plans"]) > 0
+        assert not PlanJob.objects.filter(status=PlanJobStatus.PENDING).exists()
+
+    def test_published_plan_encoding(self):
+        admin_user = self.onboard_admin_with_survey()
+        published_plan = self.create_published_plan(admin_user)
+        data = self.retrieve_published_plan(published_plan)
+        for accept_encoding, is_gzipped in [
+            ("", False),
+            ("gzip", True),
+            ("deflate, gzip;q=0.5", True),
+            ("gzip;q=0", False),
+            ("br, *;q=0.1", True),
+            ("*;q=1, gzip;q=0", False),
+        ]:
+            response = self.get_published_plan_response(
+                published_plan, accept_encoding
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response.has_header("Vary")
+            assert "Accept-Encoding" in response["Vary"]
+            assert response.has_header("Content-Encoding") == is_gzipped, accept_encoding
+            assert accepts_gzip(accept_encoding) == is_gzipped
+            content = response.content
+            if is_gzipped:
+                content = gzip.decompress(content)
+            assert json.loads(content) == data
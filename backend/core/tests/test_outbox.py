@@ -0,0 +1,180 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.apps.utilities.models import OutboxMessage
+from core.apps.utilities.outbox import OUTBOX, Outbox, PartialBatchError
+from core.apps.utilities.slack import merge_slack_messages, send_slack_messages
+
+
+class FakeSender:
+    def __init__(self, num_failures=0):
+        self.num_failures = num_failures
+        self.batches = list()
+
+    def __call__(self, payloads):
+        if self.num_failures > 0:
+            self.num_failures -= 1
+            raise ValueError("the webhook is down")
+        self.batches.append(payloads)
+
+
+class OutboxTestCase(TestCase):
+    def setUp(self) -> None:
+        # the messages that other tests queued on the global outbox must not be sent or saved during these tests
+        OUTBOX.stop()
+
+    @staticmethod
+    def get_messages():
+        """the messages of the outboxes of these tests - not the ones other tests left on the global outbox"""
+        return OutboxMessage.objects.filter(kind="test")
+
+    def make_outbox(self, sender, max_queue_size=10, max_batch_size=5):
+        outbox = Outbox(
+            max_queue_size=max_queue_size,
+            max_attempts=3,
+            backoff_seconds=60,
+            poll_seconds=0,
+            autostart=False,
+        )
+        outbox.register("test", sender, max_batch_size=max_batch_size)
+        return outbox
+
+    def test_batches_queued_messages(self):
+        sender = FakeSender()
+        outbox = self.make_outbox(sender, max_batch_size=2)
+        for index in range(3):
+            outbox.enqueue("test", {"index": index})
+        self.assertEqual(outbox.run_once(), 2)
+        self.assertEqual(outbox.run_once(), 1)
+        self.assertEqual(sender.batches, [[{"index": 0}, {"index": 1}], [{"index": 2}]])
+        self.assertFalse(self.get_messages().exists())
+
+    def test_full_queue_falls_back_to_database(self):
+        sender = FakeSender()
+        outbox = self.make_outbox(sender, max_queue_size=1)
+        outbox.enqueue("test", {"index": 0})
+        outbox.enqueue("test", {"index": 1})
+        self.assertEqual(self.get_messages().count(), 1)
+        self.assertEqual(outbox.run_once(), 2)
+        self.assertEqual(sender.batches, [[{"index": 0}, {"index": 1}]])
+        self.assertFalse(self.get_messages().exists())
+
+    def test_failed_messages_are_retried_with_backoff(self):
+        sender = FakeSender(num_failures=1)
+        outbox = self.make_outbox(sender)
+        outbox.enqueue("test", {"index": 0})
+        self.assertEqual(outbox.run_once(), 0)
+        message = self.get_messages().get()
+        self.assertEqual(message.attempts, 1)
+        self.assertIn("the webhook is down", message.last_error)
+        self.assertGreater(
+            message.next_attempt_at, timezone.now() + timedelta(seconds=30)
+        )
+
+        # not due yet
+        outbox._last_database_poll = float("-inf")
+        self.assertEqual(outbox.run_once(), 0)
+
+        self.get_messages().update(next_attempt_at=timezone.now())
+        outbox._last_database_poll = float("-inf")
+        self.assertEqual(outbox.run_once(), 1)
+        self.assertEqual(sender.batches, [[{"index": 0}]])
+        self.assertFalse(self.get_messages().exists())
+
+    def test_messages_are_dropped_after_max_attempts(self):
+        sender = FakeSender(num_failures=3)
+        outbox = self.make_outbox(sender)
+        outbox.enqueue("test", {"index": 0})
+        for _ in range(3):
+            outbox._last_database_poll = float("-inf")
+            self.get_messages().update(next_attempt_at=timezone.now())
+            outbox.run_once()
+        self.assertFalse(self.get_messages().exists())
+        self.assertEqual(sender.batches, [])
+
+    def test_messages_with_the_same_ordering_key_are_sent_in_order(self):
+        sender = FakeSender(num_failures=1)
+        outbox = self.make_outbox(sender, max_batch_size=1)
+        outbox.enqueue("test", {"operation": "create"}, ordering_key="a")
+        outbox.enqueue("test", {"operation": "delete"}, ordering_key="a")
+        outbox.enqueue("test", {"operation": "other"}, ordering_key="b")
+        self.assertEqual(outbox.run_once(), 0)
+        self.assertEqual(outbox.run_once(), 0)
+        self.assertEqual(outbox.run_once(), 1)
+        self.assertEqual(sender.batches, [[{"operation": "other"}]])
+        self.assertEqual(self.get_messages().count(), 2)
+
+        self.get_messages().update(next_attempt_at=timezone.now())
+        for _ in range(2):
+            outbox._last_database_poll = float("-inf")
+            self.assertEqual(outbox.run_once(), 1)
+        self.assertEqual(
+            sender.batches[1:], [[{"operation": "create"}], [{"operation": "delete"}]]
+        )
+        self.assertFalse(self.get_messages().exists())
+
+    def test_only_the_unsent_messages_of_a_partial_batch_are_retried(self):
+        def send_first(payloads):
+            sender.batches.append(payloads[:1])
+            raise PartialBatchError(1, ValueError("the webhook is down"))
+
+        sender = FakeSender()
+        outbox = self.make_outbox(send_first)
+        for index in range(3):
+            outbox.enqueue("test", {"index": index})
+        self.assertEqual(outbox.run_once(), 1)
+        self.assertEqual(sender.batches, [[{"index": 0}]])
+        messages = self.get_messages().order_by("payload__index")
+        self.assertEqual([m.payload for m in messages], [{"index": 1}, {"index": 2}])
+        self.assertEqual([m.attempts for m in messages], [1, 1])
+        self.assertIn("the webhook is down", messages[0].last_error)
+
+    def test_only_messages_with_a_handler_are_claimed(self):
+        OutboxMessage.objects.create(
+            kind="other", payload={}, next_attempt_at=timezone.now()
+        )
+        sender = FakeSender()
+        outbox = self.make_outbox(sender, max_batch_size=1)
+        outbox.enqueue("test", {"index": 0})
+        outbox.stop()
+        self.assertEqual(outbox.run_once(), 1)
+        self.assertEqual(sender.batches, [[{"index": 0}]])
+        message = OutboxMessage.objects.get(kind="other")
+        self.assertEqual(message.last_error, "")
+
+    def test_stop_saves_queued_messages(self):
+        outbox = self.make_outbox(FakeSender())
+        outbox.enqueue("test", {"index": 0})
+        outbox.stop()
+        message = self.get_messages().get()
+        self.assertEqual(message.payload, {"index": 0})
+        self.assertEqual(message.attempts, 0)
+
+
+class SlackMessagesTestCase(TestCase):
+    def test_merges_block_messages(self):
+        header = {"blocks": [{"type": "header"}]}
+        attachment = {"main_text": "ERROR", "attachments": [{"title": "error"}]}
+        merged = merge_slack_messages([header, header, attachment, header])
+        expected = [
+            ({"blocks": [{"type": "header"}, {"type": "header"}]}, 2),
+            (attachment, 1),
+            (header, 1),
+        ]
+        self.assertEqual(merged, expected)
+
+    def test_posted_messages_are_not_resent(self):
+        header = {"blocks": [{"type": "header"}]}
+        attachment = {"main_text": "ERROR", "attachments": [{"title": "error"}]}
+        responses = [mock.Mock(status_code=200), mock.Mock(status_code=500)]
+        with mock.patch(
+            "core.apps.utilities.slack._SESSION.post", side_effect=responses
+        ) as post:
+            with self.assertRaises(PartialBatchError) as context:
+                send_slack_messages([header, header, attachment, header])
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(context.exception.num_sent, 2)
+        self.assertIsInstance(context.exception.error, ValueError)
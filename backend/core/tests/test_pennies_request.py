@@ -0,0 +1,144 @@
+import json
+from datetime import date
+
+from django.test import TestCase
+
+from core.apps.finances.models.constants import InterestTypes
+from core.apps.finances.models.financial_data import FinancialData
+from core.apps.finances.models.financial_profile import FinancialProfile
+from core.apps.finances.models.goals import FinancialGoal, GoalType
+from core.apps.finances.models.investments import (
+    Investment,
+    InvestmentAccountType,
+    InvestmentType,
+    RiskChoices,
+)
+from core.apps.finances.models.loans import Loan, LoanInterest, LoanType
+from core.apps.finances.serializers.pennies.request import (
+    PenniesRequestSerializer,
+    load_pennies_request,
+)
+from core.apps.finances.utilities import copy_financial_data
+
+NUM_LOAD_QUERIES = 4
+NUM_COPY_QUERIES = 13
+# the savepoint and its release, the finances, a select and a bulk insert per model, the profile and its version bump
+
+
+def _drop_ids(request):
+    return {
+        key: [
+            {k: v for k, v in item.items() if k not in ("db_id", "financial_data")}
+            for item in value
+        ]
+        if isinstance(value, list)
+        else value
+        for key, value in request.items()
+    }
+
+
+class PenniesRequestTestCase(TestCase):
+    def create_loans(self):
+        Loan.objects.create(
+            financial_data=self.financial_data,
+            name="credit card",
+            loan_type=LoanType.CREDIT_CARD,
+            loan_interest=LoanInterest.objects.create(apr=20),
+            current_balance=2000,
+        )
+        Loan.objects.create(
+            financial_data=self.financial_data,
+            name="mortgage",
+            loan_type=LoanType.MORTGAGE,
+            loan_interest=LoanInterest.objects.create(
+                interest_type=InterestTypes.VARIABLE,
+                prime_modifier=0.5,
+                current_term_end_date=date(2030, 1, 1),
+            ),
+            current_balance=300_000,
+            minimum_monthly_payment=1200,
+            end_date=date(2045, 1, 1),
+        )
+
+    def create_investments(self):
+        Investment.objects.create(
+            financial_data=self.financial_data,
+            name="etf tfsa",
+            investment_type=InvestmentType.ETF,
+            account_type=InvestmentAccountType.TFSA,
+            risk_level=RiskChoices.MEDIUM,
+            pre_authorized_monthly_contribution=100,
+        )
+        Investment.objects.create(
+            financial_data=self.financial_data,
+            name="gic",
+            investment_type=InvestmentType.GIC,
+            interest_type=InterestTypes.FIXED,
+            expected_roi=2,
+            principal_investment_amount=1000,
+            investment_date=date(2021, 1, 1),
+            maturity_date=date(2026, 1, 1),
+        )
+        Investment.objects.create(
+            financial_data=self.financial_data,
+            name="cash",
+            investment_type=InvestmentType.CASH,
+        )
+
+    def create_goals(self):
+        FinancialGoal.objects.create(
+            financial_data=self.financial_data,
+            name="nest egg",
+            type=GoalType.NEST_EGG,
+            amount=500,
+            date=date(2030, 1, 1),
+        )
+
+    def setUp(self) -> None:
+        self.financial_data = FinancialData.objects.create()
+        FinancialProfile.objects.create(financial_data=self.financial_data)
+        self.create_loans()
+        self.create_investments()
+        self.create_goals()
+
+    def serialize(self):
+        # the serializer on the finances without the prefetched graph - one query per relation and loan
+        financial_data = FinancialData.objects.get(pk=self.financial_data.pk)
+        return PenniesRequestSerializer(financial_data).data
+
+    def test_load_matches_serializer(self):
+        request = load_pennies_request(self.financial_data.pk)
+        assert request == self.serialize()
+        assert json.dumps(request) == json.dumps(self.serialize())
+        assert [loan["name"] for loan in request["loans"]] == ["credit card", "mortgage"]
+
+        self.financial_data.financial_profile.delete()
+        request = load_pennies_request(self.financial_data.pk)
+        assert request["financial_profile"] is None
+        assert request == self.serialize()
+
+    def test_load_query_count_does_not_grow_with_instruments(self):
+        with self.assertNumQueries(NUM_LOAD_QUERIES):
+            load_pennies_request(self.financial_data.pk)
+        self.create_loans()
+        self.create_investments()
+        self.create_goals()
+        with self.assertNumQueries(NUM_LOAD_QUERIES):
+            request = load_pennies_request(self.financial_data.pk)
+        assert len(request["loans"]) == 4
+        assert len(request["investments"]) == 6
+        assert len(request["goals"]) == 2
+
+    def test_copy_financial_data(self):
+        with self.assertNumQueries(NUM_COPY_QUERIES):
+            copy = copy_financial_data(self.financial_data)
+        assert copy.pk != self.financial_data.pk
+        assert _drop_ids(load_pennies_request(copy.pk)) == _drop_ids(
+            load_pennies_request(self.financial_data.pk)
+        )
+
+        self.create_loans()
+        self.create_investments()
+        self.create_goals()
+        with self.assertNumQueries(NUM_COPY_QUERIES):
+            copy_financial_data(self.financial_data)
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.apps.finances.views import FinancialProfileView
+from core.apps.plan.jobs import claim_next_plan_job, run_next_plan_job
+from core.apps.plan.models import PlanJob, PlanJobStatus
+from core.apps.plan.views import PlanJobViewSet, UserPlanViewSet
+from core.apps.users.utilities import delete_user
+from core.config.settings import (
+    PLAN_JOB_CLAIM_TIMEOUT_SECONDS,
+    PLAN_JOB_TIMEOUT_SECONDS,
+)
+from core.tests._utilities import create_user
+
+
+@mock.patch("core.apps.plan.jobs.PLAN_JOB_WORKER_POOL.num_workers", 0)
+class PlanJobTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user()
+        self.update_financial_profile(monthly_salary_before_tax=8000)
+
+    def update_financial_profile(self, monthly_salary_before_tax):
+        factory = APIRequestFactory()
+        data = {
+            "birth_date": "1994-03-11",
+            "retirement_age": 65,
+            "risk_tolerance": 50,
+            "monthly_salary_before_tax": monthly_salary_before_tax,
+            "percent_salary_for_spending": 50,
+            "starting_tfsa_contribution_limit": 0,
+            "starting_rrsp_contribution_limit": 0,
+            "province_of_residence": "AB",
+            "death_age": 90,
+        }
+        view = FinancialProfileView.as_view({"post": "create"})
+        request = factory.post("my/finances/profile", data=data, format="json")
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def tearDown(self) -> None:
+        delete_user(self.user)
+
+    def submit_job(self):
+        factory = APIRequestFactory()
+        request = factory.post("api/my/plan/jobs", format="json")
+        force_authenticate(request, user=self.user)
+        return PlanJobViewSet.as_view({"post": "create"})(request)
+
+    def retrieve_job(self, job_id):
+        factory = APIRequestFactory()
+        request = factory.get(f"api/my/plan/jobs/{job_id}", format="json")
+        force_authenticate(request, user=self.user)
+        return PlanJobViewSet.as_view({"get": "retrieve"})(request, pk=job_id)
+
+    def test_plan_job(self):
+        response = self.submit_job()
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.data
+        job_id = response.data["id"]
+        assert response.data["status"] == PlanJobStatus.PENDING
+
+        # the same finances are only queued once
+        assert self.submit_job().data["id"] == job_id
+        assert PlanJob.objects.filter(user=self.user).count() == 1
+
+        job = run_next_plan_job()
+        assert str(job.id) == str(job_id)
+        assert run_next_plan_job() is None
+
+        response = self.retrieve_job(job_id)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response.data["status"] == PlanJobStatus.SUCCEEDED
+        assert response.data["result"] is not None
+
+        # a finished job does not block the next one
+        assert self.submit_job().data["id"] != job_id
+
+    def test_expired_running_job_is_failed(self):
+        job_id = self.submit_job().data["id"]
+        job = claim_next_plan_job()
+        assert str(job.id) == str(job_id)
+
+        # the worker was stopped by a deploy before it finished the job
+        PlanJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - timedelta(seconds=PLAN_JOB_TIMEOUT_SECONDS + 1)
+        )
+        assert self.submit_job().data["id"] != job_id
+        response = self.retrieve_job(job_id)
+        assert response.data["status"] == PlanJobStatus.FAILED
+
+    def get_plan(self):
+        factory = APIRequestFactory()
+        request = factory.get("api/my/plan", format="json")
+        force_authenticate(request, user=self.user)
+        return UserPlanViewSet.as_view({"get": "list"})(request)
+
+    def test_stale_plan_is_served_while_recomputing(self):
+        response = self.get_plan()
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response["X-Plan-Is-Fresh"] == "true"
+        assert self.get_plan()["X-Plan-Is-Fresh"] == "true"
+
+        version = int(response["X-Financial-Data-Version"])
+        self.update_financial_profile(monthly_salary_before_tax=9000)
+        response = self.get_plan()
+        assert int(response["X-Financial-Data-Version"]) > version
+        assert response["X-Plan-Is-Fresh"] == "false"
+        assert PlanJob.objects.filter(
+            user=self.user, status=PlanJobStatus.PENDING
+        ).exists()
+
+        job = run_next_plan_job()
+        assert job.status == PlanJobStatus.SUCCEEDED
+        assert self.get_plan()["X-Plan-Is-Fresh"] == "true"
+
+    def test_stale_plan_is_built_when_no_worker_takes_the_job(self):
+        assert self.get_plan()["X-Plan-Is-Fresh"] == "true"
+        self.update_financial_profile(monthly_salary_before_tax=9000)
+        assert self.get_plan()["X-Plan-Is-Fresh"] == "false"
+        # polling again does not reset the time the job has been waiting
+        job = PlanJob.objects.get(user=self.user, status=PlanJobStatus.PENDING)
+        assert self.get_plan()["X-Plan-Is-Fresh"] == "false"
+        assert PlanJob.objects.get(pk=job.pk).run_after == job.run_after
+
+        PlanJob.objects.filter(pk=job.pk).update(
+            run_after=timezone.now()
+            - timedelta(seconds=PLAN_JOB_CLAIM_TIMEOUT_SECONDS + 1)
+        )
+        response = self.get_plan()
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response["X-Plan-Is-Fresh"] == "true"
+        job.refresh_from_db()
+        assert job.status == PlanJobStatus.SUCCEEDED
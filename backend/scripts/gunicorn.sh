@@ -7,4 +7,9 @@ set -o nounset
 
 python manage.py collectstatic --noinput --verbosity 0
 python manage.py migrate
+# the queued plans are built by a process of their own next to the web workers so that the solves never block the
+# gevent event loop - set RUN_PLAN_WORKERS=false when they run as their own app (BACKEND_PROCESS=plan_workers)
+if [ "${RUN_PLAN_WORKERS:-true}" = "true" ]; then
+  (until python manage.py run_plan_workers; do sleep 5; done) &
+fi
 gunicorn config.wsgi -w 4 --worker-class gevent -b 0.0.0.0:8000 --chdir=/app
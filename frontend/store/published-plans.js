@@ -1,6 +1,7 @@
 import Vue from 'vue'
 
 import { PlanMaker } from '~/assets/plans.js'
+import { delay } from '~/assets/utils.js'
 
 const defaultState = function () {
   return {
@@ -72,6 +73,10 @@ const mutations = {
   }
 }
 
+const MAX_SNAPSHOT_ATTEMPTS = 6
+// a plan whose snapshot is still being built is answered with a 503 and the seconds to wait in `Retry-After`
+const DEFAULT_RETRY_AFTER_SECONDS = 10
+
 const actions = {
   getPlanIfNotExists (context, payload) {
     const planId = payload.id
@@ -79,20 +84,27 @@ const actions = {
     if (planExists) {
       return null
     }
-    this.$axios.get(`/api/published-plan/${planId}`)
-      .then((response) => {
-        const pm = new PlanMaker(this.$instrument.colors)
-        const plans = pm.fromResponseData(response.data.plans)
-        const payload = {
-          plans,
-          id: response.data.id,
-          financial_data: response.data.financial_data
-        }
-        context.commit('SET_PLAN', payload)
-      })
-      .catch((e) => {
-        return null
-      })
+    const getPlan = (attempt) => {
+      return this.$axios.get(`/api/published-plan/${planId}`)
+        .then((response) => {
+          const pm = new PlanMaker(this.$instrument.colors)
+          const plans = pm.fromResponseData(response.data.plans)
+          const payload = {
+            plans,
+            id: response.data.id,
+            financial_data: response.data.financial_data
+          }
+          context.commit('SET_PLAN', payload)
+        })
+        .catch((e) => {
+          if (e.response?.status !== 503 || attempt + 1 >= MAX_SNAPSHOT_ATTEMPTS) {
+            return null
+          }
+          const retryAfter = Number(e.response.headers['retry-after']) || DEFAULT_RETRY_AFTER_SECONDS
+          return delay(retryAfter * 1000).then(() => getPlan(attempt + 1))
+        })
+    }
+    return getPlan(0)
   }
 }
 